@@ -11,9 +11,9 @@ Version: 1.0.0
 import os
 from datetime import datetime
 from flask import Flask
-from flask_migrate import upgrade
 from app import create_app, db
 from app.models import User, Task, StudySession, UserPoints, Achievement
+from app.utils.schema import ensure_schema
 
 # Create Flask application
 app = create_app(os.getenv('FLASK_CONFIG') or 'default')
@@ -33,8 +33,8 @@ def make_shell_context():
 @app.cli.command()
 def deploy():
     """Run deployment tasks"""
-    # Create database tables
-    db.create_all()
+    # Create tables and apply pending schema migrations
+    ensure_schema(mode='version')
     
     # Create default achievements
     create_default_achievements()
@@ -1,47 +1,113 @@
+import click
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask_mail import Mail
-from flask_migrate import Migrate
 from config import config
 
 # Initialize extensions
 db = SQLAlchemy()
 login_manager = LoginManager()
 mail = Mail()
-migrate = Migrate()
+migrate = None  # Flask-Migrate (and alembic) is only loaded for CLI processes
+
+def init_migrate(app):
+    """Register Flask-Migrate lazily so web workers skip importing alembic"""
+    global migrate
+    from flask_migrate import Migrate
+    if migrate is None:
+        migrate = Migrate()
+    migrate.init_app(app, db)
+    return migrate
 
 def create_app(config_name='default'):
     """Application factory pattern for creating Flask app"""
     app = Flask(__name__)
     app.config.from_object(config[config_name])
     
+    # Per-backend pool sizing / SQLite pragmas
+    from app.utils.database import build_engine_options, configure_engine
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', build_engine_options(app.config))
+    
     # Initialize extensions with app
     db.init_app(app)
+    configure_engine(app, db)
     login_manager.init_app(app)
     mail.init_app(app)
-    migrate.init_app(app, db)
+    if not app.config.get('LAZY_IMPORTS', True) or click.get_current_context(silent=True):
+        init_migrate(app)
     
     # Configure login manager
     login_manager.login_view = 'auth.login'
     login_manager.login_message = 'Please log in to access this page.'
     login_manager.login_message_category = 'info'
     
+    # orjson-backed JSON provider (before anything wraps app.json.dumps)
+    from app.utils.json_provider import init_json_provider
+    init_json_provider(app)
+    
+    from app.utils.identity_cache import init_identity_cache
+    from app.utils.passwords import init_password_hasher
+    init_identity_cache(app)
+    init_password_hasher(app)
+    
+    from app.utils.ics_feed import init_feed_cache
+    init_feed_cache(app)
+    
+    from app.utils.subjects import init_subjects
+    init_subjects(app)
+    
     # Register blueprints
     from app.routes.auth import auth_bp
     from app.routes.main import main_bp
     from app.routes.tasks import tasks_bp
     from app.routes.analytics import analytics_bp
     from app.routes.api import api_bp
+    from app.routes.debug import debug_bp
+    from app.routes.metrics import metrics_bp
     
     app.register_blueprint(auth_bp, url_prefix='/auth')
     app.register_blueprint(main_bp)
     app.register_blueprint(tasks_bp, url_prefix='/tasks')
     app.register_blueprint(analytics_bp, url_prefix='/analytics')
     app.register_blueprint(api_bp, url_prefix='/api')
+    app.register_blueprint(debug_bp, url_prefix='/debug')
+    app.register_blueprint(metrics_bp)
     
-    # Create database tables
+    # Per-request query counts, DB time and N+1 detection
+    from app.utils.instrumentation import init_sql_instrumentation
+    init_sql_instrumentation(app, db)
+    
+    # Prometheus metrics (latency/DB histograms, in-flight, cache and AI stats)
+    from app.utils.metrics import init_metrics
+    init_metrics(app, db)
+    
+    # Opt-in Server-Timing headers (db / render / serialize phases)
+    from app.utils.server_timing import init_server_timing
+    init_server_timing(app, db)
+    
+    # Admin-triggered cProfile capture of single requests
+    from app.utils.profiling import init_profiling
+    init_profiling(app)
+    
+    # `flask seed` synthetic data for load testing
+    from app.utils.seed import seed_command
+    app.cli.add_command(seed_command)
+    
+    # `flask import-tasks` bulk CSV/.ics import
+    from app.utils.task_import import import_tasks_command
+    app.cli.add_command(import_tasks_command)
+    
+    # `flask mark-overdue`
+    from app.utils.overdue import init_overdue_scheduler, mark_overdue_command
+    app.cli.add_command(mark_overdue_command)
+    
+    # Check the stored schema version; DDL only runs when a migration is needed
+    from app.utils.schema import ensure_schema
     with app.app_context():
-        db.create_all()
+        ensure_schema()
+    
+    # Hourly overdue-status job (web processes only, after the schema is current)
+    init_overdue_scheduler(app)
     
     return app
\ No newline at end of file
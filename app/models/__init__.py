@@ -1,6 +1,8 @@
 from .user import User
 from .task import Task
 from .study_session import StudySession
+from .recurrence import TaskRecurrence, SkippedOccurrence
+from .subject import Subject
 from .gamification import UserPoints, Achievement, UserAchievement
 
-__all__ = ['User', 'Task', 'StudySession', 'UserPoints', 'Achievement', 'UserAchievement']
\ No newline at end of file
+__all__ = ['User', 'Task', 'StudySession', 'TaskRecurrence', 'SkippedOccurrence', 'Subject', 'UserPoints', 'Achievement', 'UserAchievement']
\ No newline at end of file
@@ -0,0 +1,104 @@
+import calendar
+from datetime import datetime, timedelta
+from app import db
+
+FREQUENCIES = ('daily', 'weekly', 'monthly')
+
+class TaskRecurrence(db.Model):
+    """Recurrence rule plus the template its occurrences are created from
+
+    Occurrences are not stored: they are expanded for the requested date
+    window and only become Task rows (recurrence_id, occurrence_date) once
+    they are completed or edited. Deleted occurrences are kept out of the
+    expansion by a SkippedOccurrence row.
+    """
+    __tablename__ = 'task_recurrences'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    
+    # Template for the occurrences (same fields as Task)
+    title = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text)
+    subject = db.Column(db.String(100), nullable=False)
+    priority = db.Column(db.String(20), nullable=False, default='medium')
+    difficulty = db.Column(db.Integer, default=3)
+    estimated_hours = db.Column(db.Float, default=1.0)
+    category = db.Column(db.String(50), default='assignment')
+    
+    # Rule: every `interval` days/weeks/months from starts_on (the first occurrence) until ends_on
+    frequency = db.Column(db.String(10), nullable=False, default='weekly')  # daily, weekly, monthly
+    interval = db.Column(db.Integer, nullable=False, default=1)
+    starts_on = db.Column(db.Date, nullable=False)
+    ends_on = db.Column(db.Date)
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    skipped = db.relationship('SkippedOccurrence', lazy='dynamic', cascade='all, delete-orphan')
+    
+    def occurrence_dates(self, start, end):
+        """Occurrence dates in [start, end)"""
+        if self.ends_on is not None:
+            end = min(end, self.ends_on + timedelta(days=1))
+        start = max(start, self.starts_on)
+        if start >= end:
+            return []
+        
+        if self.frequency == 'monthly':
+            return self._monthly_dates(start, end)
+        
+        step = self.interval * (7 if self.frequency == 'weekly' else 1)
+        skipped = -(-(start - self.starts_on).days // step)  # ceil
+        first = self.starts_on + timedelta(days=skipped * step)
+        return [first + timedelta(days=offset) for offset in range(0, (end - first).days, step)]
+    
+    def _monthly_dates(self, start, end):
+        # Same day of month as starts_on, clamped to short months (31st -> 30th/28th)
+        months = (start.year - self.starts_on.year) * 12 + start.month - self.starts_on.month
+        index = max(0, months // self.interval - 1)
+        dates = []
+        while True:
+            month = self.starts_on.month - 1 + index * self.interval
+            year, month = self.starts_on.year + month // 12, month % 12 + 1
+            day = min(self.starts_on.day, calendar.monthrange(year, month)[1])
+            occurrence = self.starts_on.replace(year=year, month=month, day=day)
+            if occurrence >= end:
+                return dates
+            if occurrence >= start:
+                dates.append(occurrence)
+            index += 1
+    
+    def is_occurrence(self, day):
+        """Whether the rule produces an occurrence on day"""
+        return day in self.occurrence_dates(day, day + timedelta(days=1))
+    
+    def to_dict(self):
+        """Convert recurrence to dictionary for API responses"""
+        return {
+            'id': self.id,
+            'title': self.title,
+            'description': self.description,
+            'subject': self.subject,
+            'priority': self.priority,
+            'difficulty': self.difficulty,
+            'estimated_hours': self.estimated_hours,
+            'category': self.category,
+            'frequency': self.frequency,
+            'interval': self.interval,
+            'starts_on': self.starts_on.isoformat(),
+            'ends_on': self.ends_on.isoformat() if self.ends_on else None
+        }
+    
+    def __repr__(self):
+        return f'<TaskRecurrence {self.title} {self.frequency}>'
+
+class SkippedOccurrence(db.Model):
+    """Occurrence deleted from its series (an exception date of the rule)"""
+    __tablename__ = 'skipped_occurrences'
+    
+    recurrence_id = db.Column(db.Integer, db.ForeignKey('task_recurrences.id'), primary_key=True)
+    occurrence_date = db.Column(db.Date, primary_key=True)
+    
+    def __repr__(self):
+        return f'<SkippedOccurrence {self.recurrence_id} {self.occurrence_date}>'
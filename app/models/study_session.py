@@ -1,12 +1,24 @@
 from datetime import datetime, date
 from app import db
 
+def productivity_level(focus_rating):
+    """Productivity level for a 1-10 focus rating"""
+    if focus_rating >= 8:
+        return 'Excellent'
+    elif focus_rating >= 6:
+        return 'Good'
+    elif focus_rating >= 4:
+        return 'Average'
+    else:
+        return 'Poor'
+
 class StudySession(db.Model):
     """Study session model for tracking study time and productivity"""
     __tablename__ = 'study_sessions'
     
     id = db.Column(db.Integer, primary_key=True)
     subject = db.Column(db.String(100), nullable=False)
+    subject_id = db.Column(db.Integer, db.ForeignKey('subjects.id'))  # Set from subject on flush (app.utils.subjects)
     duration = db.Column(db.Integer, nullable=False)  # Duration in minutes
     
     # Session details
@@ -34,6 +46,12 @@ class StudySession(db.Model):
     # Gamification
     points_earned = db.Column(db.Integer, default=0)
     
+    # Composite indexes for date-windowed and most-recent-first session queries
+    __table_args__ = (
+        db.Index('ix_study_sessions_user_date', 'user_id', 'date'),
+        db.Index('ix_study_sessions_user_created_at', 'user_id', 'created_at'),
+    )
+    
     def calculate_points(self):
         """Calculate points based on session duration and focus"""
         base_points = self.duration // 15  # 1 point per 15 minutes
@@ -58,14 +76,7 @@ class StudySession(db.Model):
     @property
     def productivity_level(self):
         """Get productivity level based on focus rating"""
-        if self.focus_rating >= 8:
-            return 'Excellent'
-        elif self.focus_rating >= 6:
-            return 'Good'
-        elif self.focus_rating >= 4:
-            return 'Average'
-        else:
-            return 'Poor'
+        return productivity_level(self.focus_rating)
     
     @property
     def session_color(self):
@@ -0,0 +1,23 @@
+from datetime import datetime
+from app import db
+
+def normalize_subject(name):
+    """Dictionary key for a subject: case and whitespace variants share one row"""
+    return ' '.join(name.split()).casefold()
+
+class Subject(db.Model):
+    """Per-user subject dictionary referenced by tasks and study sessions"""
+    __tablename__ = 'subjects'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    name = db.Column(db.String(100), nullable=False)  # Display form (first or most used spelling)
+    normalized = db.Column(db.String(100), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'normalized', name='uq_subjects_user_normalized'),
+    )
+    
+    def __repr__(self):
+        return f'<Subject {self.name}>'
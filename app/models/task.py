@@ -1,5 +1,35 @@
 from datetime import datetime, date
 from app import db
+from app.utils.overdue import user_today
+from app.utils.search import register_search_ddl
+
+# Bootstrap color per priority (also used by projection-based feeds)
+PRIORITY_COLORS = {
+    'low': 'success',
+    'medium': 'warning',
+    'high': 'danger',
+    'urgent': 'dark'
+}
+
+# Statuses of tasks that still need work ('overdue' is set by app.utils.overdue)
+OPEN_STATUSES = ('pending', 'in_progress', 'overdue')
+
+# Integer ranks backing priority_rank/status_rank: higher priority ranks higher,
+# and every open status ranks below 'completed'
+PRIORITY_RANKS = {'low': 1, 'medium': 2, 'high': 3, 'urgent': 4}
+STATUS_RANKS = {'overdue': 1, 'in_progress': 2, 'pending': 3, 'completed': 4}
+
+def rank_expression(column, ranks):
+    """SQL CASE mapping a string column onto its rank (0 for unknown values)"""
+    whens = ' '.join(f"WHEN '{name}' THEN {rank}" for name, rank in ranks.items())
+    return f'CASE {column} {whens} ELSE 0 END'
+
+# Completion points: base by priority plus 5 per difficulty level
+POINTS_BY_PRIORITY = {'low': 10, 'medium': 20, 'high': 30, 'urgent': 50}
+
+def completion_points(priority, difficulty):
+    """Points awarded for completing a task"""
+    return POINTS_BY_PRIORITY.get(priority, 20) + (difficulty or 0) * 5
 
 class Task(db.Model):
     """Task model for managing student assignments and todos"""
@@ -9,10 +39,16 @@ class Task(db.Model):
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
     subject = db.Column(db.String(100), nullable=False)
+    subject_id = db.Column(db.Integer, db.ForeignKey('subjects.id'))  # Set from subject on flush (app.utils.subjects)
     
     # Task properties
     priority = db.Column(db.String(20), nullable=False, default='medium')  # low, medium, high, urgent
     status = db.Column(db.String(20), nullable=False, default='pending')  # pending, in_progress, completed, overdue
+    pre_overdue_status = db.Column(db.String(20))  # Status the overdue job replaced; restored on rescheduling
+    
+    # Generated by the database from priority/status, so every write path (ORM and bulk Core) keeps them in step
+    priority_rank = db.Column(db.SmallInteger, db.Computed(rank_expression('priority', PRIORITY_RANKS)))
+    status_rank = db.Column(db.SmallInteger, db.Computed(rank_expression('status', STATUS_RANKS)))
     difficulty = db.Column(db.Integer, default=3)  # 1-5 scale
     estimated_hours = db.Column(db.Float, default=1.0)
     
@@ -31,30 +67,62 @@ class Task(db.Model):
     # Gamification
     points_awarded = db.Column(db.Integer, default=0)
     
+    # Materialized occurrence of a TaskRecurrence (see app.utils.recurrence)
+    recurrence_id = db.Column(db.Integer, db.ForeignKey('task_recurrences.id'))
+    occurrence_date = db.Column(db.Date)
+    
+    # Composite indexes for the per-user dashboard, analytics and API queries
+    __table_args__ = (
+        db.Index('ix_tasks_user_due_date', 'user_id', 'due_date'),
+        db.Index('ix_tasks_user_status_due_date', 'user_id', 'status', 'due_date'),
+        db.Index('ix_tasks_user_status_completed_at', 'user_id', 'status', 'completed_at'),
+        db.Index('ix_tasks_user_updated_at', 'user_id', 'updated_at'),
+        db.Index('uq_tasks_recurrence_occurrence', 'recurrence_id', 'occurrence_date', unique=True),
+        db.Index('ix_tasks_user_priority_rank_due_date', 'user_id', 'priority_rank', 'due_date'),
+        db.Index('ix_tasks_user_status_rank_due_date', 'user_id', 'status_rank', 'due_date'),
+    )
+    
     def mark_completed(self):
         """Mark task as completed and award points"""
         self.status = 'completed'
+        self.pre_overdue_status = None
         self.completed_at = datetime.utcnow()
         self.updated_at = datetime.utcnow()
         
         # Award points based on priority and difficulty
-        points_map = {'low': 10, 'medium': 20, 'high': 30, 'urgent': 50}
-        base_points = points_map.get(self.priority, 20)
-        self.points_awarded = base_points + (self.difficulty * 5)
+        self.points_awarded = completion_points(self.priority, self.difficulty)
         
         # Add points to user
         from app.models.gamification import UserPoints
         user_points = UserPoints.query.filter_by(user_id=self.user_id).first()
         if not user_points:
-            user_points = UserPoints(user_id=self.user_id, total_points=0)
+            user_points = UserPoints(user_id=self.user_id, total_points=0, tasks_completed=0)
             db.session.add(user_points)
         
         user_points.total_points += self.points_awarded
         user_points.tasks_completed += 1
     
+    def reschedule(self):
+        """Give an overdue task (whose due date moved on) back the status it had before"""
+        if self.status == 'overdue':
+            self.status = self.pre_overdue_status or 'pending'
+            self.pre_overdue_status = None
+    
     def is_overdue(self):
-        """Check if task is overdue"""
-        return self.due_date < date.today() and self.status != 'completed'
+        """Check if task is overdue (maintained by the scheduled overdue job)"""
+        return self.status == 'overdue'
+    
+    def reopen(self, today=None):
+        """Move a completed task back to pending, or straight to overdue if past due
+
+        today is the owner's local date (user_today); it is looked up from the
+        owner's time zone when not given.
+        """
+        if today is None:
+            today = user_today(self.user.timezone)
+        self.status = 'overdue' if today is not None and self.due_date < today else 'pending'
+        self.completed_at = None
+        self.updated_at = datetime.utcnow()
     
     def days_until_due(self):
         """Get days until due date"""
@@ -64,13 +132,7 @@ class Task(db.Model):
     @property
     def priority_color(self):
         """Get color class for priority"""
-        colors = {
-            'low': 'success',
-            'medium': 'warning', 
-            'high': 'danger',
-            'urgent': 'dark'
-        }
-        return colors.get(self.priority, 'secondary')
+        return PRIORITY_COLORS.get(self.priority, 'secondary')
     
     @property
     def status_color(self):
@@ -84,7 +146,8 @@ class Task(db.Model):
         return colors.get(self.status, 'secondary')
     
     def to_dict(self):
-        """Convert task to dictionary for API responses"""
+        """Convert task to dictionary for API responses (lists use app.utils.serializers)"""
+        today = date.today()
         return {
             'id': self.id,
             'title': self.title,
@@ -100,9 +163,18 @@ class Task(db.Model):
             'completed_at': self.completed_at.isoformat() if self.completed_at else None,
             'category': self.category,
             'points_awarded': self.points_awarded,
-            'is_overdue': self.is_overdue(),
-            'days_until_due': self.days_until_due()
+            'is_overdue': self.status == 'overdue',
+            'days_until_due': (self.due_date - today).days
         }
     
     def __repr__(self):
-        return f'<Task {self.title}>'
\ No newline at end of file
+        return f'<Task {self.title}>'
+
+# Open tasks (OPEN_STATUSES) as a single range on status_rank
+OPEN_TASK = Task.status_rank < STATUS_RANKS['completed']
+
+# Most important first: priority, then earliest due date, then hardest
+PRIORITY_ORDER = (Task.priority_rank.desc(), Task.due_date, Task.difficulty.desc(), Task.id)
+
+# Keep the full-text index (FTS5 / tsvector) alongside the table
+register_search_ddl(Task.__table__)
@@ -1,7 +1,8 @@
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import event
+from app.utils.passwords import hash_password, verify_password, password_needs_rehash
 from app import db, login_manager
 
 class User(UserMixin, db.Model):
@@ -29,18 +30,39 @@ class User(UserMixin, db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     last_login = db.Column(db.DateTime)
     
+    # Bumped on password change; sessions and cached identities from an older version are rejected
+    session_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    
+    # IANA time zone for date-based jobs such as overdue marking (None = server time)
+    timezone = db.Column(db.String(50))
+    
     # Relationships
     tasks = db.relationship('Task', backref='user', lazy='dynamic', cascade='all, delete-orphan')
     study_sessions = db.relationship('StudySession', backref='user', lazy='dynamic', cascade='all, delete-orphan')
+    recurrences = db.relationship('TaskRecurrence', backref='user', lazy='dynamic', cascade='all, delete-orphan')
+    subjects = db.relationship('Subject', backref='user', lazy='dynamic', cascade='all, delete-orphan')
     points = db.relationship('UserPoints', backref='user', uselist=False, cascade='all, delete-orphan')
     
+    def get_id(self):
+        """Flask-Login identifier; the session version in it revokes remember-me cookies on password change"""
+        return f'{self.id}:{self.session_version or 0}'
+    
     def set_password(self, password):
         """Hash and set user password"""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
+        self.session_version = (self.session_version or 0) + 1
     
     def check_password(self, password):
         """Check if provided password matches hash"""
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
+    
+    def rehash_password_if_needed(self, password):
+        """Re-hash with the configured parameters after a successful login"""
+        if not password_needs_rehash(self.password_hash):
+            return False
+        # Same password, so existing sessions stay valid (session_version unchanged)
+        self.password_hash = hash_password(password)
+        return True
     
     @property
     def full_name(self):
@@ -71,7 +93,15 @@ class User(UserMixin, db.Model):
     def __repr__(self):
         return f'<User {self.username}>'
 
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def invalidate_cached_identity(mapper, connection, target):
+    """Drop the cached snapshot when a user's profile or password changes"""
+    from app.utils.identity_cache import invalidate_user
+    invalidate_user(target.id)
+
 @login_manager.user_loader
 def load_user(user_id):
-    """Load user for Flask-Login"""
-    return User.query.get(int(user_id))
\ No newline at end of file
+    """Load user for Flask-Login, served from the identity cache when possible"""
+    from app.utils.identity_cache import load_cached_user, parse_user_id
+    return load_cached_user(*parse_user_id(user_id))
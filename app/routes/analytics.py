@@ -3,7 +3,9 @@ from flask import Blueprint, render_template, request, jsonify, url_for
 from flask_login import login_required, current_user
 from sqlalchemy import func, extract
 from app import db
-from app.models import Task, StudySession, UserPoints
+from app.models import Task, StudySession, Subject, UserPoints
+from app.utils.ai_helper import analyze_productivity_patterns, stream_productivity_rows
+from app.utils.subjects import SESSION_SUBJECT
 
 analytics_bp = Blueprint('analytics', __name__)
 
@@ -38,14 +40,14 @@ def index():
     
     # Subject breakdown
     subject_data = db.session.query(
-        StudySession.subject,
+        SESSION_SUBJECT.label('name'),
         func.sum(StudySession.duration).label('total_time'),
         func.count(StudySession.id).label('session_count'),
         func.avg(StudySession.focus_rating).label('avg_focus')
-    ).filter(
+    ).select_from(StudySession).outerjoin(Subject, Subject.id == StudySession.subject_id).filter(
         StudySession.user_id == current_user.id,
         StudySession.date >= start_date
-    ).group_by(StudySession.subject).all()
+    ).group_by(Subject.id, SESSION_SUBJECT).all()
     
     # Task completion by priority - simplified
     priority_data = []
@@ -339,6 +341,16 @@ def goals():
 </html>
     '''
 
+@analytics_bp.route('/api/productivity-patterns')
+@login_required
+def api_productivity_patterns():
+    """Focus statistics by weekday and hour, streamed from the database in constant memory"""
+    days = request.args.get('days', type=int)
+    start_date = date.today() - timedelta(days=days) if days else None
+    
+    patterns = analyze_productivity_patterns(stream_productivity_rows(current_user.id, start_date=start_date))
+    return jsonify({'success': True, 'patterns': patterns})
+
 @analytics_bp.route('/api/chart-data')
 @login_required
 def chart_data():
@@ -368,12 +380,12 @@ def chart_data():
         # Study time by subject (last 30 days)
         thirty_days_ago = date.today() - timedelta(days=30)
         subject_data = db.session.query(
-            StudySession.subject,
+            SESSION_SUBJECT,
             func.sum(StudySession.duration)
-        ).filter(
+        ).select_from(StudySession).outerjoin(Subject, Subject.id == StudySession.subject_id).filter(
             StudySession.user_id == current_user.id,
             StudySession.date >= thirty_days_ago
-        ).group_by(StudySession.subject).all()
+        ).group_by(Subject.id, SESSION_SUBJECT).all()
         
         return jsonify([{
             'subject': subject,
@@ -1,9 +1,15 @@
 from datetime import datetime, date
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_login import login_required, current_user
 from app import db
-from app.models import Task, StudySession, UserPoints
+from app.models import Task, StudySession, TaskRecurrence, UserPoints
+from app.models.task import OPEN_TASK
 from app.utils.ai_helper import get_study_recommendations
+from app.utils.server_timing import timing
+from app.utils.bulk_tasks import BulkOperationError, apply_bulk_operation
+from app.utils.overdue import user_today
+from app.utils.task_import import detect_format, import_tasks, parse_rows
+from app.utils.recurrence import materialize_occurrence, parse_occurrence_date
 
 api_bp = Blueprint('api', __name__)
 
@@ -74,9 +80,8 @@ def toggle_task_status(task_id):
         return jsonify({'success': False, 'message': 'Task not found'}), 404
     
     if task.status == 'completed':
-        task.status = 'pending'
-        task.completed_at = None
-        message = 'Task marked as pending'
+        task.reopen(user_today(current_user.timezone))
+        message = f'Task marked as {task.status}'
         points = 0
     else:
         task.mark_completed()
@@ -92,6 +97,101 @@ def toggle_task_status(task_id):
         'message': message
     })
 
+@api_bp.route('/recurrences', methods=['GET'])
+@login_required
+def list_recurrences():
+    """Recurring task rules of the current user"""
+    recurrences = TaskRecurrence.query.filter_by(user_id=current_user.id).order_by(TaskRecurrence.id).all()
+    return jsonify({'success': True, 'recurrences': [recurrence.to_dict() for recurrence in recurrences]})
+
+@api_bp.route('/recurrences/<int:recurrence_id>', methods=['DELETE'])
+@login_required
+def delete_recurrence(recurrence_id):
+    """End a series; occurrences already materialized stay as ordinary tasks"""
+    recurrence = TaskRecurrence.query.filter_by(id=recurrence_id, user_id=current_user.id).first()
+    if not recurrence:
+        return jsonify({'success': False, 'message': 'Recurrence not found'}), 404
+    
+    db.session.execute(
+        db.update(Task).where(Task.recurrence_id == recurrence_id)
+        .values(recurrence_id=None, occurrence_date=None, updated_at=datetime.utcnow()),
+        execution_options={'synchronize_session': False}
+    )
+    db.session.delete(recurrence)
+    db.session.commit()
+    return jsonify({'success': True})
+
+@api_bp.route('/recurrences/<int:recurrence_id>/occurrences/<occurrence_date>/complete', methods=['POST'])
+@login_required
+def complete_occurrence(recurrence_id, occurrence_date):
+    """Complete one occurrence of a recurring task, materializing it first"""
+    day = parse_occurrence_date(occurrence_date)
+    task = materialize_occurrence(current_user.id, recurrence_id, day) if day else None
+    if task is None:
+        return jsonify({'success': False, 'message': 'Occurrence not found'}), 404
+    
+    points = 0
+    if task.status != 'completed':
+        task.mark_completed()
+        points = task.points_awarded
+    db.session.commit()
+    
+    return jsonify({
+        'success': True,
+        'task_id': task.id,
+        'status': task.status,
+        'points_earned': points
+    })
+
+@api_bp.route('/tasks/bulk', methods=['POST'])
+@login_required
+def bulk_tasks():
+    """Apply one operation (complete, reopen, set_priority, delete) to many tasks"""
+    data = request.get_json(silent=True) or {}
+    task_ids = data.get('task_ids')
+    
+    if (not isinstance(task_ids, list) or not task_ids
+            or not all(isinstance(task_id, int) and not isinstance(task_id, bool) for task_id in task_ids)):
+        return jsonify({'success': False, 'message': 'task_ids must be a non-empty list of integers'}), 400
+    if len(task_ids) > current_app.config['MAX_BULK_TASKS']:
+        return jsonify({'success': False, 'message': 'Too many tasks in one request'}), 400
+    
+    try:
+        results, points = apply_bulk_operation(current_user.id, task_ids, data.get('operation'), data.get('value'))
+    except BulkOperationError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    return jsonify({
+        'success': True,
+        'operation': data['operation'],
+        'updated': sum(1 for result in results if result['result'] == 'updated'),
+        'points_earned': points,
+        'results': results
+    })
+
+@api_bp.route('/tasks/import', methods=['POST'])
+@login_required
+def import_task_file():
+    """Import tasks from an uploaded CSV or .ics file (multipart field 'file')"""
+    upload = request.files.get('file')
+    if upload is None or not upload.filename:
+        return jsonify({'success': False, 'message': 'No file uploaded'}), 400
+    
+    file_format = request.form.get('format') or detect_format(upload.filename, upload.mimetype)
+    if file_format not in ('csv', 'ics'):
+        return jsonify({'success': False, 'message': 'Format must be csv or ics'}), 400
+    
+    # The upload is spooled to disk by Werkzeug and parsed row by row
+    result = import_tasks(
+        current_user.id,
+        parse_rows(upload.stream, file_format),
+        batch_size=current_app.config['IMPORT_BATCH_SIZE'],
+        default_subject=request.form.get('subject'),
+        max_errors=current_app.config['IMPORT_MAX_ERRORS']
+    )
+    
+    return jsonify(dict(result.to_dict(), success=True, format=file_format))
+
 @api_bp.route('/tasks/<int:task_id>/update-priority', methods=['POST'])
 @login_required
 def update_task_priority(task_id):
@@ -127,9 +227,9 @@ def study_recommendations():
             user_id=current_user.id
         ).order_by(StudySession.created_at.desc()).limit(10).all()
         
-        pending_tasks = Task.query.filter_by(
-            user_id=current_user.id,
-            status='pending'
+        pending_tasks = Task.query.filter(
+            Task.user_id == current_user.id,
+            OPEN_TASK
         ).order_by(Task.due_date).limit(5).all()
         
         # Get recommendations from AI helper
@@ -170,10 +270,9 @@ def user_stats():
         status='completed'
     ).count()
     
-    overdue_tasks = Task.query.filter(
-        Task.user_id == current_user.id,
-        Task.due_date < date.today(),
-        Task.status != 'completed'
+    overdue_tasks = Task.query.filter_by(
+        user_id=current_user.id,
+        status='overdue'
     ).count()
     
     return jsonify({
@@ -210,9 +309,12 @@ def quick_add_task():
     db.session.add(task)
     db.session.commit()
     
+    with timing('serialize'):
+        task_data = task.to_dict()
+    
     return jsonify({
         'success': True,
-        'task': task.to_dict(),
+        'task': task_data,
         'message': 'Task added successfully!'
     })
 
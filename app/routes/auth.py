@@ -5,6 +5,8 @@ from werkzeug.urls import url_parse
 from app import db
 from app.models import User, UserPoints
 from app.utils.forms import LoginForm, RegistrationForm
+from app.utils.identity_cache import remember_session_version
+from app.utils.passwords import PasswordHasherBusy
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -19,7 +21,9 @@ def login():
         user = User.query.filter_by(username=form.username.data).first()
         
         if user and user.check_password(form.password.data):
+            user.rehash_password_if_needed(form.password.data)
             login_user(user, remember=form.remember_me.data)
+            remember_session_version(user)
             user.last_login = datetime.utcnow()
             db.session.commit()
             
@@ -115,6 +119,10 @@ def register():
             
             flash('🎉 Welcome to StudyFlow! Your account has been created successfully.', 'success')
             return redirect(url_for('auth.login'))
+        except PasswordHasherBusy:
+            # Shed with 503 + Retry-After like login (see app.utils.passwords)
+            db.session.rollback()
+            raise
         except Exception as e:
             db.session.rollback()
             flash('An error occurred during registration. Please try again.', 'danger')
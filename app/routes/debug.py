@@ -0,0 +1,74 @@
+import io
+import os
+import pstats
+from flask import Blueprint, request, jsonify, abort, current_app, send_from_directory
+from flask_login import current_user
+from app.utils.profiling import SORT_KEYS, issue_profile_token, list_profiles, profile_directory
+
+debug_bp = Blueprint('debug', __name__)
+
+def require_debug_access():
+    """Allow admin users only (also in debug mode: the SQL report shows statement text)"""
+    if not (current_user.is_authenticated and current_user.is_admin):
+        abort(404)
+
+@debug_bp.route('/sql')
+def sql_stats():
+    """Worst routes by DB time, query count or N+1 occurrences"""
+    require_debug_access()
+    registry = current_app.extensions['sql_stats']
+    
+    return jsonify({
+        'sample_rate': current_app.config.get('SQL_INSTRUMENTATION_SAMPLE_RATE', 0),
+        'n_plus_one_threshold': current_app.config.get('SQL_N_PLUS_ONE_THRESHOLD', 5),
+        'routes': registry.worst(
+            sort_by=request.args.get('sort', 'db_time'),
+            limit=request.args.get('limit', 20, type=int)
+        )
+    })
+
+@debug_bp.route('/sql/reset', methods=['POST'])
+def sql_stats_reset():
+    """Clear the collected per-route SQL statistics"""
+    require_debug_access()
+    current_app.extensions['sql_stats'].reset()
+    return jsonify({'success': True})
+
+@debug_bp.route('/profiles')
+def profiles():
+    """List captured request profiles, newest first"""
+    require_debug_access()
+    return jsonify({'profiles': list_profiles(current_app)})
+
+@debug_bp.route('/profiles/token', methods=['POST'])
+def profile_token():
+    """Issue a short-lived token that profiles the next request carrying it"""
+    if not current_app.config.get('PROFILING_ENABLED', False):
+        abort(404)
+    if not (current_user.is_authenticated and current_user.is_admin):
+        abort(404)
+    return jsonify({
+        'token': issue_profile_token(current_app, current_user.id),
+        'max_age': current_app.config.get('PROFILE_TOKEN_MAX_AGE', 900),
+        'usage': 'Send as the X-Profile-Token header or the _profile query parameter; valid for one request'
+    })
+
+@debug_bp.route('/profiles/<name>')
+def profile_download(name):
+    """Download a pstats file, or ?format=text for the top functions"""
+    require_debug_access()
+    directory = profile_directory(current_app)
+    filename = f'{name}.pstats'
+    if not os.path.isfile(os.path.join(directory, filename)):
+        abort(404)
+    
+    if request.args.get('format') == 'text':
+        sort = request.args.get('sort', 'cumulative')
+        if sort not in SORT_KEYS:
+            abort(400)
+        output = io.StringIO()
+        stats = pstats.Stats(os.path.join(directory, filename), stream=output)
+        stats.sort_stats(sort).print_stats(request.args.get('limit', 40, type=int))
+        return output.getvalue(), 200, {'Content-Type': 'text/plain; charset=utf-8'}
+    
+    return send_from_directory(directory, filename, as_attachment=True)
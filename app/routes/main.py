@@ -1,9 +1,14 @@
+import heapq
 from datetime import datetime, date, timedelta
 from flask import Blueprint, render_template, request, jsonify, redirect, url_for
 from flask_login import login_required, current_user
 from sqlalchemy import func, desc
 from app import db
-from app.models import User, Task, StudySession, UserPoints, Achievement, UserAchievement
+from app.models import User, Task, StudySession, Subject, UserPoints, Achievement, UserAchievement
+from app.models.task import PRIORITY_RANKS
+from app.utils.server_timing import timing
+from app.utils.recurrence import expand_occurrences
+from app.utils.subjects import SESSION_SUBJECT, user_subjects
 
 main_bp = Blueprint('main', __name__)
 
@@ -24,13 +29,18 @@ def dashboard():
     todays_tasks = Task.query.filter_by(
         user_id=current_user.id,
         due_date=today
-    ).order_by(Task.priority.desc()).all()
+    ).order_by(Task.priority_rank.desc(), Task.id).all()
+    
+    # Recurring occurrences come back in priority order too; merge rather than re-sort
+    todays_tasks = list(heapq.merge(
+        todays_tasks, expand_occurrences(current_user.id, today, today + timedelta(days=1)),
+        key=lambda task: -PRIORITY_RANKS.get(task.priority, 0)
+    ))
     
     # Get overdue tasks
-    overdue_tasks = Task.query.filter(
-        Task.user_id == current_user.id,
-        Task.due_date < today,
-        Task.status != 'completed'
+    overdue_tasks = Task.query.filter_by(
+        user_id=current_user.id,
+        status='overdue'
     ).count()
     
     # Get upcoming tasks (next 7 days)
@@ -72,7 +82,8 @@ def dashboard():
     week_hours = sum(session.duration for session in week_sessions) / 60
     
     # Simple dashboard HTML response
-    return f'''
+    with timing('render'):
+        html = f'''
 <!DOCTYPE html>
 <html>
 <head>
@@ -175,15 +186,13 @@ def dashboard():
 </body>
 </html>
     '''
+    return html
 
 @main_bp.route('/pomodoro')
 @login_required
 def pomodoro():
     """Pomodoro timer page"""
-    subjects = db.session.query(Task.subject).filter_by(
-        user_id=current_user.id
-    ).distinct().all()
-    subjects = [s[0] for s in subjects]
+    subjects = user_subjects(current_user.id)
     
     # Simple pomodoro HTML response
     return f'''
@@ -409,11 +418,11 @@ def dashboard_stats():
     # Study hours by subject (last 30 days)
     thirty_days_ago = today - timedelta(days=30)
     subject_stats = db.session.query(
-        StudySession.subject, func.sum(StudySession.duration)
-    ).filter(
+        SESSION_SUBJECT, func.sum(StudySession.duration)
+    ).select_from(StudySession).outerjoin(Subject, Subject.id == StudySession.subject_id).filter(
         StudySession.user_id == current_user.id,
         StudySession.date >= thirty_days_ago
-    ).group_by(StudySession.subject).all()
+    ).group_by(Subject.id, SESSION_SUBJECT).all()
     
     # Weekly study trend (last 7 days)
     weekly_stats = []
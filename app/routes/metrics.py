@@ -0,0 +1,31 @@
+import hmac
+import ipaddress
+from flask import Blueprint, Response, abort, current_app, request
+
+metrics_bp = Blueprint('metrics', __name__)
+
+def _private_address(address):
+    try:
+        ip = ipaddress.ip_address(address or '')
+    except ValueError:
+        return False
+    return ip.is_private or ip.is_loopback
+
+@metrics_bp.route('/metrics')
+def metrics():
+    """Prometheus text exposition endpoint"""
+    registry = current_app.extensions.get('metrics')
+    if registry is None:
+        abort(404)
+    
+    # With METRICS_TOKEN set, scrapers must send it as a bearer token; without
+    # one, only private and loopback addresses may scrape
+    token = current_app.config.get('METRICS_TOKEN')
+    if token:
+        supplied = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+        if not hmac.compare_digest(supplied, token):
+            abort(403)
+    elif not _private_address(request.remote_addr):
+        abort(403)
+    
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
@@ -1,42 +1,112 @@
+import hashlib
 from datetime import datetime, date
-from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify
+from flask import (Blueprint, render_template, request, flash, redirect, url_for, jsonify, abort, current_app,
+                   stream_with_context)
 from flask_login import login_required, current_user
+from sqlalchemy import func
 from app import db
-from app.models import Task, StudySession
+from app.models import Task, StudySession, TaskRecurrence
+from app.models.task import OPEN_TASK, PRIORITY_COLORS, PRIORITY_RANKS
 from app.utils.forms import TaskForm, StudySessionForm
+from app.utils.server_timing import timing
+from app.utils.pagination import InvalidCursor, keyset_page, page_size
+from app.utils.search import search_tasks
+from app.utils.recurrence import (expand_occurrences, expansion_end, materialize_occurrence, parse_occurrence_date,
+                                  recurrence_state, skip_occurrences)
+from app.utils.subjects import complete_subjects, find_subject_id, user_subjects
+from app.utils.serializers import SESSION_COLUMNS, TASK_COLUMNS, serialize_sessions, serialize_tasks
+from app.utils.ics_feed import (feed_etag, feed_last_modified, feed_rows, feed_state, feed_window_start,
+                                issue_feed_token, read_feed_token, serialize_feed)
+from werkzeug.http import is_resource_modified
 
 tasks_bp = Blueprint('tasks', __name__)
 
+LOAD_MORE_SCRIPT = '''
+<script>
+// Fetch the next page and append its cards instead of navigating
+document.addEventListener('click', async (event) => {
+    const link = event.target.closest('#load-more');
+    if (!link) return;
+    event.preventDefault();
+    const page = new DOMParser().parseFromString(await (await fetch(link.href)).text(), 'text/html');
+    document.getElementById('page-items').append(...page.getElementById('page-items').children);
+    const next = page.getElementById('load-more');
+    next ? link.replaceWith(next) : link.remove();
+});
+</script>
+'''
+
+SUBJECT_AUTOCOMPLETE = '''
+<datalist id="subject-suggestions"></datalist>
+<script>
+// Suggest the user's existing subjects so "Math" is not typed as "math " again
+document.querySelectorAll('input[list="subject-suggestions"]').forEach((input) => {
+    input.addEventListener('input', async () => {
+        const response = await fetch(`%s?q=${encodeURIComponent(input.value)}`);
+        const {subjects} = await response.json();
+        document.getElementById('subject-suggestions').replaceChildren(...subjects.map((name) => new Option(name)));
+    });
+});
+</script>
+'''
+
+def _task_filters(args):
+    """Active status/subject/priority filters from the query string"""
+    return {
+        field: args[field] for field in ('status', 'subject', 'priority')
+        if args.get(field, 'all') != 'all'
+    }
+
+def _task_page(args, columns=None):
+    """Keyset page of the current user's filtered tasks, ordered by (due_date, id)
+
+    Pass columns to page over projected rows instead of Task instances.
+    """
+    filters = _task_filters(args)
+    priority = filters.pop('priority', None)
+    subject = filters.pop('subject', None)
+    query = (db.session.query(*columns) if columns else Task.query).filter_by(
+        user_id=current_user.id, **filters)
+    if subject:
+        # Matches every case/whitespace variant of the subject
+        subject_id = find_subject_id(current_user.id, subject)
+        query = query.filter(Task.subject_id == subject_id if subject_id else db.false())
+    if priority:
+        # (user_id, priority_rank, due_date) serves both the filter and the keyset order
+        query = query.filter(Task.priority_rank == PRIORITY_RANKS.get(priority, 0))
+    limit = page_size(args, current_app.config['TASKS_PER_PAGE'], current_app.config['MAX_PAGE_SIZE'])
+    return keyset_page(query, Task.due_date, Task.id, cursor=args.get('cursor'), limit=limit)
+
+def _session_page(args, columns=None):
+    """Keyset page of the current user's study sessions, newest first"""
+    query = (db.session.query(*columns) if columns else StudySession.query).filter_by(
+        user_id=current_user.id)
+    limit = page_size(args, current_app.config['SESSIONS_PER_PAGE'], current_app.config['MAX_PAGE_SIZE'])
+    return keyset_page(query, StudySession.created_at, StudySession.id, cursor=args.get('cursor'),
+                       limit=limit, descending=True)
+
 @tasks_bp.route('/')
 @login_required
 def index():
     """Tasks overview page"""
-    # Get filter parameters
-    status_filter = request.args.get('status', 'all')
-    subject_filter = request.args.get('subject', 'all')
-    priority_filter = request.args.get('priority', 'all')
+    filters = _task_filters(request.args)
     
-    # Build query
-    query = Task.query.filter_by(user_id=current_user.id)
-    
-    if status_filter != 'all':
-        query = query.filter_by(status=status_filter)
-    if subject_filter != 'all':
-        query = query.filter_by(subject=subject_filter)
-    if priority_filter != 'all':
-        query = query.filter_by(priority=priority_filter)
-    
-    # Order by due date and priority
-    tasks = query.order_by(Task.due_date, Task.priority.desc()).all()
+    # One page at a time, ordered by due date; "Load more" follows the cursor
+    try:
+        page = _task_page(request.args)
+    except InvalidCursor:
+        abort(400)
+    tasks = page.items
+    load_more = ''
+    if page.has_more:
+        load_more = f'<div class="text-center mb-4"><a id="load-more" class="btn btn-outline-primary" href="{url_for("tasks.index", cursor=page.next_cursor, **filters)}">Load more</a></div>'
     
     # Get unique subjects for filter
-    subjects = db.session.query(Task.subject).filter_by(
-        user_id=current_user.id
-    ).distinct().all()
-    subjects = [s[0] for s in subjects]
+    subjects = user_subjects(current_user.id)
     
     # Simple tasks list HTML
-    return f'''
+    with timing('render'):
+        html = f'''
 <!DOCTYPE html>
 <html>
 <head>
@@ -61,15 +131,18 @@ def index():
             <a href="{url_for('tasks.add')}" class="btn btn-primary">Add Task</a>
         </div>
         
-        <div class="row">
+        <div class="row" id="page-items">
             {''.join([f'<div class="col-md-6 mb-3"><div class="card"><div class="card-body"><h5>{task.title}</h5><p class="text-muted">{task.subject}</p><small>Due: {task.due_date} | Priority: {task.priority}</small><div class="mt-2"><form method="POST" action="{url_for("tasks.complete", id=task.id)}" style="display:inline;"><button class="btn btn-sm btn-success">Complete</button></form><form method="POST" action="{url_for("tasks.delete", id=task.id)}" style="display:inline;" onsubmit="return confirm("Delete task?")"><button class="btn btn-sm btn-danger ms-1">Delete</button></form></div></div></div></div>' for task in tasks])}
         </div>
+        {load_more}
         
         {"<p class='text-center text-muted'>No tasks yet. <a href='" + url_for('tasks.add') + "'>Add your first task!</a></p>" if not tasks else ""}
     </div>
+    {LOAD_MORE_SCRIPT}
 </body>
 </html>
     '''
+    return html
 
 @tasks_bp.route('/add', methods=['GET', 'POST'])
 @login_required
@@ -78,22 +151,27 @@ def add():
     form = TaskForm()
     
     if form.validate_on_submit():
-        task = Task(
+        fields = dict(
             title=form.title.data,
             description=form.description.data,
             subject=form.subject.data,
             priority=form.priority.data,
             difficulty=form.difficulty.data,
             estimated_hours=form.estimated_hours.data,
-            due_date=form.due_date.data,
             category=form.category.data,
             user_id=current_user.id
         )
         
-        db.session.add(task)
+        if form.repeat.data == 'none':
+            db.session.add(Task(due_date=form.due_date.data, **fields))
+            flash('Task added successfully!', 'success')
+        else:
+            # Occurrences are expanded on read and only stored once touched
+            db.session.add(TaskRecurrence(frequency=form.repeat.data, starts_on=form.due_date.data,
+                                          ends_on=form.repeat_until.data, **fields))
+            flash(f'Recurring task added ({form.repeat.data})!', 'success')
         db.session.commit()
         
-        flash('Task added successfully!', 'success')
         return redirect(url_for('tasks.index'))
     
     # Simple add task HTML
@@ -137,7 +215,7 @@ def add():
                             <div class="row">
                                 <div class="col-md-6 mb-3">
                                     {form.subject.label(class_="form-label")}
-                                    {form.subject(class_="form-control")}
+                                    {form.subject(class_="form-control", list="subject-suggestions", autocomplete="off")}
                                 </div>
                                 <div class="col-md-6 mb-3">
                                     {form.priority.label(class_="form-label")}
@@ -154,6 +232,16 @@ def add():
                                     {form.estimated_hours(class_="form-control")}
                                 </div>
                             </div>
+                            <div class="row">
+                                <div class="col-md-6 mb-3">
+                                    {form.repeat.label(class_="form-label")}
+                                    {form.repeat(class_="form-select")}
+                                </div>
+                                <div class="col-md-6 mb-3">
+                                    {form.repeat_until.label(class_="form-label")}
+                                    {form.repeat_until(class_="form-control")}
+                                </div>
+                            </div>
                             <div class="d-grid">
                                 {form.submit(class_="btn btn-primary btn-lg")}
                             </div>
@@ -163,6 +251,7 @@ def add():
             </div>
         </div>
     </div>
+    {SUBJECT_AUTOCOMPLETE % url_for("tasks.api_subjects")}
 </body>
 </html>
     '''
@@ -184,6 +273,8 @@ def edit(id):
         task.due_date = form.due_date.data
         task.category = form.category.data
         task.updated_at = datetime.utcnow()
+        # The form only accepts due dates from today on
+        task.reschedule()
         
         db.session.commit()
         flash('Task updated successfully!', 'success')
@@ -238,6 +329,17 @@ def edit(id):
 </html>
     '''
 
+@tasks_bp.route('/recurring/<int:recurrence_id>/<occurrence_date>/edit')
+@login_required
+def edit_occurrence(recurrence_id, occurrence_date):
+    """Materialize an occurrence of a recurring task (idempotent) and open its edit page"""
+    day = parse_occurrence_date(occurrence_date)
+    task = materialize_occurrence(current_user.id, recurrence_id, day) if day else None
+    if task is None:
+        abort(404)
+    db.session.commit()
+    return redirect(url_for('tasks.edit', id=task.id))
+
 @tasks_bp.route('/complete/<int:id>', methods=['POST'])
 @login_required
 def complete(id):
@@ -257,6 +359,7 @@ def delete(id):
     """Delete task"""
     task = Task.query.filter_by(id=id, user_id=current_user.id).first_or_404()
     
+    skip_occurrences([(task.recurrence_id, task.occurrence_date)])
     db.session.delete(task)
     db.session.commit()
     
@@ -267,9 +370,14 @@ def delete(id):
 @login_required
 def study_sessions():
     """Study sessions overview"""
-    sessions = StudySession.query.filter_by(
-        user_id=current_user.id
-    ).order_by(StudySession.created_at.desc()).all()
+    try:
+        page = _session_page(request.args)
+    except InvalidCursor:
+        abort(400)
+    sessions = page.items
+    load_more = ''
+    if page.has_more:
+        load_more = f'<div class="text-center mb-4"><a id="load-more" class="btn btn-outline-primary" href="{url_for("tasks.study_sessions", cursor=page.next_cursor)}">Load more</a></div>'
     
     # Simple study sessions HTML
     return f'''
@@ -295,12 +403,14 @@ def study_sessions():
             <a href="{url_for('tasks.add_session')}" class="btn btn-primary">Log Session</a>
         </div>
         
-        <div class="row">
+        <div class="row" id="page-items">
             {''.join([f'<div class="col-md-6 mb-3"><div class="card"><div class="card-body"><h5>{session.subject}</h5><p>Duration: {session.duration} min | Focus: {session.focus_rating}/10</p><small>{session.date}</small></div></div></div>' for session in sessions])}
         </div>
+        {load_more}
         
         {"<p class='text-center text-muted'>No study sessions yet.</p>" if not sessions else ""}
     </div>
+    {LOAD_MORE_SCRIPT}
 </body>
 </html>
     '''
@@ -312,9 +422,9 @@ def add_session():
     form = StudySessionForm()
     
     # Populate task choices
-    tasks = Task.query.filter_by(
-        user_id=current_user.id,
-        status__in=['pending', 'in_progress']
+    tasks = Task.query.filter(
+        Task.user_id == current_user.id,
+        OPEN_TASK
     ).all()
     form.task_id.choices = [(0, 'No specific task')] + [(t.id, t.title) for t in tasks]
     
@@ -366,7 +476,7 @@ def add_session():
                             {form.hidden_tag()}
                             <div class="mb-3">
                                 {form.subject.label(class_="form-label")}
-                                {form.subject(class_="form-control")}
+                                {form.subject(class_="form-control", list="subject-suggestions", autocomplete="off")}
                             </div>
                             <div class="mb-3">
                                 {form.duration.label(class_="form-label")}
@@ -385,37 +495,226 @@ def add_session():
             </div>
         </div>
     </div>
+    {SUBJECT_AUTOCOMPLETE % url_for("tasks.api_subjects")}
 </body>
 </html>
     '''
 
+def _parse_calendar_date(value):
+    """FullCalendar sends ISO dates or datetimes; only the date part matters"""
+    return date.fromisoformat(value[:10]) if value else None
+
 @tasks_bp.route('/api/tasks')
 @login_required
 def api_tasks():
-    """API endpoint for tasks (for calendar view)"""
-    tasks = Task.query.filter_by(user_id=current_user.id).all()
-    
-    events = []
-    for task in tasks:
-        events.append({
-            'id': task.id,
-            'title': task.title,
-            'start': task.due_date.isoformat(),
-            'backgroundColor': f'var(--bs-{task.priority_color})',
-            'borderColor': f'var(--bs-{task.priority_color})',
-            'extendedProps': {
-                'subject': task.subject,
-                'priority': task.priority,
-                'status': task.status
-            }
+    """API endpoint for tasks (for calendar view)
+
+    Restricted to due dates in [start, end) when FullCalendar passes its
+    visible window, and answered with 304 when the window is unchanged.
+    Recurring tasks are expanded into the window (up to RECURRENCE_HORIZON_DAYS
+    ahead when it is open-ended).
+    """
+    try:
+        start = _parse_calendar_date(request.args.get('start'))
+        end = _parse_calendar_date(request.args.get('end'))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Invalid start or end date'}), 400
+    
+    window = [Task.user_id == current_user.id]
+    if start:
+        window.append(Task.due_date >= start)
+    if end:
+        window.append(Task.due_date < end)
+    
+    expand_start = start or date.today()
+    expand_end = end or expansion_end(expand_start)
+    
+    # Any insert, update or delete in the window (or of a recurrence rule) changes the count, id sum or latest update
+    state = db.session.execute(
+        db.select(func.count(Task.id), func.sum(Task.id), func.max(Task.updated_at),
+                  *recurrence_state(current_user.id)).where(*window)
+    ).one()
+    etag = hashlib.sha1(
+        f'{current_user.id}:{start}:{end}:{expand_start}:{expand_end}:{tuple(state)}'.encode()
+    ).hexdigest()
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        rows = db.session.execute(
+            db.select(Task.id, Task.title, Task.due_date, Task.subject, Task.priority, Task.status)
+            .where(*window).order_by(Task.due_date, Task.id)
+        )
+        
+        events = []
+        with timing('serialize'):
+            for task_id, title, due_date, subject, priority, status in rows:
+                color = f'var(--bs-{PRIORITY_COLORS.get(priority, "secondary")})'
+                events.append({
+                    'id': task_id,
+                    'title': title,
+                    'start': due_date.isoformat(),
+                    'backgroundColor': color,
+                    'borderColor': color,
+                    'extendedProps': {
+                        'subject': subject,
+                        'priority': priority,
+                        'status': status
+                    }
+                })
+            for occurrence in expand_occurrences(current_user.id, expand_start, expand_end):
+                color = f'var(--bs-{PRIORITY_COLORS.get(occurrence.priority, "secondary")})'
+                events.append({
+                    'id': occurrence.key,
+                    'title': occurrence.title,
+                    'start': occurrence.due_date.isoformat(),
+                    'backgroundColor': color,
+                    'borderColor': color,
+                    'extendedProps': {
+                        'subject': occurrence.subject,
+                        'priority': occurrence.priority,
+                        'status': occurrence.status,
+                        'recurrence_id': occurrence.recurrence_id,
+                        'occurrence_date': occurrence.occurrence_date.isoformat()
+                    }
+                })
+        response = jsonify(events)
+    
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+@tasks_bp.route('/api/list')
+@login_required
+def api_list_tasks():
+    """Paginated tasks (same filters as the tasks page); pass next_cursor back as ?cursor="""
+    try:
+        page = _task_page(request.args, TASK_COLUMNS)
+    except InvalidCursor:
+        return jsonify({'success': False, 'message': 'Invalid cursor'}), 400
+    
+    with timing('serialize'):
+        tasks = serialize_tasks(page.items)
+    
+    return jsonify({
+        'success': True,
+        'tasks': tasks,
+        'next_cursor': page.next_cursor,
+        'has_more': page.has_more
+    })
+
+@tasks_bp.route('/api/study-sessions')
+@login_required
+def api_list_sessions():
+    """Paginated study sessions, newest first"""
+    try:
+        page = _session_page(request.args, SESSION_COLUMNS)
+    except InvalidCursor:
+        return jsonify({'success': False, 'message': 'Invalid cursor'}), 400
+    
+    with timing('serialize'):
+        sessions = serialize_sessions(page.items)
+    
+    return jsonify({
+        'success': True,
+        'sessions': sessions,
+        'next_cursor': page.next_cursor,
+        'has_more': page.has_more
+    })
+
+@tasks_bp.route('/api/search')
+@login_required
+def api_search():
+    """Full-text search over task title, description and subject (terms match as prefixes)"""
+    query = request.args.get('q', '').strip()
+    limit = page_size(request.args, 20, current_app.config['MAX_PAGE_SIZE'])
+    
+    results = []
+    for task_id, title, subject, priority, status, due_date, rank in search_tasks(current_user.id, query, limit):
+        results.append({
+            'id': task_id,
+            'title': title,
+            'subject': subject,
+            'priority': priority,
+            'status': status,
+            'due_date': due_date.isoformat(),
+            'rank': rank
         })
     
-    return jsonify(events)
+    return jsonify({
+        'success': True,
+        'query': query,
+        'results': results
+    })
+
+@tasks_bp.route('/api/subjects')
+@login_required
+def api_subjects():
+    """Subject autocomplete: the user's subjects starting with q, served from the in-memory index"""
+    query = request.args.get('q', '')
+    limit = page_size(request.args, 10, current_app.config['MAX_PAGE_SIZE'])
+
+    return jsonify({
+        'success': True,
+        'query': query,
+        'subjects': complete_subjects(current_user.id, query, limit)
+    })
+
+@tasks_bp.route('/api/calendar-feed')
+@login_required
+def api_calendar_feed():
+    """Subscription URL of the user's iCalendar feed"""
+    return jsonify({
+        'success': True,
+        'url': url_for('tasks.ics_feed', token=issue_feed_token(current_app, current_user), _external=True)
+    })
+
+@tasks_bp.route('/feed/<token>.ics')
+def ics_feed(token):
+    """Tokenized iCalendar feed of the user's deadlines (the token is the credential)"""
+    identity = read_feed_token(current_app, token)
+    if identity is None:
+        abort(404)
+    user_id, version = identity
+    
+    # Steady state: this one indexed query, then 304
+    state = feed_state(user_id)
+    if state is None or state.session_version != version or not state.is_active:
+        abort(404)
+    window_start = feed_window_start()
+    etag = feed_etag(user_id, state, window_start)
+    last_updated = feed_last_modified(state)
+    
+    # ETag only: deletions and the moving history window change the feed without
+    # advancing MAX(updated_at), so If-Modified-Since alone cannot be trusted
+    if not is_resource_modified(request.environ, etag=etag):
+        response = current_app.response_class(status=304)
+    else:
+        cache = current_app.extensions['ics_feed_cache']
+        body = cache.get(user_id, etag)
+        if body is None:
+            host = request.host.split(':')[0]
+            
+            def generate():
+                parts = []
+                for chunk in serialize_feed(feed_rows(user_id, window_start), host):
+                    parts.append(chunk)
+                    yield chunk
+                cache.put(user_id, etag, ''.join(parts).encode())
+            body = stream_with_context(generate())
+        response = current_app.response_class(body, mimetype='text/calendar')
+    
+    response.set_etag(etag)
+    if last_updated is not None:
+        response.last_modified = last_updated
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
 
 @tasks_bp.route('/calendar')
 @login_required
 def calendar():
     """Calendar view of tasks"""
+    feed_url = url_for('tasks.ics_feed', token=issue_feed_token(current_app, current_user), _external=True)
+    
     # Simple calendar HTML
     return f'''
 <!DOCTYPE html>
@@ -436,6 +735,7 @@ def calendar():
         <div class="card">
             <div class="card-body">
                 <p class="text-center text-muted">Calendar view coming soon!</p>
+                <p class="text-center">Subscribe in your calendar app: <code>{feed_url}</code></p>
                 <div class="text-center">
                     <a href="{url_for('tasks.index')}" class="btn btn-primary">View Tasks List</a>
                 </div>
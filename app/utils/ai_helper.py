@@ -1,7 +1,8 @@
 import os
-import requests
+import time
 from datetime import datetime, timedelta
 from typing import List, Dict
+from app.utils.metrics import observe_ai_call
 
 def get_study_recommendations(recent_sessions, pending_tasks) -> List[str]:
     """
@@ -23,6 +24,9 @@ def get_openai_recommendations(recent_sessions, pending_tasks) -> List[str]:
     if not api_key:
         return None
     
+    # Imported lazily so workers without an API key never pay for it
+    import requests
+    
     try:
         # Prepare data for AI analysis
         session_data = []
@@ -75,12 +79,18 @@ def get_openai_recommendations(recent_sessions, pending_tasks) -> List[str]:
             'temperature': 0.7
         }
         
-        response = requests.post(
-            'https://api.openai.com/v1/chat/completions',
-            headers=headers,
-            json=data,
-            timeout=10
-        )
+        started = time.perf_counter()
+        try:
+            response = requests.post(
+                'https://api.openai.com/v1/chat/completions',
+                headers=headers,
+                json=data,
+                timeout=10
+            )
+        except requests.RequestException:
+            observe_ai_call(time.perf_counter() - started, 'openai', 'error')
+            raise
+        observe_ai_call(time.perf_counter() - started, 'openai', str(response.status_code))
         
         if response.status_code == 200:
             result = response.json()
@@ -158,49 +168,179 @@ def get_rule_based_recommendations(recent_sessions, pending_tasks) -> List[str]:
     
     return recommendations[:5]  # Return max 5 recommendations
 
+class RunningStats:
+    """Online count/mean/variance/min/max using Welford's algorithm"""
+    __slots__ = ('count', 'mean', 'm2', 'min', 'max')
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+    
+    def add(self, value):
+        """Fold a single observation into the running statistics"""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+    
+    def merge(self, other):
+        """Combine another RunningStats into this one (Chan et al. parallel update)"""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return self
+        
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+    
+    @property
+    def variance(self):
+        """Population variance of the observations seen so far"""
+        return self.m2 / self.count if self.count else 0.0
+    
+    @property
+    def stddev(self):
+        """Population standard deviation"""
+        return self.variance ** 0.5
+    
+    def to_dict(self):
+        """Convert statistics to a plain dictionary"""
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'variance': self.variance,
+            'stddev': self.stddev,
+            'min': self.min,
+            'max': self.max
+        }
+
+class ProductivityAccumulator:
+    """Mergeable per-weekday and per-hour focus statistics in constant memory"""
+    
+    def __init__(self):
+        self.overall = RunningStats()
+        self.by_weekday = {}
+        self.by_hour = {}
+    
+    def add(self, session_date, focus_rating, start_time=None):
+        """Fold one session (date, focus rating, optional start datetime) into the totals"""
+        if focus_rating is None:
+            return
+        self.overall.add(focus_rating)
+        
+        weekday = session_date.weekday()  # 0 = Monday, 6 = Sunday
+        if weekday not in self.by_weekday:
+            self.by_weekday[weekday] = RunningStats()
+        self.by_weekday[weekday].add(focus_rating)
+        
+        if start_time is not None:
+            hour = start_time.hour
+            if hour not in self.by_hour:
+                self.by_hour[hour] = RunningStats()
+            self.by_hour[hour].add(focus_rating)
+    
+    def add_session(self, session):
+        """Fold a StudySession instance or a (date, focus_rating, start_time) row"""
+        if hasattr(session, 'focus_rating'):
+            self.add(session.date, session.focus_rating, getattr(session, 'start_time', None))
+        else:
+            self.add(*session)
+    
+    def consume(self, sessions):
+        """Fold an iterable of sessions or rows, e.g. a yield_per stream"""
+        for session in sessions:
+            self.add_session(session)
+        return self
+    
+    def merge(self, other):
+        """Combine partial results from another accumulator"""
+        self.overall.merge(other.overall)
+        for buckets, other_buckets in ((self.by_weekday, other.by_weekday), (self.by_hour, other.by_hour)):
+            for key, stats in other_buckets.items():
+                if key not in buckets:
+                    buckets[key] = RunningStats()
+                buckets[key].merge(stats)
+        return self
+    
+    def result(self) -> Dict:
+        """Summarise the accumulated statistics"""
+        if self.overall.count == 0:
+            return {}
+        
+        weekday_avg = {day: stats.mean for day, stats in self.by_weekday.items()}
+        hourly_avg = {hour: stats.mean for hour, stats in self.by_hour.items()}
+        
+        return {
+            'weekday_performance': weekday_avg,
+            'weekday_stats': {day: stats.to_dict() for day, stats in self.by_weekday.items()},
+            'hourly_performance': hourly_avg,
+            'hourly_stats': {hour: stats.to_dict() for hour, stats in self.by_hour.items()},
+            'best_day': max(weekday_avg, key=weekday_avg.get) if weekday_avg else None,
+            'worst_day': min(weekday_avg, key=weekday_avg.get) if weekday_avg else None,
+            'best_hour': max(hourly_avg, key=hourly_avg.get) if hourly_avg else None,
+            'total_sessions': self.overall.count,
+            'avg_focus': self.overall.mean,
+            'focus_stddev': self.overall.stddev
+        }
+
+def stream_productivity_rows(user_id, start_date=None, end_date=None, batch_size=1000):
+    """Stream (date, focus_rating, start_time) rows for a user without loading them all"""
+    from app import db
+    from app.models import StudySession
+    
+    query = db.select(
+        StudySession.date, StudySession.focus_rating, StudySession.start_time
+    ).where(StudySession.user_id == user_id)
+    if start_date:
+        query = query.where(StudySession.date >= start_date)
+    if end_date:
+        query = query.where(StudySession.date <= end_date)
+    
+    return db.session.execute(query.execution_options(yield_per=batch_size))
+
 def analyze_productivity_patterns(user_sessions) -> Dict:
-    """Analyze user's productivity patterns"""
+    """Analyze user's productivity patterns
+    
+    Accepts StudySession objects or (date, focus_rating, start_time) rows, in a list
+    or a streaming cursor such as stream_productivity_rows().
+    """
     if not user_sessions:
         return {}
     
-    # Group sessions by day of week
-    weekday_performance = {}
-    for session in user_sessions:
-        weekday = session.date.weekday()  # 0 = Monday, 6 = Sunday
-        if weekday not in weekday_performance:
-            weekday_performance[weekday] = []
-        weekday_performance[weekday].append(session.focus_rating)
-    
-    # Calculate average focus by weekday
-    weekday_avg = {}
-    for day, ratings in weekday_performance.items():
-        weekday_avg[day] = sum(ratings) / len(ratings)
-    
-    # Find best and worst days
-    best_day = max(weekday_avg, key=weekday_avg.get) if weekday_avg else None
-    worst_day = min(weekday_avg, key=weekday_avg.get) if weekday_avg else None
-    
-    # Time of day analysis (if we had time data)
-    # This could be expanded with more detailed time tracking
-    
-    return {
-        'weekday_performance': weekday_avg,
-        'best_day': best_day,
-        'worst_day': worst_day,
-        'total_sessions': len(user_sessions),
-        'avg_focus': sum(s.focus_rating for s in user_sessions) / len(user_sessions)
-    }
+    return ProductivityAccumulator().consume(user_sessions).result()
 
 def suggest_study_schedule(pending_tasks, available_hours_per_day=4) -> List[Dict]:
-    """Suggest an optimal study schedule based on pending tasks"""
+    """Suggest an optimal study schedule based on pending tasks
+
+    Input already in PRIORITY_ORDER (priority, due date, difficulty) costs a
+    single linear pass of the sort.
+    """
+    from app.models.task import PRIORITY_RANKS
+    
     if not pending_tasks:
         return []
     
     # Sort tasks by priority and due date
     sorted_tasks = sorted(pending_tasks, key=lambda t: (
-        {'urgent': 0, 'high': 1, 'medium': 2, 'low': 3}[t.priority],
+        -PRIORITY_RANKS.get(t.priority, 0),
         t.due_date,
-        -t.difficulty
+        -(t.difficulty or 0),
+        t.id
     ))
     
     schedule = []
@@ -0,0 +1,109 @@
+"""
+Bulk task operations
+
+Applies one operation to many of a user's tasks with a fixed number of
+statements: one projection to classify the ids, one UPDATE (or DELETE) with
+RETURNING for the rows actually changed, and for completions one aggregate
+UserPoints update. The per-call path (api.toggle_task_status) costs a task
+load, a UserPoints load and a commit per task.
+"""
+
+from datetime import datetime
+from sqlalchemy import case, func
+from app import db
+from app.models import Task, StudySession, User, UserPoints
+from app.models.task import POINTS_BY_PRIORITY
+from app.utils.overdue import user_today
+from app.utils.recurrence import skip_occurrences
+
+OPERATIONS = ('complete', 'reopen', 'set_priority', 'delete')
+PRIORITIES = ('low', 'medium', 'high', 'urgent')
+
+class BulkOperationError(ValueError):
+    """Raised for unknown operations or invalid values"""
+
+def _points_expression():
+    """SQL equivalent of completion_points()"""
+    return case(POINTS_BY_PRIORITY, value=Task.priority, else_=20) + func.coalesce(Task.difficulty, 0) * 5
+
+def apply_bulk_operation(user_id, task_ids, operation, value=None):
+    """Apply `operation` to the user's tasks in `task_ids` and commit
+
+    Returns (results, points_earned) where results lists one
+    {'id', 'result'[, 'points_earned']} dict per requested id, in request
+    order; result is 'updated', 'unchanged' or 'not_found'.
+    """
+    if operation not in OPERATIONS:
+        raise BulkOperationError(f'Unknown operation: {operation}')
+    if operation == 'set_priority' and value not in PRIORITIES:
+        raise BulkOperationError('Invalid priority')
+
+    task_ids = list(dict.fromkeys(task_ids))
+    owned = set(db.session.execute(
+        db.select(Task.id).where(Task.user_id == user_id, Task.id.in_(task_ids))
+    ).scalars())
+
+    now = datetime.utcnow()
+    scope = [Task.user_id == user_id, Task.id.in_(sorted(owned))]
+    points = {}
+    if not owned:
+        changed = []
+    elif operation == 'delete':
+        db.session.execute(
+            db.update(StudySession).where(StudySession.task_id.in_(sorted(owned))).values(task_id=None),
+            execution_options={'synchronize_session': False}
+        )
+        rows = db.session.execute(
+            db.delete(Task).where(*scope).returning(Task.id, Task.recurrence_id, Task.occurrence_date),
+            execution_options={'synchronize_session': False}
+        ).all()
+        changed = [task_id for task_id, _, _ in rows]
+        skip_occurrences((recurrence_id, occurrence_date) for _, recurrence_id, occurrence_date in rows)
+    else:
+        if operation == 'complete':
+            statement = db.update(Task).where(*scope, Task.status != 'completed').values(
+                status='completed', pre_overdue_status=None, completed_at=now, updated_at=now,
+                points_awarded=_points_expression()
+            ).returning(Task.id, Task.points_awarded)
+        elif operation == 'reopen':
+            today = user_today(db.session.execute(db.select(User.timezone).where(User.id == user_id)).scalar())
+            reopened = 'pending' if today is None else case((Task.due_date < today, 'overdue'), else_='pending')
+            statement = db.update(Task).where(*scope, Task.status == 'completed').values(
+                status=reopened,
+                completed_at=None, updated_at=now
+            ).returning(Task.id, Task.points_awarded)
+        else:
+            statement = db.update(Task).where(*scope, Task.priority != value).values(
+                priority=value, updated_at=now
+            ).returning(Task.id, Task.points_awarded)
+        rows = db.session.execute(statement, execution_options={'synchronize_session': False}).all()
+        changed = [task_id for task_id, _ in rows]
+        if operation == 'complete':
+            points = dict(rows)
+
+    points_earned = sum(points.values())
+    if points:
+        updated = db.session.execute(
+            db.update(UserPoints).where(UserPoints.user_id == user_id).values(
+                total_points=UserPoints.total_points + points_earned,
+                tasks_completed=UserPoints.tasks_completed + len(points)
+            ),
+            execution_options={'synchronize_session': False}
+        ).rowcount
+        if not updated:
+            db.session.add(UserPoints(user_id=user_id, total_points=points_earned, tasks_completed=len(points)))
+    db.session.commit()
+
+    changed = set(changed)
+    results = []
+    for task_id in task_ids:
+        if task_id not in owned:
+            results.append({'id': task_id, 'result': 'not_found'})
+        elif task_id in changed:
+            result = {'id': task_id, 'result': 'updated'}
+            if task_id in points:
+                result['points_earned'] = points[task_id]
+            results.append(result)
+        else:
+            results.append({'id': task_id, 'result': 'unchanged'})
+    return results, points_earned
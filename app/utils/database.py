@@ -0,0 +1,61 @@
+"""
+Database engine profiles
+
+PostgreSQL gets explicit pool sizing with pre-ping and recycling. SQLite gets
+WAL journaling and tuned pragmas applied on every new DBAPI connection, so a
+commit from a Pomodoro completion no longer blocks dashboard readers.
+"""
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+def backend_name(uri):
+    """Return the backend of a database URI, e.g. 'sqlite' or 'postgresql'"""
+    return make_url(uri).get_backend_name()
+
+def build_engine_options(config):
+    """Build SQLALCHEMY_ENGINE_OPTIONS for the configured backend"""
+    backend = backend_name(config['SQLALCHEMY_DATABASE_URI'])
+
+    if backend == 'postgresql':
+        return {
+            'pool_size': config.get('DB_POOL_SIZE', 10),
+            'max_overflow': config.get('DB_MAX_OVERFLOW', 20),
+            'pool_recycle': config.get('DB_POOL_RECYCLE', 1800),
+            'pool_timeout': config.get('DB_POOL_TIMEOUT', 30),
+            'pool_pre_ping': config.get('DB_POOL_PRE_PING', True)
+        }
+
+    if backend == 'sqlite':
+        # busy_timeout is also set as a pragma; the driver timeout covers the
+        # window before the pragma runs on a fresh connection
+        return {
+            'connect_args': {'timeout': config.get('SQLITE_BUSY_TIMEOUT', 5000) / 1000}
+        }
+
+    return {}
+
+def install_sqlite_pragmas(engine, config):
+    """Apply journal/synchronous/mmap/busy_timeout pragmas on each new connection"""
+    pragmas = [
+        ('journal_mode', config.get('SQLITE_JOURNAL_MODE', 'WAL')),
+        ('synchronous', config.get('SQLITE_SYNCHRONOUS', 'NORMAL')),
+        ('mmap_size', config.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+        ('busy_timeout', config.get('SQLITE_BUSY_TIMEOUT', 5000))
+    ]
+    pragmas = [(name, value) for name, value in pragmas if value is not None]
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas:
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+    return set_sqlite_pragmas
+
+def configure_engine(app, db):
+    """Attach backend-specific connect hooks to the app's engine"""
+    if backend_name(app.config['SQLALCHEMY_DATABASE_URI']) == 'sqlite':
+        with app.app_context():
+            install_sqlite_pragmas(db.engine, app.config)
@@ -1,6 +1,6 @@
 from flask_wtf import FlaskForm
 from wtforms import StringField, TextAreaField, SelectField, IntegerField, FloatField, DateField, BooleanField, PasswordField, SubmitField
-from wtforms.validators import DataRequired, Length, Email, EqualTo, NumberRange, ValidationError
+from wtforms.validators import DataRequired, Length, Email, EqualTo, NumberRange, Optional, ValidationError
 from datetime import date
 from app.models import User
 
@@ -65,11 +65,25 @@ class TaskForm(FlaskForm):
         ('other', 'Other')
     ], default='assignment')
     
+    # Recurrence (add page only): the due date is the first occurrence
+    repeat = SelectField('Repeat', choices=[
+        ('none', 'Does not repeat'),
+        ('daily', 'Daily'),
+        ('weekly', 'Weekly'),
+        ('monthly', 'Monthly')
+    ], default='none')
+    
+    repeat_until = DateField('Repeat Until', validators=[Optional()])
+    
     submit = SubmitField('Save Task')
     
     def validate_due_date(self, due_date):
         if due_date.data < date.today():
             raise ValidationError('Due date cannot be in the past.')
+    
+    def validate_repeat_until(self, repeat_until):
+        if repeat_until.data and self.due_date.data and repeat_until.data < self.due_date.data:
+            raise ValidationError('Repeat until must be on or after the due date.')
 
 class StudySessionForm(FlaskForm):
     """Study session logging form"""
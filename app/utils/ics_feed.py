@@ -0,0 +1,165 @@
+"""
+Per-user iCalendar subscription feed
+
+Calendar clients poll the feed URL every few minutes, so the steady state has
+to be cheap: one query reads the user's session version plus MAX(updated_at)
+and COUNT over the (user_id, updated_at) index (and over the user's recurrence
+rules), which yields the ETag and Last-Modified. Unchanged feeds answer 304, and changed feeds are streamed
+once and then served from a small in-process cache of rendered bodies.
+"""
+
+import hashlib
+import heapq
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from flask import current_app
+from itsdangerous import BadSignature, URLSafeSerializer
+from app import db
+from app.utils.recurrence import expand_occurrences, expansion_end, occurrence_key, recurrence_state
+
+TOKEN_SALT = 'studyflow-ics-feed'
+ICS_PRIORITIES = {'urgent': 1, 'high': 3, 'medium': 5, 'low': 9}
+
+def _serializer(app):
+    return URLSafeSerializer(app.config['SECRET_KEY'], salt=TOKEN_SALT)
+
+def issue_feed_token(app, user):
+    """Token for the user's feed URL; a password change (session_version bump) revokes it"""
+    return _serializer(app).dumps([user.id, user.session_version])
+
+def read_feed_token(app, token):
+    """Return (user_id, session_version), or None for a forged token"""
+    try:
+        user_id, version = _serializer(app).loads(token)
+        return int(user_id), int(version)
+    except (BadSignature, TypeError, ValueError):
+        return None
+
+def feed_state(user_id):
+    """(session_version, is_active, last_updated, task_count, recurrence_count,
+    recurrence_updated), or None if the user is gone"""
+    from app.models import User, Task
+    return db.session.execute(
+        db.select(User.session_version, User.is_active, db.func.max(Task.updated_at), db.func.count(Task.id),
+                  *recurrence_state(user_id))
+        .select_from(User)
+        .outerjoin(Task, Task.user_id == User.id)
+        .where(User.id == user_id)
+        .group_by(User.id)
+    ).first()
+
+def feed_window_start(today=None):
+    """Oldest due date included in the feed"""
+    days = current_app.config.get('ICS_FEED_HISTORY_DAYS', 90)
+    return (today or date.today()) - timedelta(days=days)
+
+def feed_etag(user_id, state, window_start):
+    """ETag from a feed_state row (everything after the session columns) and the window"""
+    return hashlib.sha1(f'{user_id}:{tuple(state[2:])}:{window_start}'.encode()).hexdigest()
+
+def feed_last_modified(state):
+    """Latest task or recurrence update, or None for an empty feed"""
+    return max((value for value in (state[2], state[5]) if value is not None), default=None)
+
+def _escape(value):
+    return (value.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+def _fold(line):
+    """Fold content lines at 75 octets (RFC 5545 3.1)"""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts, chunk = [], b''
+    for char in line:
+        char_bytes = char.encode()
+        if len(chunk) + len(char_bytes) > (75 if not parts else 74):
+            parts.append(chunk.decode())
+            chunk = b''
+        chunk += char_bytes
+    parts.append(chunk.decode())
+    return '\r\n '.join(parts) + '\r\n'
+
+def serialize_feed(rows, host):
+    """Yield the calendar line by line from (uid, title, description, subject,
+    priority, status, due_date, updated_at) rows, one all-day VEVENT per task"""
+    yield 'BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//StudyFlow//Task Feed//EN\r\n'
+    yield 'CALSCALE:GREGORIAN\r\nX-WR-CALNAME:StudyFlow Deadlines\r\n'
+    for uid, title, description, subject, priority, status, due_date, updated_at in rows:
+        stamp = (updated_at or datetime.utcnow()).strftime('%Y%m%dT%H%M%SZ')
+        summary = f'{"✓ " if status == "completed" else ""}{title} ({subject})'
+        lines = [
+            'BEGIN:VEVENT',
+            f'UID:{uid}@{host}',
+            f'DTSTAMP:{stamp}',
+            f'LAST-MODIFIED:{stamp}',
+            f'DTSTART;VALUE=DATE:{due_date.strftime("%Y%m%d")}',
+            f'DTEND;VALUE=DATE:{(due_date + timedelta(days=1)).strftime("%Y%m%d")}',
+            f'SUMMARY:{_escape(summary)}',
+            f'CATEGORIES:{_escape(subject)}',
+            f'PRIORITY:{ICS_PRIORITIES.get(priority, 0)}',
+            'TRANSP:TRANSPARENT'
+        ]
+        if description:
+            lines.append(f'DESCRIPTION:{_escape(description)}')
+        lines.append('END:VEVENT')
+        yield ''.join(_fold(line) for line in lines)
+    yield 'END:VCALENDAR\r\n'
+
+def feed_rows(user_id, window_start, batch_size=500):
+    """Stream the feed rows: projected tasks merged by date with expanded recurrences
+
+    Occurrences keep their UID once materialized, so calendar clients update
+    the event instead of replacing it.
+    """
+    from app.models import Task
+    tasks = db.session.execute(
+        db.select(Task.id, Task.recurrence_id, Task.occurrence_date, Task.title, Task.description,
+                  Task.subject, Task.priority, Task.status, Task.due_date, Task.updated_at)
+        .where(Task.user_id == user_id, Task.due_date >= window_start)
+        .order_by(Task.due_date, Task.id)
+        .execution_options(yield_per=batch_size)
+    )
+    task_rows = (
+        (f'task-{occurrence_key(recurrence_id, occurrence_date) if recurrence_id else task_id}', *fields)
+        for task_id, recurrence_id, occurrence_date, *fields in tasks
+    )
+    occurrence_rows = [
+        (f'task-{occurrence.key}', occurrence.title, occurrence.description, occurrence.subject,
+         occurrence.priority, occurrence.status, occurrence.due_date, occurrence.updated_at)
+        for occurrence in expand_occurrences(user_id, window_start, expansion_end(date.today()))
+    ]
+    return heapq.merge(task_rows, occurrence_rows, key=lambda row: row[6])
+
+class FeedCache:
+    """Bounded LRU of rendered feed bodies keyed by user id, validated by ETag"""
+
+    def __init__(self, max_entries=1000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id, etag):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] != etag:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, user_id, etag, body):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[user_id] = (etag, body)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+def init_feed_cache(app):
+    app.extensions['ics_feed_cache'] = FeedCache(app.config.get('ICS_FEED_CACHE_SIZE', 1000))
@@ -0,0 +1,164 @@
+"""
+Identity cache for Flask-Login
+
+Keeps a lightweight snapshot of each user's columns for a short TTL so that
+authenticated requests (notably the JSON polls from static/js/app.js) do not
+need a users query. Anything outside the snapshot (relationships, helper
+methods) transparently loads the real User for the current request.
+"""
+
+import threading
+import time
+from flask import current_app, has_app_context, session
+from app import db
+
+SESSION_VERSION_KEY = '_user_version'
+
+class UserSnapshot:
+    """Detached, read-only stand-in for the logged in User"""
+
+    def __init__(self, data, user=None):
+        self.__dict__.update(data)
+        self.__dict__['_user'] = user
+
+    def __getattr__(self, name):
+        # Only reached for attributes not in the snapshot
+        user = self.__dict__['_user']
+        if user is None:
+            from app.models import User
+            user = self.__dict__['_user'] = db.session.get(User, self.__dict__['id'])
+        return getattr(user, name)
+
+    @property
+    def is_authenticated(self):
+        return bool(self.__dict__['is_active'])
+
+    @property
+    def is_anonymous(self):
+        return False
+
+    @property
+    def full_name(self):
+        return f"{self.first_name} {self.last_name}"
+
+    def get_id(self):
+        return f"{self.__dict__['id']}:{self.__dict__['session_version'] or 0}"
+
+    def __eq__(self, other):
+        return hasattr(other, 'get_id') and self.get_id() == other.get_id()
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __repr__(self):
+        return f'<UserSnapshot {self.username}>'
+
+class IdentityCache:
+    """Per-app TTL cache of user snapshots keyed by user id"""
+
+    def __init__(self, ttl=30, max_size=10000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id, session_version=None):
+        """Return cached snapshot data, or None if missing, expired or stale"""
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] < time.monotonic():
+            self.misses += 1
+            return None
+        if session_version is not None and entry[1]['session_version'] != session_version:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def put(self, user_id, data):
+        """Store snapshot data for user_id"""
+        with self._lock:
+            if len(self._entries) >= self.max_size:
+                self._entries.clear()
+            self._entries[user_id] = (time.monotonic() + self.ttl, data)
+
+    def invalidate(self, user_id):
+        """Drop a user's snapshot (after profile or password changes)"""
+        self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+def snapshot_data(user):
+    """Copy the user's column values, leaving out the password hash"""
+    return {
+        column.key: getattr(user, column.key)
+        for column in user.__table__.columns
+        if column.key != 'password_hash'
+    }
+
+def init_identity_cache(app):
+    """Attach an identity cache configured from USER_CACHE_TTL"""
+    app.extensions['identity_cache'] = IdentityCache(
+        ttl=app.config.get('USER_CACHE_TTL', 30),
+        max_size=app.config.get('USER_CACHE_MAX_SIZE', 10000)
+    )
+
+def get_identity_cache():
+    """Return the current app's identity cache, if enabled"""
+    if not has_app_context():
+        return None
+    cache = current_app.extensions.get('identity_cache')
+    return cache if cache is not None and cache.ttl > 0 else None
+
+def remember_session_version(user):
+    """Record the user's session version in the Flask session at login"""
+    session[SESSION_VERSION_KEY] = [user.id, user.session_version]
+
+def invalidate_user(user_id):
+    """Drop a user from the identity cache"""
+    cache = get_identity_cache()
+    if cache is not None:
+        cache.invalidate(user_id)
+
+def parse_user_id(identifier):
+    """Split a Flask-Login identifier ("id:session_version", or a legacy bare id)"""
+    user_id, _, version = str(identifier).partition(':')
+    return int(user_id), int(version) if version else None
+
+def load_cached_user(user_id, session_version=None):
+    """Load the user for Flask-Login, preferring the identity cache
+
+    session_version comes from the identifier (sessions and remember-me
+    cookies alike). Bare-id identifiers fall back to the version recorded in
+    the session at login; with neither, the identifier predates versioning
+    (e.g. an old remember-me cookie) and is refused.
+    """
+    from app.models import User
+
+    if session_version is None:
+        stored = session.get(SESSION_VERSION_KEY)
+        if not stored or stored[0] != user_id:
+            return None
+        session_version = stored[1]
+
+    cache = get_identity_cache()
+    if cache is not None:
+        data = cache.get(user_id, session_version)
+        if data is not None:
+            return UserSnapshot(data)
+
+    user = db.session.get(User, user_id)
+    if user is None:
+        return None
+    if user.session_version != session_version:
+        # Password changed since this session logged in
+        return None
+
+    if cache is None:
+        return user
+    data = snapshot_data(user)
+    cache.put(user_id, data)
+    return UserSnapshot(data, user)
@@ -0,0 +1,165 @@
+"""
+Per-request SQL instrumentation
+
+Hooks SQLAlchemy's before/after_cursor_execute events to count queries and DB
+time for each (sampled) request, keeps the slowest statements, and flags
+statement shapes that repeat many times in one request as likely N+1 patterns.
+Per-endpoint aggregates are exposed through the /debug/sql endpoint.
+"""
+
+import heapq
+import random
+import re
+import threading
+import time
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+_WHITESPACE = re.compile(r'\s+')
+_NAMED_PARAM = re.compile(r'%\(\w+\)s|:\w+\b')
+_PARAM_LIST = re.compile(r'\(\?(?:, ?\?)+\)')
+
+def statement_shape(statement):
+    """Normalise a SQL statement so repeated executions compare equal"""
+    shape = _WHITESPACE.sub(' ', statement).strip()
+    shape = _NAMED_PARAM.sub('?', shape)
+    return _PARAM_LIST.sub('(?)', shape)
+
+class RequestSQLStats:
+    """Queries, DB time and slowest statements for one request"""
+    __slots__ = ('count', 'total_time', 'shapes', 'slowest', 'keep')
+
+    def __init__(self, keep=5):
+        self.count = 0
+        self.total_time = 0.0
+        self.shapes = {}
+        self.slowest = []
+        self.keep = keep
+
+    def record(self, statement, duration):
+        self.count += 1
+        self.total_time += duration
+
+        shape = statement_shape(statement)
+        entry = self.shapes.get(shape)
+        if entry is None:
+            self.shapes[shape] = [1, duration]
+        else:
+            entry[0] += 1
+            entry[1] += duration
+
+        if len(self.slowest) < self.keep:
+            heapq.heappush(self.slowest, (duration, shape))
+        elif duration > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, (duration, shape))
+
+    def repeated_shapes(self, threshold):
+        """Statement shapes executed at least `threshold` times (likely N+1)"""
+        return sorted(
+            ((shape, count, duration) for shape, (count, duration) in self.shapes.items() if count >= threshold),
+            key=lambda item: item[1], reverse=True
+        )
+
+class RouteSQLRegistry:
+    """Thread-safe per-endpoint aggregates of RequestSQLStats"""
+
+    def __init__(self, keep=5):
+        self.keep = keep
+        self._routes = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, stats, n_plus_one_threshold):
+        repeated = stats.repeated_shapes(n_plus_one_threshold)
+        with self._lock:
+            route = self._routes.get(endpoint)
+            if route is None:
+                route = self._routes[endpoint] = {
+                    'endpoint': endpoint, 'requests': 0, 'queries': 0, 'db_time': 0.0,
+                    'max_queries': 0, 'max_db_time': 0.0, 'n_plus_one_requests': 0,
+                    'n_plus_one_shapes': {}, 'slowest': []
+                }
+            route['requests'] += 1
+            route['queries'] += stats.count
+            route['db_time'] += stats.total_time
+            route['max_queries'] = max(route['max_queries'], stats.count)
+            route['max_db_time'] = max(route['max_db_time'], stats.total_time)
+
+            if repeated:
+                route['n_plus_one_requests'] += 1
+                for shape, count, _ in repeated:
+                    route['n_plus_one_shapes'][shape] = max(route['n_plus_one_shapes'].get(shape, 0), count)
+
+            route['slowest'] = heapq.nlargest(self.keep, route['slowest'] + stats.slowest)
+
+    def worst(self, sort_by='db_time', limit=20):
+        """Routes ordered by average DB time (or queries / n_plus_one)"""
+        with self._lock:
+            routes = [dict(route) for route in self._routes.values()]
+
+        for route in routes:
+            route['avg_queries'] = round(route['queries'] / route['requests'], 2)
+            route['avg_db_time_ms'] = round(route['db_time'] / route['requests'] * 1000, 3)
+            route['max_db_time_ms'] = round(route.pop('max_db_time') * 1000, 3)
+            route['db_time_ms'] = round(route.pop('db_time') * 1000, 3)
+            route['slowest'] = [{'ms': round(d * 1000, 3), 'statement': s} for d, s in route['slowest']]
+            route['n_plus_one_shapes'] = [
+                {'statement': s, 'max_count': c}
+                for s, c in sorted(route['n_plus_one_shapes'].items(), key=lambda item: -item[1])
+            ]
+
+        keys = {
+            'db_time': 'avg_db_time_ms',
+            'queries': 'avg_queries',
+            'n_plus_one': 'n_plus_one_requests'
+        }
+        routes.sort(key=lambda route: route[keys.get(sort_by, 'avg_db_time_ms')], reverse=True)
+        return routes[:limit]
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+def current_sql_stats():
+    """Return the SQL stats for the current request, if it is being instrumented"""
+    return g.get('_sql_stats') if has_request_context() else None
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_sql_stats() is not None:
+        conn.info.setdefault('_query_start', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_sql_stats()
+    starts = conn.info.get('_query_start')
+    if stats is not None and starts:
+        stats.record(statement, time.perf_counter() - starts.pop())
+
+def init_sql_instrumentation(app, db):
+    """Install cursor hooks and request handlers when SQL_INSTRUMENTATION_SAMPLE_RATE > 0"""
+    sample_rate = app.config.get('SQL_INSTRUMENTATION_SAMPLE_RATE', 0)
+    threshold = app.config.get('SQL_N_PLUS_ONE_THRESHOLD', 5)
+    keep = app.config.get('SQL_SLOWEST_STATEMENTS', 5)
+
+    registry = RouteSQLRegistry(keep=keep)
+    app.extensions['sql_stats'] = registry
+    if sample_rate <= 0:
+        return registry
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(db.engine, 'after_cursor_execute', _after_cursor_execute)
+
+    @app.before_request
+    def start_sql_stats():
+        if sample_rate >= 1 or random.random() < sample_rate:
+            g._sql_stats = RequestSQLStats(keep=keep)
+
+    @app.after_request
+    def record_sql_stats(response):
+        stats = g.pop('_sql_stats', None)
+        if stats is not None and request.endpoint:
+            registry.record(request.endpoint, stats, threshold)
+            for shape, count, _ in stats.repeated_shapes(threshold):
+                app.logger.warning('Possible N+1 in %s: %d x %s', request.endpoint, count, shape[:200])
+        return response
+
+    return registry
@@ -0,0 +1,54 @@
+"""
+Flask JSON provider backed by orjson
+
+Encodes roughly an order of magnitude faster than the stdlib json module on
+large API payloads. Output keeps Flask's conventions: sorted keys, and dates
+rendered by Flask's default hook (orjson passes them through). jsonify() always
+passes either compact separators or indent=2 (debug / compact=False); both map
+to orjson output, so responses are encoded by orjson too. Other stdlib options
+and values orjson cannot encode (e.g. integers beyond 64 bits) fall back to
+the default provider. Without orjson installed the app uses Flask's provider.
+"""
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+class FastJSONProvider(DefaultJSONProvider):
+    """DefaultJSONProvider with orjson for plain, compact and indent=2 calls"""
+
+    def _options(self, kwargs):
+        """orjson options equivalent to the stdlib kwargs, or None if there are none"""
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        for key, value in kwargs.items():
+            if key == 'separators' and tuple(value) == (',', ':'):
+                continue
+            if key == 'indent' and value == 2:
+                options |= orjson.OPT_INDENT_2
+                continue
+            return None
+        return options
+
+    def dumps(self, obj, **kwargs):
+        options = self._options(kwargs)
+        if options is None:
+            return super().dumps(obj, **kwargs)
+        try:
+            return orjson.dumps(obj, default=self.default, option=options).decode()
+        except orjson.JSONEncodeError:
+            return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+def init_json_provider(app):
+    """Install FastJSONProvider when orjson is available and JSON_FAST_PROVIDER is on"""
+    if orjson is not None and app.config.get('JSON_FAST_PROVIDER', True):
+        app.json = FastJSONProvider(app)
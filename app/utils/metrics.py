@@ -0,0 +1,375 @@
+"""
+Prometheus-format application metrics
+
+Each thread records into its own shard, so the request path never takes a
+lock. When a thread exits its shard is folded into a base shard, so servers
+that start a thread per request do not accumulate shards. Scrapes merge the shards of the current process and, when METRICS_DIR
+is set, the JSON snapshots every worker periodically writes there, so any
+gunicorn worker can answer /metrics for the whole deployment. Snapshots left
+behind by exited workers are folded into a single retired snapshot and
+removed, so the directory does not grow with every worker restart.
+"""
+
+import fcntl
+import json
+import os
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from flask import current_app, g, has_app_context, request
+from sqlalchemy import event
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+RETIRED_SNAPSHOT = 'metrics-retired.json'
+DB_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+class _Shard:
+    """Metrics recorded by a single thread"""
+    __slots__ = ('counters', 'gauges', 'histograms')
+
+    def __init__(self):
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+
+    def merge(self, other):
+        """Add other's values into this shard (replacing histogram lists, never mutating them)"""
+        for key, value in other.counters.items():
+            self.counters[key] = self.counters.get(key, 0) + value
+        for key, value in other.gauges.items():
+            self.gauges[key] = self.gauges.get(key, 0) + value
+        for key, entry in other.histograms.items():
+            merged = self.histograms.get(key)
+            self.histograms[key] = list(entry) if merged is None else [a + b for a, b in zip(merged, entry)]
+
+class _ThreadToken:
+    """Held only by a thread's locals; it is collected when the thread exits"""
+    __slots__ = ('__weakref__',)
+
+class MetricsRegistry:
+    """Lock-free (per-thread) counters, gauges and histograms"""
+
+    def __init__(self, directory=None, flush_interval=5.0, prefix='studyflow'):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.prefix = prefix
+        self.descriptions = {}
+        self.collectors = []
+        self._local = threading.local()
+        self._base = _Shard()
+        self._shards = [self._base]
+        self._shards_lock = threading.Lock()
+        self._last_flush = 0.0
+
+    def describe(self, name, kind, help_text, buckets=None):
+        """Declare a metric's type, help text and histogram buckets"""
+        self.descriptions[name] = (kind, help_text, tuple(buckets or DEFAULT_BUCKETS))
+
+    def register_collector(self, collector):
+        """Add a callable returning {(name, labels): value} counter totals at scrape time"""
+        self.collectors.append(collector)
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            token = self._local.token = _ThreadToken()
+            weakref.finalize(token, self._retire_shard, shard).atexit = False
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def _retire_shard(self, shard):
+        """Fold an exited thread's shard into the base shard and drop it"""
+        with self._shards_lock:
+            self._base.merge(shard)
+            self._shards.remove(shard)
+
+    @staticmethod
+    def _key(name, labels):
+        return (name, tuple(sorted(labels.items())))
+
+    def inc(self, name, amount=1, **labels):
+        counters = self._shard().counters
+        key = self._key(name, labels)
+        counters[key] = counters.get(key, 0) + amount
+
+    def gauge_add(self, name, amount, **labels):
+        gauges = self._shard().gauges
+        key = self._key(name, labels)
+        gauges[key] = gauges.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        histograms = self._shard().histograms
+        key = self._key(name, labels)
+        buckets = self.descriptions[name][2]
+        entry = histograms.get(key)
+        if entry is None:
+            # Per-bucket counts, then sum, then count
+            entry = histograms[key] = [0] * len(buckets) + [0.0, 0]
+        index = bisect_left(buckets, value)
+        if index < len(buckets):
+            entry[index] += 1
+        entry[-2] += value
+        entry[-1] += 1
+
+    def snapshot(self):
+        """Merge this process's shards and collectors into a serialisable dict"""
+        counters, gauges, histograms = {}, {}, {}
+        with self._shards_lock:
+            shards = list(self._shards)
+        for shard in shards:
+            for key, value in shard.counters.copy().items():
+                counters[key] = counters.get(key, 0) + value
+            for key, value in shard.gauges.copy().items():
+                gauges[key] = gauges.get(key, 0) + value
+            for key, entry in shard.histograms.copy().items():
+                entry = list(entry)
+                merged = histograms.get(key)
+                histograms[key] = entry if merged is None else [a + b for a, b in zip(merged, entry)]
+        for collector in self.collectors:
+            for key, value in collector().items():
+                counters[key] = counters.get(key, 0) + value
+
+        return {
+            'pid': os.getpid(),
+            'counters': _encode(counters),
+            'gauges': _encode(gauges),
+            'histograms': _encode(histograms)
+        }
+
+    def flush(self, force=False):
+        """Write this process's snapshot to METRICS_DIR (atomically, rate limited)"""
+        now = time.monotonic()
+        if not self.directory or (not force and now - self._last_flush < self.flush_interval):
+            return
+        self._last_flush = now
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f'metrics-{os.getpid()}.json')
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp_path, path)
+
+    def _read_snapshots(self):
+        snapshots = {}
+        for filename in os.listdir(self.directory):
+            if not (filename.startswith('metrics-') and filename.endswith('.json')):
+                continue
+            try:
+                with open(os.path.join(self.directory, filename)) as f:
+                    snapshots[filename] = json.load(f)
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    def _retire_exited_workers(self):
+        """Fold snapshots of exited workers into the retired snapshot and delete them
+
+        Totals from exited workers still count; their gauges do not. A lock
+        file keeps concurrent scrapes from folding the same snapshot twice.
+        """
+        with open(os.path.join(self.directory, '.metrics.lock'), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            snapshots = self._read_snapshots()
+            exited = [name for name, snapshot in snapshots.items()
+                      if name != RETIRED_SNAPSHOT and not _pid_alive(snapshot['pid'])]
+            if not exited:
+                return
+            retired = [snapshots[RETIRED_SNAPSHOT]] if RETIRED_SNAPSHOT in snapshots else []
+            merged = _merge([*retired, *(dict(snapshots[name], gauges=[]) for name in exited)])
+            path = os.path.join(self.directory, RETIRED_SNAPSHOT)
+            with open(f'{path}.tmp', 'w') as f:
+                json.dump({'pid': None, 'counters': _encode(merged['counters']), 'gauges': [],
+                           'histograms': _encode(merged['histograms'])}, f)
+            os.replace(f'{path}.tmp', path)
+            for name in exited:
+                os.remove(os.path.join(self.directory, name))
+
+    def _snapshots(self):
+        if not self.directory:
+            return [self.snapshot()]
+        self.flush(force=True)
+        self._retire_exited_workers()
+        return list(self._read_snapshots().values())
+
+    def collect(self):
+        """Aggregate counters, gauges and histograms across all workers"""
+        return _merge(self._snapshots())
+
+    def render(self):
+        """Render all metrics in the Prometheus text exposition format"""
+        merged = self.collect()
+        series = {}
+        for kind in ('counters', 'gauges', 'histograms'):
+            for (name, labels), value in merged[kind].items():
+                series.setdefault(name, []).append((labels, value))
+
+        lines = []
+        for name in sorted(series):
+            kind, help_text, buckets = self.descriptions.get(name, ('untyped', name, DEFAULT_BUCKETS))
+            full_name = f'{self.prefix}_{name}'
+            lines.append(f'# HELP {full_name} {help_text}')
+            lines.append(f'# TYPE {full_name} {kind}')
+            for labels, value in sorted(series[name]):
+                if kind == 'histogram':
+                    cumulative = 0
+                    for bound, count in zip(buckets, value):
+                        cumulative += count
+                        lines.append(f'{full_name}_bucket{_labels(labels, le=_number(bound))} {cumulative}')
+                    lines.append(f'{full_name}_bucket{_labels(labels, le="+Inf")} {value[-1]}')
+                    lines.append(f'{full_name}_sum{_labels(labels)} {_number(value[-2])}')
+                    lines.append(f'{full_name}_count{_labels(labels)} {value[-1]}')
+                else:
+                    lines.append(f'{full_name}{_labels(labels)} {_number(value)}')
+
+        lines.extend(_cache_ratio_lines(self.prefix, merged['counters']))
+        return '\n'.join(lines) + '\n'
+
+def _encode(values):
+    return [[name, [list(label) for label in labels], value] for (name, labels), value in values.items()]
+
+def _merge(snapshots):
+    """Sum snapshots into {kind: {(name, labels): value}}"""
+    merged = {'counters': {}, 'gauges': {}, 'histograms': {}}
+    for snapshot in snapshots:
+        for kind in merged:
+            for name, labels, value in snapshot[kind]:
+                key = (name, tuple(tuple(label) for label in labels))
+                current = merged[kind].get(key)
+                if current is None:
+                    merged[kind][key] = value
+                elif kind == 'histograms':
+                    merged[kind][key] = [a + b for a, b in zip(current, value)]
+                else:
+                    merged[kind][key] = current + value
+    return merged
+
+def _pid_alive(pid):
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in pairs) + '}'
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def _cache_ratio_lines(prefix, counters):
+    """Derive per-cache hit ratios from the merged hit/miss counters"""
+    totals = {}
+    for (name, labels), value in counters.items():
+        if name != 'cache_requests_total':
+            continue
+        labels = dict(labels)
+        hits_misses = totals.setdefault(labels['cache'], [0, 0])
+        hits_misses[0 if labels['result'] == 'hit' else 1] += value
+
+    if not totals:
+        return []
+    lines = [f'# HELP {prefix}_cache_hit_ratio Cache hits / (hits + misses)',
+             f'# TYPE {prefix}_cache_hit_ratio gauge']
+    for cache, (hits, misses) in sorted(totals.items()):
+        ratio = hits / (hits + misses) if hits + misses else 0.0
+        lines.append(f'{prefix}_cache_hit_ratio{_labels([("cache", cache)])} {ratio!r}')
+    return lines
+
+def get_metrics():
+    """Return the current app's metrics registry, if enabled"""
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('metrics')
+
+def observe_ai_call(duration, provider, outcome):
+    """Record the latency of an outbound AI request"""
+    metrics = get_metrics()
+    if metrics is not None:
+        metrics.observe('ai_request_duration_seconds', duration, provider=provider, outcome=outcome)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_app_context() and '_metrics_db_time' in g:
+        conn.info.setdefault('_metrics_query_start', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('_metrics_query_start')
+    if starts and has_app_context() and '_metrics_db_time' in g:
+        g._metrics_db_time += time.perf_counter() - starts.pop()
+
+def init_metrics(app, db):
+    """Install request/DB hooks and declare StudyFlow's metrics"""
+    if not app.config.get('METRICS_ENABLED', True):
+        return None
+
+    metrics = MetricsRegistry(
+        directory=app.config.get('METRICS_DIR'),
+        flush_interval=app.config.get('METRICS_FLUSH_INTERVAL', 5.0)
+    )
+    app.extensions['metrics'] = metrics
+
+    metrics.describe('requests_total', 'counter', 'HTTP requests by endpoint and status')
+    metrics.describe('request_duration_seconds', 'histogram', 'Request latency by blueprint and endpoint')
+    metrics.describe('request_db_seconds', 'histogram', 'Database time per request', DB_BUCKETS)
+    metrics.describe('requests_in_flight', 'gauge', 'Requests currently being handled')
+    metrics.describe('cache_requests_total', 'counter', 'Cache lookups by cache and result')
+    metrics.describe('ai_request_duration_seconds', 'histogram', 'Outbound AI API call latency')
+
+    def cache_totals():
+        totals = {}
+        for name, extension in (('identity', 'identity_cache'), ('ics_feed', 'ics_feed_cache'),
+                                ('subjects', 'subject_cache')):
+            cache = app.extensions.get(extension)
+            if cache is None:
+                continue
+            totals[('cache_requests_total', (('cache', name), ('result', 'hit')))] = cache.hits
+            totals[('cache_requests_total', (('cache', name), ('result', 'miss')))] = cache.misses
+        return totals
+    metrics.register_collector(cache_totals)
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(db.engine, 'after_cursor_execute', _after_cursor_execute)
+
+    @app.before_request
+    def start_request_metrics():
+        g._metrics_start = time.perf_counter()
+        g._metrics_db_time = 0.0
+        metrics.gauge_add('requests_in_flight', 1)
+
+    @app.after_request
+    def record_response_status(response):
+        g._metrics_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def finish_request_metrics(exc):
+        started = g.pop('_metrics_start', None)
+        if started is None:
+            return
+        metrics.gauge_add('requests_in_flight', -1)
+        endpoint = request.endpoint or 'unknown'
+        blueprint = request.blueprint or 'app'
+        status = g.pop('_metrics_status', 500)
+
+        metrics.inc('requests_total', blueprint=blueprint, endpoint=endpoint,
+                    method=request.method, status=str(status))
+        metrics.observe('request_duration_seconds', time.perf_counter() - started,
+                        blueprint=blueprint, endpoint=endpoint)
+        metrics.observe('request_db_seconds', g.pop('_metrics_db_time', 0.0),
+                        blueprint=blueprint, endpoint=endpoint)
+        metrics.flush()
+
+    return metrics
@@ -0,0 +1,97 @@
+"""
+Scheduled overdue-status maintenance
+
+Tasks are moved to status 'overdue' by a background job instead of comparing
+due_date with today on every read, so overdue counts and lists are a plain
+(user_id, status) index lookup. Users are bucketed by users.timezone (NULL =
+server time) and each bucket is transitioned with a single UPDATE against its
+own local date. Pending and in-progress tasks both move; the status they had
+is kept in tasks.pre_overdue_status and restored when the task is
+rescheduled (Task.reschedule). Reopening and the schema backfill decide with
+the same per-user date (user_today). The job runs hourly, which flips every
+bucket shortly after its local midnight, and once at startup to catch up
+after downtime. Every worker may run it; the UPDATE is idempotent.
+"""
+
+import logging
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import click
+from flask.cli import with_appcontext
+from app import db
+
+logger = logging.getLogger(__name__)
+
+def local_today(zone, now=None):
+    """Current date in an IANA time zone; None means the server's local time"""
+    now = now or datetime.now(timezone.utc)
+    return now.astimezone(ZoneInfo(zone) if zone else None).date()
+
+def user_today(zone, now=None):
+    """A user's local date for overdue decisions; None if the time zone is unknown
+
+    The job skips unknown zones, so callers treat None as "never overdue".
+    """
+    try:
+        return local_today(zone, now)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+def mark_overdue_tasks(now=None, connection=None):
+    """Move past-due pending/in-progress tasks to 'overdue', remembering their status
+
+    One UPDATE per time zone bucket; returns {timezone: tasks updated}. Runs
+    on connection when given (schema migrations), else on db.session and commits.
+    """
+    tasks, users = db.metadata.tables['tasks'], db.metadata.tables['users']
+    execute = connection.execute if connection is not None else db.session.execute
+    stamp = datetime.utcnow()
+    updated = {}
+    for zone in execute(db.select(users.c.timezone).distinct()).scalars().all():
+        today = user_today(zone, now)
+        if today is None:
+            logger.warning('Skipping overdue update for unknown time zone %r', zone)
+            continue
+        bucket = users.c.timezone.is_(None) if zone is None else users.c.timezone == zone
+        result = execute(
+            tasks.update()
+            .where(tasks.c.status.in_(('pending', 'in_progress')), tasks.c.due_date < today,
+                   tasks.c.user_id.in_(db.select(users.c.id).where(bucket)))
+            .values(status='overdue', pre_overdue_status=tasks.c.status, updated_at=stamp)
+        )
+        updated[zone] = result.rowcount
+    if connection is None:
+        db.session.commit()
+    return updated
+
+def init_overdue_scheduler(app):
+    """Start the hourly overdue job in web processes when OVERDUE_JOB_ENABLED is set"""
+    if not app.config.get('OVERDUE_JOB_ENABLED', False) or click.get_current_context(silent=True):
+        return None
+    from apscheduler.schedulers.background import BackgroundScheduler
+
+    def run():
+        with app.app_context():
+            try:
+                updated = mark_overdue_tasks()
+            except Exception:
+                db.session.rollback()
+                logger.exception('Overdue status update failed')
+            else:
+                logger.info('Marked %d tasks overdue', sum(updated.values()))
+
+    scheduler = BackgroundScheduler(daemon=True)
+    scheduler.add_job(run, 'cron', minute=app.config.get('OVERDUE_JOB_MINUTE', 5), id='mark-overdue',
+                      coalesce=True, max_instances=1, next_run_time=datetime.now())
+    scheduler.start()
+    app.extensions['overdue_scheduler'] = scheduler
+    return scheduler
+
+@click.command('mark-overdue')
+@with_appcontext
+def mark_overdue_command():
+    """Move past-due tasks to 'overdue' now (for cron instead of the in-process job)"""
+    updated = mark_overdue_tasks()
+    for zone, count in updated.items():
+        print(f"  {zone or 'server time'}: {count}")
+    print(f'Marked {sum(updated.values())} tasks overdue')
@@ -0,0 +1,115 @@
+"""
+Password hashing off the request thread
+
+Hashes run in a small bounded thread pool (hashlib's PBKDF2/scrypt release the
+GIL). When more hashes are in flight than PASSWORD_HASH_MAX_PENDING allows, the
+request is shed with 503 + Retry-After instead of queueing behind a
+registration spike.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app, has_app_context
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, generate_password_hash, check_password_hash
+
+def hash_parameters(method):
+    """Normalized parameters of a werkzeug method string, with werkzeug's defaults filled in
+
+    'pbkdf2', 'pbkdf2:sha256' and 'pbkdf2:sha256:600000' all describe the same
+    hash, as do 'scrypt' and 'scrypt:32768:8:1'.
+    """
+    name, *args = method.split(':')
+    try:
+        if name == 'pbkdf2':
+            return (name, args[0] if args else 'sha256', int(args[1]) if len(args) > 1 else DEFAULT_PBKDF2_ITERATIONS)
+        if name == 'scrypt':
+            n, r, p = (int(arg) for arg in args + ['32768', '8', '1'][len(args):])
+            return (name, n, r, p)
+    except ValueError:
+        pass
+    return (method,)
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing pool is saturated"""
+
+    def __init__(self, retry_after):
+        super().__init__('Password hashing capacity exceeded')
+        self.retry_after = retry_after
+
+class PasswordHasher:
+    """Bounded worker pool for password hashing and verification"""
+
+    def __init__(self, method='pbkdf2:sha256:600000', salt_length=16,
+                 workers=2, max_pending=8, retry_after=2):
+        self.method = method
+        self._parameters = hash_parameters(method)
+        self.salt_length = salt_length
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy(self.retry_after)
+        try:
+            return self._executor.submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        """Hash a password with the configured method"""
+        return self._run(generate_password_hash, password, self.method, self.salt_length)
+
+    def verify(self, pwhash, password):
+        """Check a password against a stored hash"""
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """True if pwhash was produced with different parameters than configured"""
+        return hash_parameters(pwhash.split('$', 1)[0]) != self._parameters
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+def init_password_hasher(app):
+    """Attach a PasswordHasher configured from PASSWORD_HASH_* settings"""
+    app.extensions['password_hasher'] = PasswordHasher(
+        method=app.config.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000'),
+        salt_length=app.config.get('PASSWORD_SALT_LENGTH', 16),
+        workers=app.config.get('PASSWORD_HASH_WORKERS', 2),
+        max_pending=app.config.get('PASSWORD_HASH_MAX_PENDING', 8),
+        retry_after=app.config.get('PASSWORD_HASH_RETRY_AFTER', 2)
+    )
+
+    @app.errorhandler(PasswordHasherBusy)
+    def password_hasher_busy(error):
+        return (
+            'The server is busy signing other students in. Please try again shortly.',
+            503,
+            {'Retry-After': str(error.retry_after)}
+        )
+
+def get_password_hasher():
+    """Return the current app's hasher, or None outside an app context"""
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('password_hasher')
+
+def hash_password(password):
+    """Hash a password, through the pool when an app is available"""
+    hasher = get_password_hasher()
+    if hasher is None:
+        return generate_password_hash(password)
+    return hasher.hash(password)
+
+def verify_password(pwhash, password):
+    """Verify a password, through the pool when an app is available"""
+    hasher = get_password_hasher()
+    if hasher is None:
+        return check_password_hash(pwhash, password)
+    return hasher.verify(pwhash, password)
+
+def password_needs_rehash(pwhash):
+    """True if the stored hash uses outdated parameters"""
+    hasher = get_password_hasher()
+    return hasher is not None and hasher.needs_rehash(pwhash)
@@ -0,0 +1,171 @@
+"""
+On-demand cProfile capture for a single request
+
+Profiling is opt-in (PROFILING_ENABLED). An admin issues a short-lived,
+single-use signed token (/debug/profiles/token or `flask profile-token`). The
+first request carrying it in the X-Profile-Token header or the _profile query
+parameter runs under cProfile, and the pstats file is
+stored with route and user metadata in PROFILE_DIR, keeping only the newest
+PROFILE_MAX_FILES captures.
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import secrets
+import time
+from datetime import datetime
+from flask import g, request
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from werkzeug.utils import secure_filename
+
+TOKEN_SALT = 'studyflow-profile'
+SORT_KEYS = frozenset(key.value for key in pstats.SortKey)
+
+def _serializer(app):
+    return URLSafeTimedSerializer(app.config['SECRET_KEY'], salt=TOKEN_SALT)
+
+def issue_profile_token(app, user_id):
+    """Sign a single-use token that allows profiling one request on behalf of an admin"""
+    return _serializer(app).dumps({'admin_id': user_id, 'nonce': secrets.token_hex(16)})
+
+def _claim_nonce(app, nonce, max_age):
+    """Record a token's nonce; False if it was already used
+
+    Used nonces are marker files next to the profiles (O_EXCL makes the claim
+    atomic across workers); markers older than the token lifetime are pruned.
+    """
+    directory = os.path.join(profile_directory(app), '.used-tokens')
+    os.makedirs(directory, exist_ok=True)
+    expired = time.time() - max_age
+    for entry in os.scandir(directory):
+        try:
+            if entry.stat().st_mtime < expired:
+                os.remove(entry.path)
+        except FileNotFoundError:
+            pass
+    try:
+        os.close(os.open(os.path.join(directory, nonce), os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except FileExistsError:
+        return False
+    return True
+
+def verify_profile_token(app, token):
+    """Return the issuing admin id and use up the token; None if invalid, expired or already used"""
+    max_age = app.config.get('PROFILE_TOKEN_MAX_AGE', 900)
+    try:
+        data = _serializer(app).loads(token, max_age=max_age)
+    except BadSignature:
+        return None
+    nonce = str(data.get('nonce', ''))
+    if not nonce.isalnum():
+        return None
+
+    from app.models import User
+    from app import db
+    user = db.session.get(User, data.get('admin_id'))
+    if user is None or not user.is_admin:
+        return None
+    return user.id if _claim_nonce(app, nonce, max_age) else None
+
+def profile_directory(app):
+    return app.config.get('PROFILE_DIR') or os.path.join(app.instance_path, 'profiles')
+
+def list_profiles(app):
+    """Metadata of stored profiles, newest first"""
+    directory = profile_directory(app)
+    if not os.path.isdir(directory):
+        return []
+
+    profiles = []
+    for filename in os.listdir(directory):
+        if not filename.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(directory, filename)) as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    profiles.sort(key=lambda profile: profile['captured_at'], reverse=True)
+    return profiles
+
+def _rotate(directory, max_files):
+    stats_files = sorted(
+        (entry for entry in os.scandir(directory) if entry.name.endswith('.pstats')),
+        key=lambda entry: entry.stat().st_mtime
+    )
+    for entry in stats_files[:max(0, len(stats_files) - max_files)]:
+        for path in (entry.path, entry.path[:-len('.pstats')] + '.json'):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+def _save_profile(app, profiler, duration, status_code):
+    directory = profile_directory(app)
+    os.makedirs(directory, exist_ok=True)
+
+    captured_at = datetime.utcnow()
+    name = secure_filename(
+        f"{captured_at.strftime('%Y%m%dT%H%M%S%f')}-{request.endpoint or 'unknown'}-{g._profile_admin_id}"
+    )
+    profiler.dump_stats(os.path.join(directory, f'{name}.pstats'))
+
+    from flask_login import current_user
+    metadata = {
+        'name': name,
+        'file': f'{name}.pstats',
+        'captured_at': captured_at.isoformat(),
+        'endpoint': request.endpoint,
+        'method': request.method,
+        'path': request.full_path,
+        'status': status_code,
+        'duration_ms': round(duration * 1000, 3),
+        'user_id': current_user.id if current_user.is_authenticated else None,
+        'requested_by': g._profile_admin_id
+    }
+    with open(os.path.join(directory, f'{name}.json'), 'w') as f:
+        json.dump(metadata, f)
+
+    _rotate(directory, app.config.get('PROFILE_MAX_FILES', 50))
+    return metadata
+
+def init_profiling(app):
+    """Install the request hooks that start/stop cProfile for tokened requests"""
+    if not app.config.get('PROFILING_ENABLED', False):
+        return
+
+    @app.before_request
+    def start_profiler():
+        token = request.headers.get('X-Profile-Token') or request.args.get('_profile')
+        if not token:
+            return
+        admin_id = verify_profile_token(app, token)
+        if admin_id is None:
+            return
+        g._profile_admin_id = admin_id
+        g._profile_started = time.perf_counter()
+        g._profiler = cProfile.Profile()
+        g._profiler.enable()
+
+    @app.after_request
+    def stop_profiler(response):
+        profiler = g.pop('_profiler', None)
+        if profiler is None:
+            return response
+        profiler.disable()
+        duration = time.perf_counter() - g.pop('_profile_started')
+        metadata = _save_profile(app, profiler, duration, response.status_code)
+        response.headers['X-Profile-Id'] = metadata['name']
+        return response
+
+    @app.cli.command('profile-token')
+    def profile_token_command():
+        """Print a profiling token for the first admin user"""
+        from app.models import User
+        admin = User.query.filter_by(is_admin=True).order_by(User.id).first()
+        if admin is None:
+            print('No admin user found.')
+            return
+        print(issue_profile_token(app, admin.id))
@@ -0,0 +1,158 @@
+"""
+Lazy expansion and materialization of recurring tasks
+
+A TaskRecurrence stores a rule and a template instead of one Task row per
+week. Readers (calendar JSON, .ics feed, dashboard) expand the occurrences of
+the window they show with two indexed queries: the user's rules active in the
+window, and the occurrences already materialized for those rules. An
+occurrence only becomes a Task row, keyed by the unique (recurrence_id,
+occurrence_date), when it is completed or edited, so storage grows with
+activity rather than with the length of the schedule. Deleting such a row
+records a SkippedOccurrence so the date stays out of the series; deleting the
+recurrence ends the series and keeps the materialized tasks as ordinary tasks.
+
+Unmaterialized occurrences are always 'pending': the overdue job only moves
+Task rows, and overdue counts are read from those, so an occurrence becomes
+overdue once it is materialized.
+"""
+
+from datetime import date, timedelta
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models import Task, TaskRecurrence, SkippedOccurrence
+from app.models.task import PRIORITY_RANKS
+from app.utils.overdue import user_today
+
+class Occurrence:
+    """Unmaterialized occurrence; exposes the Task attributes readers use"""
+
+    id = None
+
+    status = 'pending'
+
+    def __init__(self, recurrence, occurrence_date):
+        self.recurrence_id = recurrence.id
+        self.occurrence_date = occurrence_date
+        self.title = recurrence.title
+        self.description = recurrence.description
+        self.subject = recurrence.subject
+        self.priority = recurrence.priority
+        self.difficulty = recurrence.difficulty
+        self.estimated_hours = recurrence.estimated_hours
+        self.category = recurrence.category
+        self.updated_at = recurrence.updated_at
+
+    @property
+    def due_date(self):
+        return self.occurrence_date
+
+    @property
+    def key(self):
+        return occurrence_key(self.recurrence_id, self.occurrence_date)
+
+def occurrence_key(recurrence_id, occurrence_date):
+    """Stable identifier of an occurrence, before and after materialization"""
+    return f'r{recurrence_id}-{occurrence_date:%Y%m%d}'
+
+def expand_occurrences(user_id, start, end):
+    """Unmaterialized, unskipped occurrences of the user's recurrences in [start, end), by date then priority"""
+    recurrences = TaskRecurrence.query.filter(
+        TaskRecurrence.user_id == user_id,
+        TaskRecurrence.starts_on < end,
+        db.or_(TaskRecurrence.ends_on.is_(None), TaskRecurrence.ends_on >= start)
+    ).all()
+    if not recurrences:
+        return []
+    
+    recurrence_ids = [recurrence.id for recurrence in recurrences]
+    taken = set(db.session.execute(
+        db.union_all(
+            db.select(Task.recurrence_id, Task.occurrence_date).where(
+                Task.recurrence_id.in_(recurrence_ids),
+                Task.occurrence_date >= start, Task.occurrence_date < end
+            ),
+            db.select(SkippedOccurrence.recurrence_id, SkippedOccurrence.occurrence_date).where(
+                SkippedOccurrence.recurrence_id.in_(recurrence_ids),
+                SkippedOccurrence.occurrence_date >= start, SkippedOccurrence.occurrence_date < end
+            )
+        )
+    ).all())
+    occurrences = [
+        Occurrence(recurrence, day)
+        for recurrence in recurrences
+        for day in recurrence.occurrence_dates(start, end)
+        if (recurrence.id, day) not in taken
+    ]
+    occurrences.sort(key=lambda occurrence: (occurrence.occurrence_date, -PRIORITY_RANKS.get(occurrence.priority, 0),
+                                             occurrence.recurrence_id))
+    return occurrences
+
+def materialize_occurrence(user_id, recurrence_id, occurrence_date):
+    """Task row for an occurrence, created from the template on first touch
+
+    Returns None if the recurrence is not the user's, has no occurrence on
+    that date or the occurrence was deleted. The caller commits.
+    """
+    recurrence = TaskRecurrence.query.filter_by(id=recurrence_id, user_id=user_id).first()
+    if recurrence is None or not recurrence.is_occurrence(occurrence_date):
+        return None
+    if db.session.get(SkippedOccurrence, (recurrence_id, occurrence_date)) is not None:
+        return None
+    
+    existing = Task.query.filter_by(recurrence_id=recurrence_id, occurrence_date=occurrence_date).first()
+    if existing is not None:
+        return existing
+    
+    today = user_today(recurrence.user.timezone)
+    task = Task(
+        title=recurrence.title,
+        description=recurrence.description,
+        subject=recurrence.subject,
+        priority=recurrence.priority,
+        difficulty=recurrence.difficulty,
+        estimated_hours=recurrence.estimated_hours,
+        category=recurrence.category,
+        due_date=occurrence_date,
+        status='overdue' if today is not None and occurrence_date < today else 'pending',
+        recurrence_id=recurrence_id,
+        occurrence_date=occurrence_date,
+        user_id=user_id
+    )
+    try:
+        with db.session.begin_nested():
+            db.session.add(task)
+    except IntegrityError:
+        # A concurrent request materialized it first
+        return Task.query.filter_by(recurrence_id=recurrence_id, occurrence_date=occurrence_date).one()
+    return task
+
+def skip_occurrences(keys):
+    """Keep deleted materialized occurrences out of their series
+
+    keys are the (recurrence_id, occurrence_date) pairs of the deleted tasks;
+    pairs without a recurrence are ignored. The caller commits.
+    """
+    rows = [{'recurrence_id': recurrence_id, 'occurrence_date': occurrence_date}
+            for recurrence_id, occurrence_date in keys if recurrence_id is not None]
+    if rows:
+        db.session.execute(db.insert(SkippedOccurrence), rows)
+
+def recurrence_state(user_id):
+    """Scalar subqueries (rule count, latest rule update) for ETags over expanded windows"""
+    scope = TaskRecurrence.user_id == user_id
+    return (
+        db.select(db.func.count(TaskRecurrence.id)).where(scope).scalar_subquery(),
+        db.select(db.func.max(TaskRecurrence.updated_at)).where(scope).scalar_subquery()
+    )
+
+def expansion_end(start):
+    """End of the expansion window for readers without an explicit end date"""
+    return start + timedelta(days=current_app.config.get('RECURRENCE_HORIZON_DAYS', 180))
+
+def parse_occurrence_date(value):
+    """ISO date from a URL segment, or None"""
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return None
@@ -0,0 +1,201 @@
+"""
+Schema versioning for fast application startup
+
+Instead of running db.create_all() in every process, the database stores the
+schema version it was last upgraded to. Startup compares it with
+SCHEMA_VERSION and only runs DDL when a migration is actually needed.
+"""
+
+from datetime import datetime
+from sqlalchemy import inspect
+from app import db
+from app.utils.overdue import mark_overdue_tasks
+from app.utils.search import install_search_index
+from app.utils.subjects import backfill_subjects
+import app.models  # noqa: F401  (register all tables on db.metadata)
+
+# Bump this and append a step to MIGRATIONS whenever the models change
+SCHEMA_VERSION = 11
+
+schema_version_table = db.Table(
+    'schema_version',
+    db.Column('version', db.Integer, nullable=False),
+    db.Column('upgraded_at', db.DateTime, nullable=False)
+)
+
+def _column_exists(connection, table, column):
+    return column in {c['name'] for c in inspect(connection).get_columns(table)}
+
+def _baseline(connection):
+    """Version 1: tables created by db.create_all()"""
+
+def _add_user_session_version(connection):
+    """Version 2: users.session_version for the identity cache"""
+    if not _column_exists(connection, 'users', 'session_version'):
+        connection.execute(db.text(
+            'ALTER TABLE users ADD COLUMN session_version INTEGER NOT NULL DEFAULT 0'
+        ))
+
+HOT_QUERY_INDEXES = {
+    'tasks': ['ix_tasks_user_due_date', 'ix_tasks_user_status_due_date', 'ix_tasks_user_status_completed_at'],
+    'study_sessions': ['ix_study_sessions_user_date', 'ix_study_sessions_user_created_at']
+}
+
+def _add_hot_query_indexes(connection):
+    """Version 3: composite (user_id, ...) indexes on tasks and study_sessions"""
+    for table_name, index_names in HOT_QUERY_INDEXES.items():
+        indexes = {index.name: index for index in db.metadata.tables[table_name].indexes}
+        for name in index_names:
+            indexes[name].create(connection, checkfirst=True)
+
+def _add_task_search(connection):
+    """Version 4: full-text search index over task title/description/subject"""
+    install_search_index(connection)
+
+def _add_feed_index(connection):
+    """Version 5: (user_id, updated_at) for the calendar feed's MAX/COUNT check"""
+    indexes = {index.name: index for index in db.metadata.tables['tasks'].indexes}
+    indexes['ix_tasks_user_updated_at'].create(connection, checkfirst=True)
+
+def _add_overdue_status(connection):
+    """Version 6: users.timezone (the overdue backfill runs in version 11)"""
+    if not _column_exists(connection, 'users', 'timezone'):
+        connection.execute(db.text('ALTER TABLE users ADD COLUMN timezone VARCHAR(50)'))
+
+def _add_task_recurrences(connection):
+    """Version 7: task_recurrences (created by create_all) and the tasks occurrence key"""
+    if not _column_exists(connection, 'tasks', 'recurrence_id'):
+        connection.execute(db.text(
+            'ALTER TABLE tasks ADD COLUMN recurrence_id INTEGER REFERENCES task_recurrences (id)'
+        ))
+    if not _column_exists(connection, 'tasks', 'occurrence_date'):
+        connection.execute(db.text('ALTER TABLE tasks ADD COLUMN occurrence_date DATE'))
+    indexes = {index.name: index for index in db.metadata.tables['tasks'].indexes}
+    indexes['uq_tasks_recurrence_occurrence'].create(connection, checkfirst=True)
+
+def _add_rank_columns(connection):
+    """Version 8: generated tasks.priority_rank/status_rank and their indexes
+
+    Generated columns need no backfill: PostgreSQL computes the STORED values
+    for existing rows when the column is added, SQLite computes VIRTUAL ones
+    on read (and when building the index).
+    """
+    tasks = db.metadata.tables['tasks']
+    storage = 'STORED' if connection.dialect.name == 'postgresql' else 'VIRTUAL'
+    for name in ('priority_rank', 'status_rank'):
+        if not _column_exists(connection, 'tasks', name):
+            connection.execute(db.text(
+                f'ALTER TABLE tasks ADD COLUMN {name} SMALLINT '
+                f'GENERATED ALWAYS AS ({tasks.c[name].computed.sqltext}) {storage}'
+            ))
+    indexes = {index.name: index for index in tasks.indexes}
+    for name in ('ix_tasks_user_priority_rank_due_date', 'ix_tasks_user_status_rank_due_date'):
+        indexes[name].create(connection, checkfirst=True)
+
+def _add_subjects(connection):
+    """Version 9: subjects (created by create_all), subject_id columns and their backfill"""
+    for table in ('tasks', 'study_sessions'):
+        if not _column_exists(connection, table, 'subject_id'):
+            connection.execute(db.text(
+                f'ALTER TABLE {table} ADD COLUMN subject_id INTEGER REFERENCES subjects (id)'
+            ))
+    backfill_subjects(connection)
+
+def _add_skipped_occurrences(connection):
+    """Version 10: skipped_occurrences (created by create_all)"""
+
+def _add_pre_overdue_status(connection):
+    """Version 11: tasks.pre_overdue_status, and mark already past-due tasks overdue"""
+    if not _column_exists(connection, 'tasks', 'pre_overdue_status'):
+        connection.execute(db.text('ALTER TABLE tasks ADD COLUMN pre_overdue_status VARCHAR(20)'))
+    mark_overdue_tasks(connection=connection)
+
+# Ordered (version, description, step) tuples. Steps receive a connection
+# inside a transaction and must be idempotent, because databases created
+# before versioning existed replay every step.
+MIGRATIONS = [
+    (1, 'baseline schema', _baseline),
+    (2, 'users.session_version', _add_user_session_version),
+    (3, 'tasks/study_sessions composite indexes', _add_hot_query_indexes),
+    (4, 'task full-text search', _add_task_search),
+    (5, 'tasks (user_id, updated_at) index', _add_feed_index),
+    (6, 'users.timezone', _add_overdue_status),
+    (7, 'recurring tasks', _add_task_recurrences),
+    (8, 'tasks priority/status rank columns', _add_rank_columns),
+    (9, 'per-user subject dictionary', _add_subjects),
+    (10, 'deleted recurring occurrences', _add_skipped_occurrences),
+    (11, 'overdue status keeps the prior status', _add_pre_overdue_status),
+]
+
+def get_schema_version(connection):
+    """Return the stored schema version, or None if the database is unversioned"""
+    if not inspect(connection).has_table(schema_version_table.name):
+        return None
+    return connection.execute(
+        db.select(db.func.max(schema_version_table.c.version))
+    ).scalar()
+
+# Arbitrary key for pg_advisory_xact_lock, shared by every process running migrations
+SCHEMA_LOCK_KEY = 0x5f5ce3a
+
+def _lock_schema(connection):
+    """Serialize upgrades across workers for the rest of the transaction
+
+    PostgreSQL takes a transaction-level advisory lock; SQLite starts the
+    transaction with BEGIN IMMEDIATE, which holds the database write lock
+    until commit.
+    """
+    if connection.dialect.name == 'postgresql':
+        connection.execute(db.text('SELECT pg_advisory_xact_lock(:key)'), {'key': SCHEMA_LOCK_KEY})
+    elif connection.dialect.name == 'sqlite':
+        connection.exec_driver_sql('BEGIN IMMEDIATE')
+
+def upgrade_schema(current=None):
+    """Create missing tables and apply every migration newer than the stored version
+
+    Concurrent callers (e.g. several workers starting on a fresh deploy) wait
+    for the lock, then see the version written by the first one and return.
+    current is only a hint; the version is re-read under the lock.
+    """
+    with db.engine.begin() as connection:
+        _lock_schema(connection)
+        current = get_schema_version(connection)
+        if current is not None and current >= SCHEMA_VERSION:
+            return current
+
+        db.metadata.create_all(bind=connection)
+        for version, description, step in MIGRATIONS:
+            if current is not None and version <= current:
+                continue
+            step(connection)
+
+        connection.execute(schema_version_table.delete())
+        connection.execute(schema_version_table.insert().values(
+            version=SCHEMA_VERSION,
+            upgraded_at=datetime.utcnow()
+        ))
+
+    return SCHEMA_VERSION
+
+def ensure_schema(mode=None):
+    """Bring the schema up to date according to SCHEMA_STARTUP_MODE
+
+    'version' checks the stored version and only runs DDL when it is behind,
+    'create_all' keeps the legacy behaviour and 'skip' does nothing (tests and
+    workers started after a release step).
+    """
+    from flask import current_app
+    mode = mode or current_app.config.get('SCHEMA_STARTUP_MODE', 'version')
+
+    if mode == 'skip':
+        return None
+    if mode == 'create_all':
+        db.create_all()
+        return None
+
+    with db.engine.connect() as connection:
+        current = get_schema_version(connection)
+
+    if current is not None and current >= SCHEMA_VERSION:
+        return current
+    return upgrade_schema(current)
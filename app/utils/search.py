@@ -0,0 +1,123 @@
+"""
+Full-text task search
+
+SQLite keeps an external-content FTS5 table (tasks_fts) in sync with tasks
+through triggers; PostgreSQL uses a generated, weighted tsvector column with a
+GIN index. Both rank title matches above subject and description matches and
+treat every search term as a prefix. Other backends fall back to LIKE.
+"""
+
+import re
+from sqlalchemy import event, text
+from app import db
+
+TERM_PATTERN = re.compile(r'\w+', re.UNICODE)
+MAX_TERMS = 8
+
+SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+        title, description, subject,
+        content='tasks', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts(rowid, title, description, subject)
+        VALUES (new.id, new.title, new.description, new.subject);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description, subject)
+        VALUES ('delete', old.id, old.title, old.description, old.subject);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description, subject ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description, subject)
+        VALUES ('delete', old.id, old.title, old.description, old.subject);
+        INSERT INTO tasks_fts(rowid, title, description, subject)
+        VALUES (new.id, new.title, new.description, new.subject);
+    END""",
+]
+
+POSTGRESQL_DDL = [
+    """ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(subject, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+    ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_tasks_search_vector ON tasks USING GIN (search_vector)",
+]
+
+RESULT_COLUMNS = 't.id, t.title, t.subject, t.priority, t.status, t.due_date'
+
+def install_search_index(connection):
+    """Create the backend's full-text index for tasks (idempotent)"""
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        existed = connection.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tasks_fts'"
+        )).first() is not None
+        for statement in SQLITE_DDL:
+            connection.exec_driver_sql(statement)
+        if not existed:
+            # Index the rows that predate the triggers
+            connection.exec_driver_sql("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+    elif dialect == 'postgresql':
+        for statement in POSTGRESQL_DDL:
+            connection.exec_driver_sql(statement)
+
+def _drop_search_index(target, connection, **kwargs):
+    if connection.dialect.name == 'sqlite':
+        connection.exec_driver_sql('DROP TABLE IF EXISTS tasks_fts')
+
+def _create_search_index(target, connection, **kwargs):
+    install_search_index(connection)
+
+def register_search_ddl(table):
+    """Install/drop the search index whenever metadata creates/drops the tasks table"""
+    event.listen(table, 'after_create', _create_search_index)
+    event.listen(table, 'before_drop', _drop_search_index)
+
+def search_terms(query):
+    """Word tokens of a user query, without FTS syntax"""
+    return TERM_PATTERN.findall(query or '')[:MAX_TERMS]
+
+def search_tasks(user_id, query, limit=20):
+    """Rank the user's tasks against every term of `query` (as prefixes)
+
+    Returns rows of (id, title, subject, priority, status, due_date, rank),
+    best match first.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+
+    dialect = db.engine.dialect.name
+    params = {'user_id': user_id, 'limit': limit}
+    if dialect == 'sqlite':
+        # Quoted terms can't inject FTS operators; * makes each a prefix query
+        params['query'] = ' '.join('"{}"*'.format(term) for term in terms)
+        statement = text(f"""
+            SELECT {RESULT_COLUMNS}, bm25(tasks_fts, 10.0, 1.0, 4.0) AS rank
+            FROM tasks_fts JOIN tasks t ON t.id = tasks_fts.rowid
+            WHERE tasks_fts MATCH :query AND t.user_id = :user_id
+            ORDER BY rank LIMIT :limit
+        """)
+    elif dialect == 'postgresql':
+        params['query'] = ' & '.join(f'{term}:*' for term in terms)
+        statement = text(f"""
+            SELECT {RESULT_COLUMNS}, ts_rank(t.search_vector, q) AS rank
+            FROM tasks t, to_tsquery('simple', :query) q
+            WHERE t.user_id = :user_id AND t.search_vector @@ q
+            ORDER BY rank DESC LIMIT :limit
+        """)
+    else:
+        conditions = []
+        for index, term in enumerate(terms):
+            params[f'term{index}'] = f'%{term}%'
+            conditions.append(f'(t.title LIKE :term{index} OR t.subject LIKE :term{index} '
+                              f'OR t.description LIKE :term{index})')
+        statement = text(f"""
+            SELECT {RESULT_COLUMNS}, 0 AS rank FROM tasks t
+            WHERE t.user_id = :user_id AND {' AND '.join(conditions)}
+            ORDER BY t.due_date LIMIT :limit
+        """)
+
+    return db.session.execute(statement.columns(due_date=db.Date), params).all()
@@ -0,0 +1,279 @@
+"""
+Synthetic data generator for load testing
+
+`flask seed` creates N users with realistic distributions of subjects, tasks,
+study sessions and streaks. Rows are buffered and written with Core
+executemany batches (COPY on PostgreSQL), so millions of rows take minutes and
+memory stays bounded. Output is fully determined by --seed and the current day.
+"""
+
+import io
+import math
+import random
+import time
+from datetime import date, datetime, timedelta
+import click
+from flask.cli import with_appcontext
+from app import db
+from app.utils.passwords import hash_password
+
+SUBJECTS = [
+    'Mathematics', 'Physics', 'Chemistry', 'Biology', 'History', 'Literature',
+    'Computer Science', 'Economics', 'Psychology', 'Philosophy', 'Statistics',
+    'Geography', 'Art History', 'Music Theory', 'Spanish', 'French',
+    'Linear Algebra', 'Calculus', 'Organic Chemistry', 'Sociology'
+]
+PRIORITIES = (['low', 'medium', 'high', 'urgent'], [20, 45, 25, 10])
+CATEGORIES = (['assignment', 'project', 'exam', 'reading', 'research', 'other'], [40, 15, 15, 20, 5, 5])
+SESSION_TYPES = (['regular', 'pomodoro', 'intensive', 'review'], [40, 35, 10, 15])
+DURATIONS = ([25, 30, 45, 50, 60, 90, 120], [30, 10, 15, 15, 15, 10, 5])
+# Study start hours skew towards afternoons and evenings
+HOURS = (list(range(6, 24)), [1, 2, 4, 5, 5, 4, 3, 4, 5, 6, 6, 6, 7, 8, 8, 7, 5, 3])
+TASK_WORDS = ['Problem Set', 'Essay', 'Lab Report', 'Reading', 'Quiz Prep', 'Midterm Review',
+              'Project Milestone', 'Presentation', 'Lecture Notes', 'Final Exam Prep']
+
+class SeedOptions:
+    """Distribution parameters for the generator"""
+
+    def __init__(self, users=100, tasks_per_user=40, sessions_per_user=120, subjects_per_user=5,
+                 history_days=365, streak_probability=0.3, max_streak=30, seed=42,
+                 batch_size=5000, password='password123', username_prefix='loaduser'):
+        self.users = users
+        self.tasks_per_user = tasks_per_user
+        self.sessions_per_user = sessions_per_user
+        self.subjects_per_user = subjects_per_user
+        self.history_days = history_days
+        self.streak_probability = streak_probability
+        self.max_streak = max_streak
+        self.seed = seed
+        self.batch_size = batch_size
+        self.password = password
+        self.username_prefix = username_prefix
+
+def _skewed_count(rng, mean):
+    """Lognormal count with the given mean; a few heavy users, many light ones"""
+    if mean <= 0:
+        return 0
+    sigma = 0.8
+    return max(0, int(rng.lognormvariate(math.log(mean) - sigma * sigma / 2, sigma)))
+
+def _choice(rng, weighted):
+    values, weights = weighted
+    return rng.choices(values, weights)[0]
+
+class _BatchWriter:
+    """Buffers rows per table and flushes them in batches, parents first"""
+    TABLE_ORDER = ['users', 'subjects', 'tasks', 'study_sessions', 'user_points']
+
+    def __init__(self, connection, batch_size):
+        self.connection = connection
+        self.batch_size = batch_size
+        self.use_copy = connection.dialect.name == 'postgresql'
+        self.buffers = {}
+        self.counts = {}
+
+    def add(self, table, row):
+        buffer = self.buffers.setdefault(table, [])
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            # Flush every table so child rows never precede their parents
+            self.flush()
+
+    def flush(self):
+        for name in self.TABLE_ORDER:
+            rows = self.buffers.get(name)
+            if not rows:
+                continue
+            table_obj = db.metadata.tables[name]
+            if self.use_copy:
+                self._copy(table_obj, rows)
+            else:
+                self.connection.execute(table_obj.insert(), rows)
+            self.counts[name] = self.counts.get(name, 0) + len(rows)
+            self.buffers[name] = []
+
+    def _copy(self, table, rows):
+        columns = list(rows[0])
+        buffer = copy_buffer(columns, rows)
+        cursor = self.connection.connection.dbapi_connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+            )
+        finally:
+            cursor.close()
+
+def _copy_field(value):
+    """One COPY csv field: NULL is an unquoted empty field, strings are always quoted
+    (so '' stays an empty string), everything else is written bare"""
+    if value is None:
+        return ''
+    if isinstance(value, str):
+        return '"' + value.replace('"', '""') + '"'
+    return str(value)
+
+def copy_buffer(columns, rows):
+    """Serialize row dicts for COPY ... WITH (FORMAT csv)"""
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(','.join(_copy_field(row[column]) for column in columns))
+        buffer.write('\n')
+    buffer.seek(0)
+    return buffer
+
+def _next_id(connection, table):
+    return (connection.execute(db.select(db.func.max(table.c.id))).scalar() or 0) + 1
+
+def _sync_sequences(connection, tables):
+    """Explicit ids bypass PostgreSQL serial sequences; move them past the new rows"""
+    if connection.dialect.name != 'postgresql':
+        return
+    for table in tables:
+        connection.execute(db.text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE(MAX(id), 1)) FROM {table}"
+        ))
+
+def seed_database(connection, options):
+    """Generate users, subjects, tasks, study sessions and points; returns row counts per table"""
+    from app.models import User, Task, StudySession, Subject
+    from app.models.subject import normalize_subject
+
+    rng = random.Random(options.seed)
+    today = date.today()
+    # Timestamps hang off the start of the day, not the clock, so reruns match
+    now = datetime.combine(today, datetime.min.time())
+    password_hash = hash_password(options.password)
+    writer = _BatchWriter(connection, options.batch_size)
+
+    user_id = _next_id(connection, User.__table__)
+    task_id = _next_id(connection, Task.__table__)
+    session_id = _next_id(connection, StudySession.__table__)
+    subject_id = _next_id(connection, Subject.__table__)
+    # Offset usernames so repeated runs with different seeds do not collide
+    first_index = user_id
+
+    for index in range(first_index, first_index + options.users):
+        created_at = now - timedelta(days=rng.randint(options.history_days // 2, options.history_days))
+        writer.add('users', {
+            'id': user_id, 'username': f'{options.username_prefix}{index}',
+            'email': f'{options.username_prefix}{index}@example.com', 'password_hash': password_hash,
+            'first_name': 'Load', 'last_name': f'User{index}', 'avatar_url': None, 'bio': None,
+            'study_goal_hours': rng.choice([1, 2, 2, 3, 4]), 'is_active': True, 'is_admin': False,
+            'email_notifications': True, 'created_at': created_at,
+            'last_login': now - timedelta(hours=rng.randint(0, 24 * 14)), 'session_version': 0
+        })
+
+        subject_count = max(1, min(len(SUBJECTS), int(rng.gauss(options.subjects_per_user, 1.5))))
+        subjects = rng.sample(SUBJECTS, subject_count)
+        # Zipf-like: the first subject gets most of the attention
+        subject_weights = [1 / (rank + 1) for rank in range(subject_count)]
+        subject_ids = {}
+        for subject in subjects:
+            writer.add('subjects', {
+                'id': subject_id, 'user_id': user_id, 'name': subject,
+                'normalized': normalize_subject(subject), 'created_at': created_at
+            })
+            subject_ids[subject] = subject_id
+            subject_id += 1
+
+        total_points = tasks_completed = study_minutes = 0
+        user_task_ids = []
+
+        for _ in range(_skewed_count(rng, options.tasks_per_user)):
+            due_date = today + timedelta(days=rng.randint(-options.history_days, 60))
+            priority = _choice(rng, PRIORITIES)
+            difficulty = rng.randint(1, 5)
+            task_created = datetime.combine(due_date, datetime.min.time()) - timedelta(days=rng.randint(1, 21))
+            completed_at = None
+            points = 0
+
+            if due_date < today:
+                status = 'completed' if rng.random() < 0.8 else 'overdue'
+            else:
+                status = rng.choices(['pending', 'in_progress', 'completed'], [60, 25, 15])[0]
+            if status == 'completed':
+                completed_at = min(now, datetime.combine(due_date, datetime.min.time())
+                                   - timedelta(hours=rng.randint(0, 72)))
+                points = {'low': 10, 'medium': 20, 'high': 30, 'urgent': 50}[priority] + difficulty * 5
+                total_points += points
+                tasks_completed += 1
+
+            title = f'{rng.choice(TASK_WORDS)} {rng.randint(1, 12)}'
+            subject = rng.choices(subjects, subject_weights)[0]
+            writer.add('tasks', {
+                'id': task_id, 'title': title,
+                'description': None, 'subject': subject, 'subject_id': subject_ids[subject],
+                'priority': priority, 'status': status, 'difficulty': difficulty,
+                'estimated_hours': round(rng.uniform(0.5, 6), 1), 'due_date': due_date,
+                'created_at': task_created, 'updated_at': completed_at or task_created,
+                'completed_at': completed_at, 'user_id': user_id,
+                'category': _choice(rng, CATEGORIES), 'points_awarded': points
+            })
+            user_task_ids.append(task_id)
+            task_id += 1
+
+        # Session days: an optional current streak plus scattered history
+        streak = rng.randint(2, options.max_streak) if rng.random() < options.streak_probability else 0
+        session_days = [today - timedelta(days=offset) for offset in range(streak)]
+        remaining = max(0, _skewed_count(rng, options.sessions_per_user) - streak)
+        session_days += [today - timedelta(days=rng.randint(streak + 1, options.history_days))
+                         for _ in range(remaining)]
+
+        for session_date in session_days:
+            duration = _choice(rng, DURATIONS)
+            focus = max(1, min(10, int(round(rng.gauss(6.5, 1.8)))))
+            start_time = datetime.combine(session_date, datetime.min.time()) + timedelta(
+                hours=_choice(rng, HOURS), minutes=rng.randint(0, 59)
+            )
+            earned = max(0, duration // 15 + (focus - 5) * 2)
+            total_points += earned
+            study_minutes += duration
+            session_type = _choice(rng, SESSION_TYPES)
+            subject = rng.choices(subjects, subject_weights)[0]
+
+            writer.add('study_sessions', {
+                'id': session_id, 'subject': subject, 'subject_id': subject_ids[subject],
+                'duration': duration, 'session_type': session_type, 'focus_rating': focus,
+                'notes': None, 'pomodoro_cycles': duration // 25 if session_type == 'pomodoro' else 0,
+                'breaks_taken': duration // 50, 'date': session_date, 'start_time': start_time,
+                'end_time': start_time + timedelta(minutes=duration), 'created_at': start_time,
+                'user_id': user_id,
+                'task_id': rng.choice(user_task_ids) if user_task_ids and rng.random() < 0.3 else None,
+                'points_earned': earned
+            })
+            session_id += 1
+
+        writer.add('user_points', {
+            'user_id': user_id, 'total_points': total_points, 'level': total_points // 1000 + 1,
+            'tasks_completed': tasks_completed, 'study_minutes': study_minutes, 'streak_days': streak,
+            'achievements_unlocked': 0, 'last_activity': now, 'created_at': created_at
+        })
+        user_id += 1
+
+    writer.flush()
+    _sync_sequences(connection, ['users', 'subjects', 'tasks', 'study_sessions'])
+    return writer.counts
+
+@click.command('seed')
+@click.option('--users', default=100, show_default=True, help='Number of users to create')
+@click.option('--tasks-per-user', default=40, show_default=True, help='Mean tasks per user (lognormal)')
+@click.option('--sessions-per-user', default=120, show_default=True, help='Mean study sessions per user')
+@click.option('--subjects-per-user', default=5, show_default=True, help='Mean distinct subjects per user')
+@click.option('--history-days', default=365, show_default=True, help='Days of history to spread data over')
+@click.option('--streak-probability', default=0.3, show_default=True, help='Share of users with an active streak')
+@click.option('--seed', default=42, show_default=True, help='Random seed (same seed, same data)')
+@click.option('--batch-size', default=5000, show_default=True, help='Rows per insert batch')
+@click.option('--password', default='password123', show_default=True, help='Password for every generated user')
+@with_appcontext
+def seed_command(**kwargs):
+    """Generate synthetic users, tasks and study sessions for load testing"""
+    options = SeedOptions(**kwargs)
+    started = time.perf_counter()
+    with db.engine.begin() as connection:
+        counts = seed_database(connection, options)
+    elapsed = time.perf_counter() - started
+
+    total = sum(counts.values())
+    for table, count in counts.items():
+        print(f'  {table}: {count} rows')
+    print(f'Seeded {total} rows in {elapsed:.1f}s ({total / elapsed:.0f} rows/s)')
@@ -0,0 +1,76 @@
+"""
+Projection-based API serializers
+
+Task.to_dict and StudySession.to_dict need fully hydrated ORM instances and
+recompute per-row properties. The list endpoints instead select only TASK_COLUMNS /
+SESSION_COLUMNS and build the same dictionaries straight from the row tuples,
+with "today" computed once per call.
+"""
+
+from datetime import date
+from app.models import Task, StudySession
+from app.models.study_session import productivity_level
+
+TASK_COLUMNS = (
+    Task.id, Task.title, Task.description, Task.subject, Task.priority, Task.status,
+    Task.difficulty, Task.estimated_hours, Task.due_date, Task.created_at, Task.updated_at,
+    Task.completed_at, Task.category, Task.points_awarded
+)
+
+SESSION_COLUMNS = (
+    StudySession.id, StudySession.subject, StudySession.duration, StudySession.session_type,
+    StudySession.focus_rating, StudySession.notes, StudySession.pomodoro_cycles,
+    StudySession.breaks_taken, StudySession.date, StudySession.start_time, StudySession.end_time,
+    StudySession.created_at, StudySession.task_id, StudySession.points_earned
+)
+
+def serialize_tasks(rows, today=None):
+    """Task.to_dict() equivalents for TASK_COLUMNS rows"""
+    today = today or date.today()
+    return [
+        {
+            'id': task_id,
+            'title': title,
+            'description': description,
+            'subject': subject,
+            'priority': priority,
+            'status': status,
+            'difficulty': difficulty,
+            'estimated_hours': estimated_hours,
+            'due_date': due_date.isoformat() if due_date else None,
+            'created_at': created_at.isoformat() if created_at else None,
+            'updated_at': updated_at.isoformat() if updated_at else None,
+            'completed_at': completed_at.isoformat() if completed_at else None,
+            'category': category,
+            'points_awarded': points_awarded,
+            'is_overdue': status == 'overdue',
+            'days_until_due': (due_date - today).days
+        }
+        for (task_id, title, description, subject, priority, status, difficulty, estimated_hours,
+             due_date, created_at, updated_at, completed_at, category, points_awarded) in rows
+    ]
+
+def serialize_sessions(rows):
+    """StudySession.to_dict() equivalents for SESSION_COLUMNS rows"""
+    return [
+        {
+            'id': session_id,
+            'subject': subject,
+            'duration': duration,
+            'duration_hours': round(duration / 60, 2),
+            'session_type': session_type,
+            'focus_rating': focus_rating,
+            'notes': notes,
+            'pomodoro_cycles': pomodoro_cycles,
+            'breaks_taken': breaks_taken,
+            'date': session_date.isoformat(),
+            'start_time': start_time.isoformat(),
+            'end_time': end_time.isoformat() if end_time else None,
+            'created_at': created_at.isoformat() if created_at else None,
+            'task_id': task_id,
+            'points_earned': points_earned,
+            'productivity_level': productivity_level(focus_rating)
+        }
+        for (session_id, subject, duration, session_type, focus_rating, notes, pomodoro_cycles,
+             breaks_taken, session_date, start_time, end_time, created_at, task_id, points_earned) in rows
+    ]
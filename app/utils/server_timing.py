@@ -0,0 +1,108 @@
+"""
+Server-Timing response headers
+
+When SERVER_TIMING_ENABLED is set, each response carries a Server-Timing
+header breaking the request down into database, render and serialization
+phases (plus the remaining application time), which browser devtools show in
+the network panel. When disabled no hooks are installed and timing() returns a
+shared no-op context manager.
+"""
+
+import contextlib
+import time
+from flask import g, has_app_context, has_request_context
+from sqlalchemy import event
+
+_NOOP = contextlib.nullcontext()
+
+PHASE_DESCRIPTIONS = {
+    'db': 'Database',
+    'render': 'HTML rendering',
+    'serialize': 'Serialization',
+    'app': 'Application',
+    'total': 'Total'
+}
+
+class _PhaseTimer:
+    __slots__ = ('timings', 'phase', 'started')
+
+    def __init__(self, timings, phase):
+        self.timings = timings
+        self.phase = phase
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timings[self.phase] = self.timings.get(self.phase, 0.0) + time.perf_counter() - self.started
+        return False
+
+def timing(phase):
+    """Context manager adding the enclosed time to a Server-Timing phase"""
+    if not has_request_context():
+        return _NOOP
+    timings = g.get('_server_timing')
+    if timings is None:
+        return _NOOP
+    return _PhaseTimer(timings, phase)
+
+def format_server_timing(timings, total, query_count=None):
+    """Build the Server-Timing header value (durations in milliseconds)"""
+    measured = sum(duration for phase, duration in timings.items() if phase != 'db_count')
+    entries = dict(timings)
+    entries.pop('db_count', None)
+    entries['app'] = max(0.0, total - measured)
+    entries['total'] = total
+
+    parts = []
+    for phase, duration in entries.items():
+        description = PHASE_DESCRIPTIONS.get(phase, phase)
+        if phase == 'db' and query_count is not None:
+            description = f'{description} ({query_count} queries)'
+        parts.append(f'{phase};dur={duration * 1000:.2f};desc="{description}"')
+    return ', '.join(parts)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_app_context() and g.get('_server_timing') is not None:
+        conn.info.setdefault('_server_timing_start', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('_server_timing_start')
+    if not starts or not has_app_context():
+        return
+    timings = g.get('_server_timing')
+    if timings is not None:
+        timings['db'] = timings.get('db', 0.0) + time.perf_counter() - starts.pop()
+        timings['db_count'] = timings.get('db_count', 0) + 1
+
+def init_server_timing(app, db):
+    """Install Server-Timing hooks when SERVER_TIMING_ENABLED is set"""
+    if not app.config.get('SERVER_TIMING_ENABLED', False):
+        return
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(db.engine, 'after_cursor_execute', _after_cursor_execute)
+
+    # JSON encoding counts towards the serialization phase
+    encode = app.json.dumps
+
+    def timed_dumps(obj, **kwargs):
+        with timing('serialize'):
+            return encode(obj, **kwargs)
+    app.json.dumps = timed_dumps
+
+    @app.before_request
+    def start_server_timing():
+        g._server_timing = {'db': 0.0}
+        g._server_timing_start = time.perf_counter()
+
+    @app.after_request
+    def add_server_timing_header(response):
+        timings = g.pop('_server_timing', None)
+        if timings is not None:
+            total = time.perf_counter() - g.pop('_server_timing_start')
+            query_count = timings.get('db_count', 0)
+            response.headers['Server-Timing'] = format_server_timing(timings, total, query_count)
+        return response
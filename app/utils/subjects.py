@@ -0,0 +1,282 @@
+"""
+Per-user subject dictionary
+
+Tasks and study sessions keep the subject text the user typed plus a
+subject_id into `subjects`, where case and whitespace variants ("Math",
+" math ") share one row. Aggregations group on that small integer, and the
+subject pickers read a per-user list cached in process instead of running
+DISTINCT over every task on each page view. The cached map also carries a
+sorted-array prefix index that answers autocomplete queries without touching
+the database.
+
+ORM writes get subject_id from a before_flush hook; bulk Core inserts
+(imports, seeding) resolve a whole batch with subject_ids(). Subjects a
+transaction creates are kept in session.info until it commits, and only then
+published to the shared cache, so other requests never see uncommitted ids.
+"""
+
+import threading
+from bisect import bisect_left, insort
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime
+from itertools import chain
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from app import db
+from app.models import Subject, Task, StudySession
+from app.models.subject import normalize_subject
+
+# Display name for study time grouped by subject: sessions outer-join subjects,
+# and ones without a subject_id (not linked yet) fall back to their own text
+SESSION_SUBJECT = db.func.coalesce(Subject.name, StudySession.subject)
+
+def _normalize_prefix(prefix):
+    """Like normalize_subject, but a trailing space still ends the word ("linear " skips "linearity")"""
+    normalized = normalize_subject(prefix)
+    return normalized + ' ' if normalized and prefix[-1:].isspace() else normalized
+
+class SubjectIndex(dict):
+    """A user's {normalized: (id, name)} map plus a lazily sorted key array for prefix lookups"""
+
+    def __init__(self, entries=()):
+        super().__init__(entries)
+        self._keys = None
+
+    def with_subjects(self, entries):
+        """A new index with entries added; an already built key array is extended, not re-sorted"""
+        index = SubjectIndex(self)
+        index.update(entries)
+        if self._keys is not None:
+            keys = list(self._keys)
+            for key in entries:
+                if key not in self:
+                    insort(keys, key)
+            index._keys = keys
+        return index
+
+    def complete(self, prefix, limit=10):
+        """Display names of subjects starting with prefix (case/whitespace-insensitive), alphabetically"""
+        if self._keys is None:
+            self._keys = sorted(self)
+        keys, key = self._keys, _normalize_prefix(prefix)
+        names = []
+        for position in range(bisect_left(keys, key), len(keys)):
+            if len(names) >= limit or not keys[position].startswith(key):
+                break
+            names.append(self[keys[position]][1])
+        return names
+
+class SubjectCache:
+    """Bounded LRU of per-user SubjectIndex maps
+
+    Subjects are never renamed or removed while the app runs, so a cached id
+    stays right; the TTL bounds how long another worker's new subjects stay
+    out of the cached list. Maps are replaced, never mutated, so readers can
+    iterate them without the lock.
+    """
+
+    def __init__(self, max_users=10000, ttl=300):
+        self.max_users = max_users
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, user_id, subjects):
+        if self.max_users <= 0:
+            return
+        with self._lock:
+            self._entries[user_id] = (time.monotonic(), subjects)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_users:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+def _cache():
+    return current_app.extensions.get('subject_cache') if has_app_context() else None
+
+def _load(user_id):
+    rows = db.session.execute(
+        db.select(Subject.normalized, Subject.id, Subject.name).where(Subject.user_id == user_id)
+    )
+    return SubjectIndex((normalized, (subject_id, name)) for normalized, subject_id, name in rows)
+
+def _pending():
+    """{user_id: SubjectIndex or None} of users with subjects created in the current transaction"""
+    return db.session.info.setdefault('pending_subjects', {})
+
+def _subjects(user_id, refresh=False):
+    pending = _pending()
+    if user_id in pending:
+        # The map includes uncommitted rows: keep it to this session until commit
+        if refresh or pending[user_id] is None:
+            pending[user_id] = _load(user_id)
+        return pending[user_id]
+    
+    cache = _cache()
+    subjects = None if refresh or cache is None else cache.get(user_id)
+    if subjects is None:
+        subjects = _load(user_id)
+        if cache is not None:
+            cache.put(user_id, subjects)
+    return subjects
+
+def _insert_ignoring_duplicates(dialect_name):
+    if dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(Subject.__table__).on_conflict_do_nothing(index_elements=['user_id', 'normalized'])
+
+def subject_ids(user_id, names):
+    """{name: subject id} for a user, creating dictionary rows for new subjects"""
+    subjects = _subjects(user_id)
+    missing = {}
+    for name in names:
+        normalized = normalize_subject(name)
+        if normalized not in subjects:
+            missing.setdefault(normalized, name)
+    
+    if missing:
+        # ON CONFLICT DO NOTHING: another request may create the same subject concurrently
+        now = datetime.utcnow()
+        db.session.execute(_insert_ignoring_duplicates(db.session.get_bind().dialect.name), [
+            {'user_id': user_id, 'name': ' '.join(name.split()), 'normalized': normalized, 'created_at': now}
+            for normalized, name in missing.items()
+        ])
+        rows = db.session.execute(
+            db.select(Subject.normalized, Subject.id, Subject.name)
+            .where(Subject.user_id == user_id, Subject.normalized.in_(list(missing)))
+        )
+        subjects = subjects.with_subjects({normalized: (subject_id, name) for normalized, subject_id, name in rows})
+        _pending()[user_id] = subjects
+    
+    return {name: subjects[normalize_subject(name)][0] for name in names}
+
+def find_subject_id(user_id, name):
+    """Subject id for a name without creating it, or None"""
+    key = normalize_subject(name)
+    subjects = _subjects(user_id)
+    if key not in subjects:
+        subjects = _subjects(user_id, refresh=True)
+    entry = subjects.get(key)
+    return entry[0] if entry else None
+
+def user_subjects(user_id):
+    """The user's subject names, alphabetically (cached)"""
+    return sorted((name for _, name in _subjects(user_id).values()), key=str.casefold)
+
+def complete_subjects(user_id, prefix, limit=10):
+    """Autocomplete suggestions for a subject prefix, from the cached index"""
+    return _subjects(user_id).complete(prefix, limit)
+
+def _assign_subject_ids(session, flush_context, instances):
+    """before_flush: point new or re-subjected tasks/sessions at their dictionary row"""
+    pending = {}
+    for obj in chain(session.new, session.dirty):
+        if not isinstance(obj, (Task, StudySession)) or obj.user_id is None or obj.subject is None:
+            continue
+        if obj.subject_id is None or inspect(obj).attrs.subject.history.has_changes():
+            pending.setdefault(obj.user_id, []).append(obj)
+    
+    with session.no_autoflush:
+        for user_id, objects in pending.items():
+            ids = subject_ids(user_id, dict.fromkeys(obj.subject for obj in objects))
+            for obj in objects:
+                obj.subject_id = ids[obj.subject]
+
+def _publish_committed_subjects(session):
+    """after_commit: share the maps of users whose new subjects are now committed"""
+    pending = session.info.pop('pending_subjects', {})
+    cache = _cache()
+    if cache is not None:
+        for user_id, subjects in pending.items():
+            if subjects is None:
+                cache.invalidate(user_id)
+            else:
+                cache.put(user_id, subjects)
+
+def _discard_rolled_back_subjects(session, previous_transaction):
+    """after_soft_rollback: drop maps that may hold ids the rollback removed"""
+    if previous_transaction.nested:
+        # Subjects from before the savepoint are still pending; reload on next use
+        pending = session.info.get('pending_subjects', {})
+        for user_id in pending:
+            pending[user_id] = None
+    else:
+        session.info.pop('pending_subjects', None)
+
+def backfill_subjects(connection):
+    """Create dictionary rows for existing subject text and link tasks/sessions to them
+
+    Variants that differ only in case or whitespace merge into one subject,
+    named after the most used spelling.
+    """
+    tasks, sessions = db.metadata.tables['tasks'], db.metadata.tables['study_sessions']
+    subjects = Subject.__table__
+    
+    usage = {}
+    for table in (tasks, sessions):
+        rows = connection.execute(
+            db.select(table.c.user_id, table.c.subject, db.func.count())
+            .where(table.c.subject_id.is_(None))
+            .group_by(table.c.user_id, table.c.subject)
+        )
+        for user_id, spelling, count in rows:
+            usage.setdefault((user_id, normalize_subject(spelling)), Counter())[spelling] += count
+    if not usage:
+        return
+    
+    def existing():
+        rows = connection.execute(db.select(subjects.c.user_id, subjects.c.normalized, subjects.c.id))
+        return {(user_id, normalized): subject_id for user_id, normalized, subject_id in rows}
+    
+    known = existing()
+    now = datetime.utcnow()
+    new_rows = [
+        {'user_id': user_id, 'normalized': normalized, 'created_at': now,
+         'name': ' '.join(spellings.most_common(1)[0][0].split())}
+        for (user_id, normalized), spellings in usage.items() if (user_id, normalized) not in known
+    ]
+    if new_rows:
+        connection.execute(subjects.insert(), new_rows)
+        known = existing()
+    
+    params = [
+        {'b_subject_id': known[key], 'b_user_id': key[0], 'b_spelling': spelling}
+        for key, spellings in usage.items() for spelling in spellings
+    ]
+    for table in (tasks, sessions):
+        connection.execute(
+            table.update()
+            .where(table.c.user_id == db.bindparam('b_user_id'), table.c.subject == db.bindparam('b_spelling'),
+                   table.c.subject_id.is_(None))
+            .values(subject_id=db.bindparam('b_subject_id')),
+            params
+        )
+
+def init_subjects(app):
+    """Install the subject cache and the flush hook that keeps subject_id in step"""
+    app.extensions['subject_cache'] = SubjectCache(
+        app.config.get('SUBJECT_CACHE_SIZE', 10000), app.config.get('SUBJECT_CACHE_TTL', 300)
+    )
+    for name, listener in (('before_flush', _assign_subject_ids), ('after_commit', _publish_committed_subjects),
+                           ('after_soft_rollback', _discard_rolled_back_subjects)):
+        if not event.contains(Session, name, listener):
+            event.listen(Session, name, listener)
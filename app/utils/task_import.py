@@ -0,0 +1,214 @@
+"""
+Streaming task import from CSV and iCalendar files
+
+Rows are parsed one at a time from the upload stream, validated with TaskForm
+(so imports follow exactly the rules of the add-task page) and inserted in
+executemany batches. Invalid rows are skipped and reported with their line
+number; memory stays bounded by the batch size regardless of file size.
+"""
+
+import codecs
+import csv
+import io
+import time
+from datetime import datetime
+import click
+from flask.cli import with_appcontext
+from werkzeug.datastructures import MultiDict
+from app import db
+from app.utils.forms import TaskForm
+from app.utils.subjects import subject_ids
+
+TASK_FIELDS = ('title', 'description', 'subject', 'priority', 'difficulty',
+               'estimated_hours', 'due_date', 'category')
+REQUIRED_FIELDS = ('title', 'subject', 'due_date')
+
+# iCalendar PRIORITY: 1 (highest) to 9 (lowest), 0 = undefined
+ICS_PRIORITIES = {1: 'urgent', 2: 'high', 3: 'high', 4: 'high', 5: 'medium', 6: 'low', 7: 'low', 8: 'low', 9: 'low'}
+
+class ImportResult:
+    """Counts and row-level errors of one import"""
+
+    def __init__(self, max_errors=100):
+        self.imported = 0
+        self.rows = 0
+        self.error_count = 0
+        self.errors = []
+        self.max_errors = max_errors
+
+    def add_error(self, line, errors):
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'line': line, 'errors': errors})
+
+    def to_dict(self):
+        return {
+            'rows': self.rows,
+            'imported': self.imported,
+            'error_count': self.error_count,
+            'errors': self.errors,
+            'errors_truncated': self.error_count > len(self.errors)
+        }
+
+def _text_stream(stream):
+    """Decode a binary upload lazily (a leading BOM is dropped)"""
+    if isinstance(stream, io.TextIOBase):
+        return stream
+    return codecs.getreader('utf-8-sig')(stream, errors='replace')
+
+def iter_csv_rows(stream):
+    """Yield (line number, row dict) from a CSV file with a header row"""
+    reader = csv.DictReader(_text_stream(stream))
+    if reader.fieldnames:
+        reader.fieldnames = [name.strip().lower().replace(' ', '_') for name in reader.fieldnames]
+    for row in reader:
+        yield reader.line_num, {key: (value or '').strip() for key, value in row.items() if key in TASK_FIELDS}
+
+def _unfold(stream):
+    """Join RFC 5545 folded lines, yielding (line number, logical line)"""
+    pending, pending_line = None, 0
+    for number, line in enumerate(stream, start=1):
+        line = line.rstrip('\r\n')
+        if line[:1] in (' ', '\t') and pending is not None:
+            pending += line[1:]
+            continue
+        if pending is not None:
+            yield pending_line, pending
+        pending, pending_line = line, number
+    if pending is not None:
+        yield pending_line, pending
+
+def _ics_text(value):
+    return (value.replace('\\n', '\n').replace('\\N', '\n')
+            .replace('\\,', ',').replace('\\;', ';').replace('\\\\', '\\'))
+
+def iter_ics_rows(stream):
+    """Yield (line number, row dict) for each VTODO/VEVENT in an iCalendar file"""
+    row, start_line = None, 0
+    for number, line in _unfold(_text_stream(stream)):
+        name, _, value = line.partition(':')
+        name = name.split(';', 1)[0].upper()
+        if name == 'BEGIN' and value.upper() in ('VTODO', 'VEVENT'):
+            row, start_line = {}, number
+        elif name == 'END' and value.upper() in ('VTODO', 'VEVENT') and row is not None:
+            yield start_line, row
+            row = None
+        elif row is None:
+            continue
+        elif name == 'SUMMARY':
+            row['title'] = _ics_text(value).strip()
+        elif name == 'DESCRIPTION':
+            row['description'] = _ics_text(value).strip()
+        elif name == 'CATEGORIES':
+            row['subject'] = _ics_text(value).split(',')[0].strip()
+        elif name in ('DUE', 'DTSTART') and ('due_date' not in row or name == 'DUE'):
+            # DATE (20240131) or DATE-TIME (20240131T090000Z); only the day is kept
+            digits = value.strip()[:8]
+            row['due_date'] = f'{digits[:4]}-{digits[4:6]}-{digits[6:8]}' if len(digits) == 8 else value
+        elif name == 'PRIORITY' and value.strip().isdigit() and int(value) in ICS_PRIORITIES:
+            row['priority'] = ICS_PRIORITIES[int(value)]
+
+def detect_format(filename, content_type=None):
+    """'csv' or 'ics' from the file name or content type"""
+    name = (filename or '').lower()
+    if name.endswith(('.ics', '.ical', '.ifb')) or (content_type or '').startswith('text/calendar'):
+        return 'ics'
+    return 'csv'
+
+def validate_row(row, default_subject=None, form=None):
+    """Validate one row with TaskForm; returns (values, errors)
+
+    Pass the same form for every row of an import: re-processing a bound form
+    is several times cheaper than constructing one per row.
+    """
+    # Blank optional cells take the form defaults; blank required ones fail like an empty form field
+    data = {key: value for key, value in row.items() if value not in (None, '')}
+    if default_subject and 'subject' not in data:
+        data['subject'] = default_subject
+    for field in REQUIRED_FIELDS:
+        data.setdefault(field, '')
+
+    if form is None:
+        form = TaskForm(formdata=MultiDict(data), meta={'csrf': False})
+    else:
+        form.process(formdata=MultiDict(data))
+    if not form.validate():
+        return None, {field: messages for field, messages in form.errors.items()}
+
+    return {
+        'title': form.title.data,
+        'description': form.description.data or None,
+        'subject': form.subject.data,
+        'priority': form.priority.data,
+        'difficulty': form.difficulty.data,
+        'estimated_hours': form.estimated_hours.data,
+        'due_date': form.due_date.data,
+        'category': form.category.data
+    }, None
+
+def import_tasks(user_id, rows, batch_size=2000, default_subject=None, max_errors=100):
+    """Validate and insert rows for a user; commits and returns an ImportResult"""
+    from app.models import Task
+    table = Task.__table__
+    result = ImportResult(max_errors)
+    form = TaskForm(formdata=MultiDict(), meta={'csrf': False})
+    batch = []
+
+    def flush():
+        if batch:
+            ids = subject_ids(user_id, dict.fromkeys(row['subject'] for row in batch))
+            for row in batch:
+                row['subject_id'] = ids[row['subject']]
+            db.session.execute(table.insert(), batch)
+            result.imported += len(batch)
+            batch.clear()
+
+    try:
+        for line, row in rows:
+            result.rows += 1
+            values, errors = validate_row(row, default_subject, form)
+            if errors:
+                result.add_error(line, errors)
+                continue
+            now = datetime.utcnow()
+            values.update(user_id=user_id, created_at=now, updated_at=now)
+            batch.append(values)
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+        db.session.commit()
+    except (csv.Error, UnicodeError) as e:
+        db.session.rollback()
+        result.imported = 0
+        result.add_error(result.rows + 1, {'file': [str(e)]})
+    return result
+
+def parse_rows(stream, file_format):
+    return iter_ics_rows(stream) if file_format == 'ics' else iter_csv_rows(stream)
+
+@click.command('import-tasks')
+@click.argument('username')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'file_format', type=click.Choice(['csv', 'ics']), help='Defaults to the file extension')
+@click.option('--subject', help='Subject for rows without one (e.g. .ics events without CATEGORIES)')
+@click.option('--batch-size', default=2000, show_default=True, help='Rows per insert batch')
+@with_appcontext
+def import_tasks_command(username, path, file_format, subject, batch_size):
+    """Import tasks for USERNAME from a CSV or .ics file"""
+    from app.models import User
+    user = User.query.filter_by(username=username).first()
+    if user is None:
+        raise click.ClickException(f'No user named {username}')
+
+    started = time.perf_counter()
+    with open(path, 'rb') as f:
+        result = import_tasks(user.id, parse_rows(f, file_format or detect_format(path)),
+                              batch_size=batch_size, default_subject=subject)
+    elapsed = time.perf_counter() - started
+
+    for error in result.errors:
+        details = '; '.join(f"{field}: {' '.join(messages)}" for field, messages in error['errors'].items())
+        print(f"  line {error['line']}: {details}")
+    if result.error_count > len(result.errors):
+        print(f'  ... and {result.error_count - len(result.errors)} more errors')
+    print(f'Imported {result.imported} of {result.rows} rows in {elapsed:.1f}s ({result.error_count} errors)')
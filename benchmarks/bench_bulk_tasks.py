@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Bulk task completion vs one toggle call per task
+
+Completes N tasks through POST /api/tasks/<id>/toggle-status (one request,
+task load, UserPoints load and commit each) and through a single
+POST /api/tasks/bulk, reporting wall time and SQL statements for both.
+
+Usage: python benchmarks/bench_bulk_tasks.py [--sizes 20 100 500] [--database sqlite:///bench.db]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+from app import create_app, db
+from app.models import User, Task, UserPoints
+from config import TestingConfig, config
+
+def make_app(database_url):
+    class BenchmarkConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = database_url
+        SQL_INSTRUMENTATION_SAMPLE_RATE = 0
+    config['bulk_benchmark'] = BenchmarkConfig
+    return create_app('bulk_benchmark')
+
+def create_tasks(app, user_id, count):
+    with app.app_context():
+        tasks = [Task(title=f'Task {index}', subject='Math', priority='medium', difficulty=3,
+                      due_date=date.today() + timedelta(days=index % 30), user_id=user_id)
+                 for index in range(count)]
+        db.session.add_all(tasks)
+        db.session.commit()
+        return [task.id for task in tasks]
+
+def measure(engine, action):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', count)
+    try:
+        started = time.perf_counter()
+        action()
+        elapsed = time.perf_counter() - started
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+    return elapsed, len(statements)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[20, 100, 500])
+    parser.add_argument('--database', help='Database URL (default: a temporary SQLite file)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        app = make_app(args.database or f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        with app.app_context():
+            db.create_all()
+            user = User(username='benchuser', email='bench@example.com', first_name='Bench', last_name='User')
+            user.set_password('password123')
+            db.session.add(user)
+            db.session.flush()
+            db.session.add(UserPoints(user_id=user.id))
+            db.session.commit()
+            user_id, engine = user.id, db.engine
+
+        client = app.test_client()
+        client.post('/auth/login', data={'username': 'benchuser', 'password': 'password123'})
+
+        print(f"{'tasks':>6} {'per-call ms':>12} {'statements':>11} {'bulk ms':>9} {'statements':>11} {'speedup':>8}")
+        for size in args.sizes:
+            single_ids = create_tasks(app, user_id, size)
+            bulk_ids = create_tasks(app, user_id, size)
+
+            def per_call():
+                for task_id in single_ids:
+                    assert client.post(f'/api/tasks/{task_id}/toggle-status').status_code == 200
+
+            def bulk():
+                response = client.post('/api/tasks/bulk', json={'operation': 'complete', 'task_ids': bulk_ids})
+                assert response.get_json()['updated'] == size
+
+            single_time, single_statements = measure(engine, per_call)
+            bulk_time, bulk_statements = measure(engine, bulk)
+            print(f'{size:6d} {single_time * 1000:12.1f} {single_statements:11d} '
+                  f'{bulk_time * 1000:9.1f} {bulk_statements:11d} {single_time / bulk_time:7.1f}x')
+
+        with app.app_context():
+            db.drop_all()
+            db.engine.dispose()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Login throughput against password hash cost
+
+Drives PasswordHasher.verify from many concurrent "request" threads for each
+PBKDF2 iteration count and reports successful logins/sec, latency and how many
+requests were shed with 503 because the pool was saturated.
+
+Usage: python benchmarks/bench_password_hashing.py [--seconds 3] [--clients 16] [--workers 4]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.security import generate_password_hash
+from app.utils.passwords import PasswordHasher, PasswordHasherBusy
+
+ITERATIONS = [50000, 150000, 300000, 600000]
+
+def run(iterations, seconds, clients, workers, max_pending):
+    """Verify one password repeatedly from `clients` threads"""
+    method = f'pbkdf2:sha256:{iterations}'
+    pwhash = generate_password_hash('correct horse', method)
+    hasher = PasswordHasher(method=method, workers=workers, max_pending=max_pending)
+
+    latencies, shed = [], [0]
+    stop = time.perf_counter() + seconds
+
+    def client():
+        while time.perf_counter() < stop:
+            started = time.perf_counter()
+            try:
+                hasher.verify(pwhash, 'correct horse')
+                latencies.append(time.perf_counter() - started)
+            except PasswordHasherBusy:
+                shed[0] += 1
+                time.sleep(0.01)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    hasher.shutdown()
+
+    return {
+        'logins_per_sec': round(len(latencies) / seconds, 1),
+        'p50_ms': round(statistics.median(latencies) * 1000, 1) if latencies else None,
+        'p95_ms': round(statistics.quantiles(latencies, n=20)[-1] * 1000, 1) if len(latencies) > 1 else None,
+        'shed_503': shed[0]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--seconds', type=float, default=3)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2)
+    parser.add_argument('--max-pending', type=int, default=None)
+    args = parser.parse_args()
+    max_pending = args.max_pending or args.workers * 4
+
+    results = {
+        iterations: run(iterations, args.seconds, args.clients, args.workers, max_pending)
+        for iterations in ITERATIONS
+    }
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
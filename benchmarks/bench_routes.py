@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Route-level benchmark suite with query-count and latency budgets
+
+Seeds small, medium and large datasets with the `flask seed` generator, logs in
+as the heaviest user and drives every page and API through the Flask test
+client. For each route it records p50/p95 latency, query count and peak Python
+memory, then compares against benchmarks/route_baseline.json and exits non-zero
+when a route exceeds its budget.
+
+Usage:
+    python benchmarks/bench_routes.py                      # check against baseline
+    python benchmarks/bench_routes.py --update-baseline    # record a new baseline
+    python benchmarks/bench_routes.py --datasets small medium --runs 20
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+from app import create_app, db
+from app.models import Task, User
+from app.utils.seed import SeedOptions, seed_database
+from config import TestingConfig, config
+
+class BenchmarkConfig(TestingConfig):
+    # Measure the application, not the debug instrumentation
+    SQL_INSTRUMENTATION_SAMPLE_RATE = 0
+
+config['benchmark'] = BenchmarkConfig
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'route_baseline.json')
+
+# The benchmarked user, plus a population of other users for shared queries (leaderboard)
+DATASETS = {
+    'small': {'tasks': 50, 'sessions': 150, 'others': 20},
+    'medium': {'tasks': 500, 'sessions': 2000, 'others': 200},
+    'large': {'tasks': 5000, 'sessions': 20000, 'others': 1000}
+}
+
+ROUTES = [
+    ('main.dashboard', '/dashboard'),
+    ('main.pomodoro', '/pomodoro'),
+    ('main.leaderboard', '/leaderboard'),
+    ('main.achievements', '/achievements'),
+    ('main.dashboard_stats', '/api/dashboard-stats'),
+    ('analytics.index', '/analytics/'),
+    ('analytics.productivity', '/analytics/productivity'),
+    ('analytics.goals', '/analytics/goals'),
+    ('analytics.chart_data.daily', '/analytics/api/chart-data?type=daily&days=30'),
+    ('analytics.chart_data.subjects', '/analytics/api/chart-data?type=subjects'),
+    ('analytics.chart_data.focus', '/analytics/api/chart-data?type=focus&days=30'),
+    ('tasks.index', '/tasks/'),
+    ('tasks.study_sessions', '/tasks/study-sessions'),
+    ('tasks.api_tasks', '/tasks/api/tasks'),
+    ('tasks.api_search', '/tasks/api/search?q=prob'),
+    ('tasks.api_subjects', '/tasks/api/subjects?q=c'),
+    ('api.dashboard_summary', '/api/dashboard/summary'),
+    ('api.user_stats', '/api/user/stats'),
+    ('api.study_recommendations', '/api/study-recommendations')
+]
+
+# Allowed regression relative to the baseline before a route fails its budget
+LATENCY_TOLERANCE = 1.0      # 2x p95 (timings are machine dependent)
+LATENCY_FLOOR_MS = 10.0      # ignore regressions smaller than this
+QUERY_TOLERANCE = 0          # query counts are deterministic
+MEMORY_TOLERANCE = 0.5       # +50% peak allocations
+
+def build_app(dataset, seed):
+    """Create an app on a fresh database seeded for `dataset`"""
+    app = create_app('benchmark')
+    sizes = DATASETS[dataset]
+
+    with app.app_context():
+        db.create_all()
+        with db.engine.begin() as connection:
+            seed_database(connection, SeedOptions(
+                users=1, tasks_per_user=sizes['tasks'], sessions_per_user=sizes['sessions'],
+                streak_probability=1.0, seed=seed, username_prefix='benchuser'
+            ))
+            seed_database(connection, SeedOptions(users=sizes['others'], seed=seed + 1))
+        user = User.query.filter(User.username.like('benchuser%')).first()
+        username, task_count = user.username, Task.query.filter_by(user_id=user.id).count()
+
+    return app, username, task_count
+
+def measure_route(app, client, path, runs):
+    """Latency percentiles, queries per request and peak memory for one route"""
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', count)
+    try:
+        response = client.get(path)  # warm up caches and lazy imports
+        if response.status_code != 200:
+            raise RuntimeError(f'{path} returned {response.status_code}')
+
+        latencies, query_counts = [], []
+        for _ in range(runs):
+            statements.clear()
+            started = time.perf_counter()
+            client.get(path)
+            latencies.append((time.perf_counter() - started) * 1000)
+            query_counts.append(len(statements))
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+
+    tracemalloc.start()
+    client.get(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        'p50_ms': round(statistics.median(latencies), 2),
+        'p95_ms': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 2),
+        # Median, so an occasional identity-cache refresh does not count against the route
+        'queries': int(statistics.median(query_counts)),
+        'peak_kb': round(peak / 1024, 1)
+    }
+
+def run_dataset(dataset, runs, seed):
+    app, username, task_count = build_app(dataset, seed)
+    client = app.test_client()
+    client.post('/auth/login', data={'username': username, 'password': 'password123'})
+
+    print(f'== {dataset}: benchmark user has {task_count} tasks', file=sys.stderr)
+    results = {}
+    for name, path in ROUTES:
+        results[name] = measure_route(app, client, path, runs)
+        print(f"  {name:32} p50 {results[name]['p50_ms']:8.2f}ms  p95 {results[name]['p95_ms']:8.2f}ms  "
+              f"{results[name]['queries']:5d} queries  {results[name]['peak_kb']:9.1f} KiB", file=sys.stderr)
+    return results
+
+def check_budgets(results, baseline, latency_tolerance=LATENCY_TOLERANCE):
+    """Return a list of budget violations"""
+    failures = []
+    for dataset, routes in results.items():
+        for name, current in routes.items():
+            budget = baseline.get(dataset, {}).get(name)
+            if budget is None:
+                continue
+            if current['queries'] > budget['queries'] + QUERY_TOLERANCE:
+                failures.append(f"{dataset} {name}: {current['queries']} queries > budget {budget['queries']}")
+            latency_budget = max(budget['p95_ms'] * (1 + latency_tolerance), budget['p95_ms'] + LATENCY_FLOOR_MS)
+            if current['p95_ms'] > latency_budget:
+                failures.append(f"{dataset} {name}: p95 {current['p95_ms']}ms > budget {latency_budget:.2f}ms")
+            memory_budget = budget['peak_kb'] * (1 + MEMORY_TOLERANCE)
+            if current['peak_kb'] > memory_budget:
+                failures.append(f"{dataset} {name}: peak {current['peak_kb']}KiB > budget {memory_budget:.1f}KiB")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--datasets', nargs='+', choices=list(DATASETS), default=['small', 'medium', 'large'])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--latency-tolerance', type=float, default=LATENCY_TOLERANCE,
+                        help='Allowed p95 growth over the baseline (1.0 = twice as slow)')
+    parser.add_argument('--output', help='Also write the results to this JSON file')
+    args = parser.parse_args()
+
+    results = {dataset: run_dataset(dataset, args.runs, args.seed) for dataset in args.datasets}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f'Baseline written to {args.baseline}')
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print('No baseline found; run with --update-baseline first.')
+        return 1
+    with open(args.baseline) as f:
+        failures = check_budgets(results, json.load(f), args.latency_tolerance)
+
+    for failure in failures:
+        print(f'BUDGET EXCEEDED  {failure}')
+    print('All routes within budget.' if not failures else f'{len(failures)} budget violation(s).')
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Task/session list serialization: ORM to_dict vs projected rows
+
+Builds the JSON for N-row payloads both ways and reports rows/sec per phase:
+  before: ORM instances -> to_dict() -> Flask's default (stdlib) JSON provider
+  after:  TASK_COLUMNS / SESSION_COLUMNS rows -> app.utils.serializers -> FastJSONProvider (orjson)
+
+The encode phase builds the response the way jsonify() does (provider.response),
+with the app's compact separators.
+
+Usage: python benchmarks/bench_serializers.py [--rows 10000] [--runs 5]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask.json.provider import DefaultJSONProvider
+from app import create_app, db
+from app.models import User, Task, StudySession
+from app.utils.json_provider import FastJSONProvider, orjson
+from app.utils.serializers import SESSION_COLUMNS, TASK_COLUMNS, serialize_sessions, serialize_tasks
+from config import TestingConfig, config
+
+def make_app(database_url):
+    class BenchmarkConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = database_url
+        SQL_INSTRUMENTATION_SAMPLE_RATE = 0
+    config['serializer_benchmark'] = BenchmarkConfig
+    return create_app('serializer_benchmark')
+
+def seed(user_id, count):
+    today, now = date.today(), datetime.utcnow()
+    db.session.execute(Task.__table__.insert(), [
+        {'title': f'Task {index}', 'description': 'Read the chapter and summarise it', 'subject': 'Math',
+         'priority': 'medium', 'status': 'completed' if index % 3 == 0 else 'pending', 'difficulty': 3,
+         'estimated_hours': 1.5, 'due_date': today + timedelta(days=index % 60 - 30), 'category': 'assignment',
+         'points_awarded': 0, 'created_at': now, 'updated_at': now, 'user_id': user_id}
+        for index in range(count)
+    ])
+    db.session.execute(StudySession.__table__.insert(), [
+        {'subject': 'Math', 'duration': 25 + index % 90, 'session_type': 'pomodoro', 'focus_rating': index % 10 + 1,
+         'notes': None, 'pomodoro_cycles': 1, 'breaks_taken': 0, 'date': today - timedelta(days=index % 30),
+         'start_time': now, 'end_time': now, 'created_at': now, 'points_earned': 2, 'user_id': user_id}
+        for index in range(count)
+    ])
+    db.session.commit()
+
+def run(phases):
+    """Time each (name, fn) phase in order, feeding each result into the next"""
+    timings, value = {}, None
+    for name, fn in phases:
+        started = time.perf_counter()
+        value = fn(value)
+        timings[name] = time.perf_counter() - started
+    return timings
+
+def pipelines(app, user_id):
+    default_json, fast_json = DefaultJSONProvider(app), FastJSONProvider(app)
+    return {
+        'tasks': {
+            'before': [
+                ('load', lambda _: Task.query.filter_by(user_id=user_id).order_by(Task.due_date, Task.id).all()),
+                ('serialize', lambda tasks: [task.to_dict() for task in tasks]),
+                ('encode', lambda data: default_json.response({'tasks': data}))
+            ],
+            'after': [
+                ('load', lambda _: db.session.query(*TASK_COLUMNS).filter_by(user_id=user_id)
+                 .order_by(Task.due_date, Task.id).all()),
+                ('serialize', serialize_tasks),
+                ('encode', lambda data: fast_json.response({'tasks': data}))
+            ]
+        },
+        'sessions': {
+            'before': [
+                ('load', lambda _: StudySession.query.filter_by(user_id=user_id)
+                 .order_by(StudySession.created_at.desc(), StudySession.id.desc()).all()),
+                ('serialize', lambda sessions: [session.to_dict() for session in sessions]),
+                ('encode', lambda data: default_json.response({'sessions': data}))
+            ],
+            'after': [
+                ('load', lambda _: db.session.query(*SESSION_COLUMNS).filter_by(user_id=user_id)
+                 .order_by(StudySession.created_at.desc(), StudySession.id.desc()).all()),
+                ('serialize', serialize_sessions),
+                ('encode', lambda data: fast_json.response({'sessions': data}))
+            ]
+        }
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--runs', type=int, default=5, help='Median of this many runs per variant')
+    args = parser.parse_args()
+    if orjson is None:
+        print('orjson is not installed; "after" encodes with the stdlib fallback', file=sys.stderr)
+
+    with tempfile.TemporaryDirectory() as directory:
+        app = make_app(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        with app.app_context():
+            db.create_all()
+            user = User(username='benchuser', email='bench@example.com', first_name='Bench', last_name='User')
+            user.set_password('password123')
+            db.session.add(user)
+            db.session.commit()
+            seed(user.id, args.rows)
+
+            print(f"{'payload':<9} {'variant':<7} {'load':>11} {'serialize':>11} {'encode':>11} {'total':>11}  rows/sec")
+            for payload, variants in pipelines(app, user.id).items():
+                totals = {}
+                for variant, phases in variants.items():
+                    runs = []
+                    for _ in range(args.runs):
+                        db.session.expunge_all()
+                        runs.append(run(phases))
+                    medians = {name: statistics.median(timing[name] for timing in runs) for name, _ in phases}
+                    totals[variant] = sum(medians.values())
+                    cells = ' '.join(f'{medians[name] * 1000:9.1f}ms' for name, _ in phases)
+                    print(f'{payload:<9} {variant:<7} {cells} {totals[variant] * 1000:9.1f}ms  '
+                          f'{args.rows / totals[variant]:9,.0f}')
+                print(f"{'':<9} speedup {totals['before'] / totals['after']:.1f}x")
+
+            db.drop_all()
+            db.engine.dispose()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Concurrent read/write benchmark for the SQLite engine profile
+
+Writer threads log study sessions and commit (like Pomodoro completions) while
+reader threads run the dashboard's weekly aggregate. Compares the legacy
+rollback journal with the WAL profile from app/utils/database.py.
+
+Usage: python benchmarks/bench_sqlite_concurrency.py [--seconds 5] [--readers 8] [--writers 2]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.exc import OperationalError
+from app import db
+from app.models import User, StudySession
+from app.utils.database import build_engine_options, install_sqlite_pragmas
+
+PROFILES = {
+    'rollback_journal': {'SQLITE_JOURNAL_MODE': 'DELETE', 'SQLITE_SYNCHRONOUS': 'FULL',
+                         'SQLITE_MMAP_SIZE': 0, 'SQLITE_BUSY_TIMEOUT': 5000},
+    'wal': {'SQLITE_JOURNAL_MODE': 'WAL', 'SQLITE_SYNCHRONOUS': 'NORMAL',
+            'SQLITE_MMAP_SIZE': 256 * 1024 * 1024, 'SQLITE_BUSY_TIMEOUT': 5000}
+}
+
+def make_engine(path, profile):
+    """Create an engine configured the way create_app would"""
+    config = dict(PROFILES[profile], SQLALCHEMY_DATABASE_URI=f'sqlite:///{path}')
+    engine = create_engine(config['SQLALCHEMY_DATABASE_URI'], **build_engine_options(config))
+    install_sqlite_pragmas(engine, config)
+    return engine
+
+def seed(engine, sessions=5000):
+    """Create the schema with one user and some session history"""
+    db.metadata.create_all(engine)
+    today = date.today()
+    with engine.begin() as connection:
+        connection.execute(User.__table__.insert().values(
+            id=1, username='bench', email='bench@example.com', password_hash='x',
+            first_name='Bench', last_name='User'
+        ))
+        connection.execute(StudySession.__table__.insert(), [{
+            'user_id': 1, 'subject': 'Mathematics', 'duration': 25, 'focus_rating': 5,
+            'date': today - timedelta(days=i % 365), 'start_time': datetime.utcnow()
+        } for i in range(sessions)])
+
+def run_profile(profile, seconds, readers, writers):
+    """Run readers and writers concurrently and collect throughput/latency"""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(os.path.join(tmp, 'bench.db'), profile)
+        seed(engine)
+
+        week_start = date.today() - timedelta(days=7)
+        read_query = select(func.sum(StudySession.duration)).where(
+            StudySession.user_id == 1, StudySession.date >= week_start
+        )
+        stop = time.perf_counter() + seconds
+        read_latencies, write_latencies, errors = [], [], []
+
+        def reader():
+            while time.perf_counter() < stop:
+                started = time.perf_counter()
+                try:
+                    with engine.connect() as connection:
+                        connection.execute(read_query).scalar()
+                    read_latencies.append(time.perf_counter() - started)
+                except OperationalError as e:
+                    errors.append(str(e.orig))
+
+        def writer():
+            while time.perf_counter() < stop:
+                started = time.perf_counter()
+                try:
+                    with engine.begin() as connection:
+                        connection.execute(StudySession.__table__.insert().values(
+                            user_id=1, subject='Physics', duration=25, focus_rating=7,
+                            date=date.today(), start_time=datetime.utcnow()
+                        ))
+                    write_latencies.append(time.perf_counter() - started)
+                except OperationalError as e:
+                    errors.append(str(e.orig))
+
+        threads = [threading.Thread(target=reader) for _ in range(readers)]
+        threads += [threading.Thread(target=writer) for _ in range(writers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+
+    def p95(values):
+        return round(statistics.quantiles(values, n=20)[-1] * 1000, 2) if len(values) > 1 else None
+
+    return {
+        'reads_per_sec': round(len(read_latencies) / seconds, 1),
+        'writes_per_sec': round(len(write_latencies) / seconds, 1),
+        'read_p95_ms': p95(read_latencies),
+        'write_p95_ms': p95(write_latencies),
+        'errors': len(errors)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    args = parser.parse_args()
+
+    results = {profile: run_profile(profile, args.seconds, args.readers, args.writers) for profile in PROFILES}
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
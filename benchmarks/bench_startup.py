@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for StudyFlow
+
+Measures cold start (interpreter + imports + create_app) and time-to-first-request
+in fresh subprocesses, comparing the legacy profile (create_all plus eager
+imports) with the schema-version check and lazy imports.
+
+Usage: python benchmarks/bench_startup.py [--runs 5]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORKER = r'''
+import json, os, time
+t0 = time.perf_counter()
+if os.environ['LAZY_IMPORTS'] == 'false':
+    import requests  # What ai_helper used to import unconditionally
+from app import create_app
+app = create_app('production')
+t1 = time.perf_counter()
+client = app.test_client()
+client.get('/auth/login')
+t2 = time.perf_counter()
+print(json.dumps({'create_app': t1 - t0, 'first_request': t2 - t1}))
+'''
+
+PROFILES = {
+    'legacy': {'SCHEMA_STARTUP_MODE': 'create_all', 'LAZY_IMPORTS': 'false'},
+    'fast': {'SCHEMA_STARTUP_MODE': 'version', 'LAZY_IMPORTS': 'true'}
+}
+
+def run_worker(profile, database_url):
+    """Start one fresh interpreter and return its timings in milliseconds"""
+    env = dict(os.environ, DATABASE_URL=database_url, **PROFILES[profile])
+    env.pop('OPENAI_API_KEY', None)
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, '-c', WORKER], cwd=ROOT, env=env,
+        capture_output=True, text=True, check=True
+    ).stdout
+    total = time.perf_counter() - started
+    timings = json.loads(output.strip().splitlines()[-1])
+    return {
+        'cold_start_ms': total * 1000,
+        'create_app_ms': timings['create_app'] * 1000,
+        'first_request_ms': timings['first_request'] * 1000
+    }
+
+def summarize(samples):
+    """Median of each timing across runs"""
+    return {key: round(statistics.median(s[key] for s in samples), 1) for key in samples[0]}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        run_worker('fast', database_url)  # Create and stamp the schema once
+
+        results = {}
+        for profile in PROFILES:
+            results[profile] = summarize([run_worker(profile, database_url) for _ in range(args.runs)])
+
+    print(json.dumps(results, indent=2))
+    legacy, fast = results['legacy']['create_app_ms'], results['fast']['create_app_ms']
+    print(f"create_app speedup: {legacy / fast:.2f}x ({legacy:.1f}ms -> {fast:.1f}ms)")
+
+if __name__ == '__main__':
+    main()
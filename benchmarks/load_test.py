@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+HTTP load generator replaying StudyFlow user journeys
+
+Each virtual user runs in its own thread with its own cookie session, logs in
+and then repeatedly picks a journey from a weighted mix until the run ends:
+
+    login          fetch the login form (CSRF token) and sign in again
+    poll           GET /api/dashboard/summary and /api/user/stats
+    complete_task  list the calendar feed and toggle a task
+    log_session    start and complete a Pomodoro
+
+Reports throughput, error rate and latency percentiles per endpoint.
+Point it at a real server seeded with `flask seed`, for example:
+
+    FLASK_CONFIG=production flask seed --users 200
+    gunicorn -w 4 --threads 4 -b 127.0.0.1:8000 "app:create_app('production')"
+    python benchmarks/load_test.py --url http://127.0.0.1:8000 --users 100 --duration 60 \\
+        --mix poll=70,complete_task=15,log_session=10,login=5
+"""
+
+import argparse
+import json
+import random
+import re
+import statistics
+import sys
+import threading
+import time
+import requests
+
+CSRF_PATTERN = re.compile(r'name="csrf_token" type="hidden" value="([^"]+)"')
+DEFAULT_MIX = 'poll=70,complete_task=15,log_session=10,login=5'
+
+class LoadStats:
+    """Latencies and outcomes per endpoint, shared by all virtual users"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+        self.journeys = {}
+
+    def record(self, endpoint, duration, ok):
+        with self.lock:
+            self.latencies.setdefault(endpoint, []).append(duration)
+            if not ok:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def journey(self, name):
+        with self.lock:
+            self.journeys[name] = self.journeys.get(name, 0) + 1
+
+    def summary(self, elapsed):
+        endpoints = {}
+        for endpoint, latencies in sorted(self.latencies.items()):
+            latencies = sorted(latencies)
+            errors = self.errors.get(endpoint, 0)
+            endpoints[endpoint] = {
+                'requests': len(latencies),
+                'throughput_rps': round(len(latencies) / elapsed, 2),
+                'error_rate': round(errors / len(latencies), 4),
+                'p50_ms': _percentile(latencies, 0.50),
+                'p95_ms': _percentile(latencies, 0.95),
+                'p99_ms': _percentile(latencies, 0.99),
+                'mean_ms': round(statistics.fmean(latencies) * 1000, 2)
+            }
+        total = sum(len(latencies) for latencies in self.latencies.values())
+        return {
+            'elapsed_s': round(elapsed, 2),
+            'requests': total,
+            'throughput_rps': round(total / elapsed, 2) if elapsed else 0.0,
+            'error_rate': round(sum(self.errors.values()) / total, 4) if total else 0.0,
+            'journeys': dict(sorted(self.journeys.items())),
+            'endpoints': endpoints
+        }
+
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * fraction))
+    return round(sorted_values[index] * 1000, 2)
+
+class VirtualUser:
+    """One simulated student with a persistent cookie session"""
+
+    def __init__(self, base_url, username, password, stats, rng, timeout):
+        self.base_url = base_url.rstrip('/')
+        self.username = username
+        self.password = password
+        self.stats = stats
+        self.rng = rng
+        self.timeout = timeout
+        self.http = requests.Session()
+
+    def request(self, method, path, endpoint=None, expected=(200,), **kwargs):
+        """Issue a request and record it under `endpoint` (the route template)"""
+        started = time.perf_counter()
+        try:
+            response = self.http.request(method, self.base_url + path, timeout=self.timeout,
+                                         allow_redirects=False, **kwargs)
+            ok = response.status_code in expected
+        except requests.RequestException:
+            response, ok = None, False
+        self.stats.record(f'{method} {endpoint or path}', time.perf_counter() - started, ok)
+        return response if ok else None
+
+    def login(self):
+        self.http.cookies.clear()
+        page = self.request('GET', '/auth/login')
+        if page is None:
+            return False
+        match = CSRF_PATTERN.search(page.text)
+        form = {'username': self.username, 'password': self.password}
+        if match:
+            form['csrf_token'] = match.group(1)
+        response = self.request('POST', '/auth/login', data=form, expected=(302,))
+        # A failed login re-renders the form (200) instead of redirecting
+        return response is not None and '/auth/login' not in response.headers.get('Location', '')
+
+    def poll(self):
+        self.request('GET', '/api/dashboard/summary')
+        self.request('GET', '/api/user/stats')
+
+    def complete_task(self):
+        response = self.request('GET', '/tasks/api/tasks')
+        if response is None:
+            return
+        tasks = [task for task in response.json() if task['extendedProps']['status'] != 'completed']
+        if not tasks:
+            return
+        task = self.rng.choice(tasks)
+        if isinstance(task['id'], int):
+            self.request('POST', f"/api/tasks/{task['id']}/toggle-status",
+                         endpoint='/api/tasks/<id>/toggle-status')
+        else:
+            # Unmaterialized recurring occurrence ('r<recurrence>-<date>' id): complete it through its rule
+            props = task['extendedProps']
+            self.request('POST', f"/api/recurrences/{props['recurrence_id']}/occurrences/"
+                         f"{props['occurrence_date']}/complete",
+                         endpoint='/api/recurrences/<id>/occurrences/<date>/complete')
+
+    def log_session(self):
+        response = self.request('POST', '/api/pomodoro/start', json={'subject': 'Load Testing'})
+        if response is None:
+            return
+        self.request('POST', '/api/pomodoro/complete', json={
+            'session_id': response.json()['session_id'],
+            'focus_rating': self.rng.randint(3, 10)
+        })
+
+def parse_mix(value):
+    """'poll=70,login=5' -> (['poll', 'login'], [70, 5])"""
+    journeys, weights = [], []
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in ('login', 'poll', 'complete_task', 'log_session'):
+            raise argparse.ArgumentTypeError(f'unknown journey: {name}')
+        journeys.append(name)
+        weights.append(float(weight or 1))
+    return journeys, weights
+
+def run_user(user, mix, deadline, think_time):
+    if not user.login():
+        return
+    journeys, weights = mix
+    while time.monotonic() < deadline:
+        name = user.rng.choices(journeys, weights)[0]
+        user.stats.journey(name)
+        if name == 'login':
+            user.login()
+        else:
+            getattr(user, name)()
+        if think_time:
+            time.sleep(user.rng.uniform(0, think_time * 2))
+
+def run_load(args):
+    stats = LoadStats()
+    mix = args.mix
+    deadline = time.monotonic() + args.ramp_up + args.duration
+    threads = []
+
+    started = time.monotonic()
+    for index in range(args.users):
+        username = f'{args.username_prefix}{args.first_user + index % args.accounts}'
+        user = VirtualUser(args.url, username, args.password, stats,
+                           random.Random(args.seed + index), args.timeout)
+        thread = threading.Thread(target=run_user, args=(user, mix, deadline, args.think_time), daemon=True)
+        thread.start()
+        threads.append(thread)
+        if args.ramp_up:
+            time.sleep(args.ramp_up / args.users)
+
+    for thread in threads:
+        thread.join()
+    return stats.summary(time.monotonic() - started)
+
+def print_report(summary):
+    print(f"{summary['requests']} requests in {summary['elapsed_s']}s: "
+          f"{summary['throughput_rps']} req/s, {summary['error_rate'] * 100:.2f}% errors")
+    print('Journeys: ' + ', '.join(f'{name}={count}' for name, count in summary['journeys'].items()))
+    print(f"{'endpoint':44} {'reqs':>7} {'req/s':>8} {'err%':>6} {'p50ms':>8} {'p95ms':>8} {'p99ms':>8}")
+    for endpoint, row in summary['endpoints'].items():
+        print(f"{endpoint:44} {row['requests']:7d} {row['throughput_rps']:8.2f} {row['error_rate'] * 100:6.2f} "
+              f"{row['p50_ms']:8.2f} {row['p95_ms']:8.2f} {row['p99_ms']:8.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay StudyFlow user journeys against a running server')
+    parser.add_argument('--url', default='http://127.0.0.1:8000', help='Base URL of the server')
+    parser.add_argument('--users', type=int, default=50, help='Concurrent virtual users (threads)')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run after ramp-up')
+    parser.add_argument('--ramp-up', type=float, default=5, help='Seconds over which users start')
+    parser.add_argument('--think-time', type=float, default=0.5, help='Mean pause between journeys (seconds)')
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX, help='Weighted journeys, e.g. poll=70,login=5')
+    parser.add_argument('--username-prefix', default='loaduser', help='Usernames created by `flask seed`')
+    parser.add_argument('--first-user', type=int, default=1, help='Index of the first seeded user')
+    parser.add_argument('--accounts', type=int, default=100, help='Number of seeded accounts to spread over')
+    parser.add_argument('--password', default='password123')
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', dest='json_path', help='Also write the summary to this JSON file')
+    args = parser.parse_args()
+
+    summary = run_load(args)
+    print_report(summary)
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(summary, f, indent=2)
+    return 0 if summary['requests'] else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
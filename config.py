@@ -9,6 +9,23 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///studyflow.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Engine profiles (see app/utils/database.py)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '10'))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', '20'))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', '1800'))  # seconds
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', '30'))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() in ['true', 'on', '1']
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE') or 'WAL'
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS') or 'NORMAL'
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))
+    SQLITE_BUSY_TIMEOUT = int(os.environ.get('SQLITE_BUSY_TIMEOUT', '5000'))  # milliseconds
+    
+    # Startup schema handling: 'version' (run DDL only when behind), 'create_all' or 'skip'
+    SCHEMA_STARTUP_MODE = os.environ.get('SCHEMA_STARTUP_MODE') or 'version'
+    
+    # Defer optional integrations (Flask-Migrate outside the CLI, requests without an API key)
+    LAZY_IMPORTS = os.environ.get('LAZY_IMPORTS', 'true').lower() in ['true', 'on', '1']
+    
     # Mail configuration
     MAIL_SERVER = os.environ.get('MAIL_SERVER') or 'smtp.gmail.com'
     MAIL_PORT = int(os.environ.get('MAIL_PORT', '587'))
@@ -17,8 +34,62 @@ class Config:
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
     ADMIN_EMAIL = os.environ.get('ADMIN_EMAIL') or 'admin@studyflow.com'
     
+    # Identity cache for Flask-Login (seconds; 0 disables)
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', '30'))
+    
+    # Password hashing (werkzeug method string, e.g. pbkdf2:sha256:600000 or scrypt:32768:8:1)
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD') or 'pbkdf2:sha256:600000'
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', '2'))
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', '8'))
+    PASSWORD_HASH_RETRY_AFTER = int(os.environ.get('PASSWORD_HASH_RETRY_AFTER', '2'))  # seconds
+    
+    # SQL instrumentation: fraction of requests to instrument (0 disables, see /debug/sql)
+    SQL_INSTRUMENTATION_SAMPLE_RATE = float(os.environ.get('SQL_INSTRUMENTATION_SAMPLE_RATE', '0'))
+    SQL_N_PLUS_ONE_THRESHOLD = int(os.environ.get('SQL_N_PLUS_ONE_THRESHOLD', '5'))
+    
+    # Prometheus metrics; METRICS_DIR is a directory shared by all workers on the host
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() in ['true', 'on', '1']
+    METRICS_DIR = os.environ.get('METRICS_DIR') or os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', '5'))
+    # Bearer token for /metrics; unset, only private/loopback clients may scrape
+    # (behind a reverse proxy every client looks private, so set a token there)
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    
+    # orjson-backed JSON provider for API responses (used when orjson is installed)
+    JSON_FAST_PROVIDER = os.environ.get('JSON_FAST_PROVIDER', 'true').lower() in ['true', 'on', '1']
+    
+    # Server-Timing response headers (opt-in)
+    SERVER_TIMING_ENABLED = os.environ.get('SERVER_TIMING_ENABLED', 'false').lower() in ['true', 'on', '1']
+    
+    # On-demand request profiling (opt-in; single-use token from /debug/profiles/token or `flask profile-token`)
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'false').lower() in ['true', 'on', '1']
+    PROFILE_DIR = os.environ.get('PROFILE_DIR')  # defaults to instance/profiles
+    PROFILE_MAX_FILES = int(os.environ.get('PROFILE_MAX_FILES', '50'))
+    PROFILE_TOKEN_MAX_AGE = int(os.environ.get('PROFILE_TOKEN_MAX_AGE', '900'))  # seconds
+    
     # Pagination
     POSTS_PER_PAGE = 10
+    TASKS_PER_PAGE = 50
+    SESSIONS_PER_PAGE = 50
+    MAX_PAGE_SIZE = 200
+    MAX_BULK_TASKS = 500
+    IMPORT_BATCH_SIZE = 2000
+    IMPORT_MAX_ERRORS = 100
+    
+    # Hourly job moving past-due tasks to 'overdue' (or run `flask mark-overdue` from cron)
+    OVERDUE_JOB_ENABLED = os.environ.get('OVERDUE_JOB_ENABLED', 'true').lower() in ['true', 'on', '1']
+    OVERDUE_JOB_MINUTE = int(os.environ.get('OVERDUE_JOB_MINUTE', '5'))
+    
+    # Recurring tasks are expanded at most this many days ahead for open-ended windows
+    RECURRENCE_HORIZON_DAYS = int(os.environ.get('RECURRENCE_HORIZON_DAYS', '180'))
+    
+    # Per-user subject list cache (seconds a list may miss other workers' new subjects)
+    SUBJECT_CACHE_TTL = int(os.environ.get('SUBJECT_CACHE_TTL', '300'))
+    SUBJECT_CACHE_SIZE = int(os.environ.get('SUBJECT_CACHE_SIZE', '10000'))
+    
+    # iCalendar subscription feed
+    ICS_FEED_HISTORY_DAYS = int(os.environ.get('ICS_FEED_HISTORY_DAYS', '90'))
+    ICS_FEED_CACHE_SIZE = int(os.environ.get('ICS_FEED_CACHE_SIZE', '1000'))
     
     # AI Integration (Optional)
     OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
@@ -26,12 +97,18 @@ class Config:
 class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
+    SQL_INSTRUMENTATION_SAMPLE_RATE = float(os.environ.get('SQL_INSTRUMENTATION_SAMPLE_RATE', '1'))
 
 class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
+    SCHEMA_STARTUP_MODE = 'skip'  # Tests create and drop tables themselves
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'
+    SQL_INSTRUMENTATION_SAMPLE_RATE = 1.0
+    OVERDUE_JOB_ENABLED = False
+    PROFILING_ENABLED = True
 
 class ProductionConfig(Config):
     """Production configuration"""
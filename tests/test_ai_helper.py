@@ -0,0 +1,104 @@
+"""
+Tests for the AI helper utilities
+"""
+
+import unittest
+import statistics
+from datetime import date, datetime
+from app import create_app, db
+from app.models import User, StudySession
+from app.utils.ai_helper import RunningStats, ProductivityAccumulator, analyze_productivity_patterns
+
+class ProductivityStatsTestCase(unittest.TestCase):
+    """Test cases for the streaming productivity statistics"""
+    
+    def test_running_stats_matches_statistics_module(self):
+        """Test Welford mean/variance against the reference implementation"""
+        values = [3, 7, 7, 19, 4, 10, 1]
+        stats = RunningStats()
+        for value in values:
+            stats.add(value)
+        
+        self.assertEqual(stats.count, len(values))
+        self.assertAlmostEqual(stats.mean, statistics.mean(values))
+        self.assertAlmostEqual(stats.variance, statistics.pvariance(values))
+        self.assertEqual(stats.min, 1)
+        self.assertEqual(stats.max, 19)
+    
+    def test_running_stats_merge(self):
+        """Test merging partial statistics equals a single pass"""
+        left, right, whole = RunningStats(), RunningStats(), RunningStats()
+        for value in [2, 4, 4, 5]:
+            left.add(value)
+            whole.add(value)
+        for value in [5, 7, 9]:
+            right.add(value)
+            whole.add(value)
+        
+        left.merge(right)
+        self.assertEqual(left.count, whole.count)
+        self.assertAlmostEqual(left.mean, whole.mean)
+        self.assertAlmostEqual(left.variance, whole.variance)
+        self.assertEqual((left.min, left.max), (whole.min, whole.max))
+    
+    def test_analyze_rows_and_merge(self):
+        """Test analysis over row tuples and merging accumulators"""
+        monday, tuesday = date(2024, 1, 1), date(2024, 1, 2)
+        rows = [
+            (monday, 8, datetime(2024, 1, 1, 9)),
+            (monday, 6, datetime(2024, 1, 1, 21)),
+            (tuesday, 4, None)
+        ]
+        result = analyze_productivity_patterns(rows)
+        
+        self.assertEqual(result['total_sessions'], 3)
+        self.assertAlmostEqual(result['weekday_performance'][0], 7)
+        self.assertEqual(result['best_day'], 0)
+        self.assertEqual(result['worst_day'], 1)
+        self.assertEqual(result['best_hour'], 9)
+        
+        first = ProductivityAccumulator().consume(rows[:1])
+        second = ProductivityAccumulator().consume(rows[1:])
+        self.assertEqual(first.merge(second).result(), result)
+        self.assertEqual(analyze_productivity_patterns([]), {})
+
+class ProductivityPatternsEndpointTestCase(unittest.TestCase):
+    """Test cases for /analytics/api/productivity-patterns"""
+    
+    def setUp(self):
+        """Set up a logged in user with sessions on two weekdays"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        
+        with self.app.app_context():
+            db.create_all()
+            user = User(username='testuser', email='test@example.com', first_name='Test', last_name='User')
+            user.set_password('testpass')
+            db.session.add(user)
+            db.session.flush()
+            for start, focus in ((datetime(2024, 1, 1, 9), 8), (datetime(2024, 1, 1, 21), 6),
+                                 (datetime(2024, 1, 2, 10), 4)):
+                db.session.add(StudySession(subject='Math', duration=30, focus_rating=focus, date=start.date(),
+                                            start_time=start, user_id=user.id))
+            db.session.commit()
+        
+        self.client.post('/auth/login', data={'username': 'testuser', 'password': 'testpass'})
+    
+    def tearDown(self):
+        """Clean up after tests"""
+        with self.app.app_context():
+            db.drop_all()
+    
+    def test_streamed_patterns(self):
+        """Test the endpoint folds the streamed rows like an in-memory analysis"""
+        patterns = self.client.get('/analytics/api/productivity-patterns').get_json()['patterns']
+        self.assertEqual(patterns['total_sessions'], 3)
+        self.assertEqual(patterns['best_day'], 0)
+        self.assertEqual(patterns['best_hour'], 9)
+        self.assertAlmostEqual(patterns['weekday_performance']['0'], 7)
+        
+        recent = self.client.get('/analytics/api/productivity-patterns?days=30').get_json()['patterns']
+        self.assertEqual(recent, {})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+"""
+Tests for bulk task operations
+"""
+
+import unittest
+from datetime import date
+from sqlalchemy import event
+from app import create_app, db
+from app.models import User, Task, StudySession, UserPoints
+
+class BulkTasksTestCase(unittest.TestCase):
+    """Test cases for /api/tasks/bulk"""
+
+    def setUp(self):
+        """Set up a logged in user with a few tasks and another user's task"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            user = User(username='testuser', email='test@example.com', first_name='Test', last_name='User')
+            user.set_password('testpass')
+            other = User(username='other', email='other@example.com', first_name='Other', last_name='User')
+            other.set_password('testpass')
+            db.session.add_all([user, other])
+            db.session.flush()
+
+            tasks = [
+                Task(title='Low', subject='Math', priority='low', difficulty=1, due_date=date.today(), user_id=user.id),
+                Task(title='Urgent', subject='Math', priority='urgent', difficulty=4, due_date=date.today(), user_id=user.id),
+                Task(title='Done', subject='Math', status='completed', due_date=date.today(), user_id=user.id),
+                Task(title='Not mine', subject='Math', due_date=date.today(), user_id=other.id)
+            ]
+            db.session.add_all(tasks)
+            db.session.add(UserPoints(user_id=user.id, total_points=100, tasks_completed=1))
+            db.session.flush()
+            db.session.add(StudySession(subject='Math', duration=25, user_id=user.id, task_id=tasks[0].id))
+            db.session.commit()
+            self.user_id = user.id
+            self.task_ids = [task.id for task in tasks]
+            self.engine = db.engine
+
+        self.client.post('/auth/login', data={'username': 'testuser', 'password': 'testpass'})
+
+    def tearDown(self):
+        """Clean up after tests"""
+        with self.app.app_context():
+            db.drop_all()
+
+    def _bulk(self, operation, task_ids, **extra):
+        return self.client.post('/api/tasks/bulk', json=dict(operation=operation, task_ids=task_ids, **extra))
+
+    def test_complete_reports_per_id_results_and_awards_points(self):
+        """Test completion results, points and the aggregate UserPoints update"""
+        low, urgent, done, foreign = self.task_ids
+        response = self._bulk('complete', [low, urgent, done, foreign, 9999])
+        self.assertEqual(response.status_code, 200)
+
+        data = response.get_json()
+        self.assertEqual(data['results'], [
+            {'id': low, 'result': 'updated', 'points_earned': 15},
+            {'id': urgent, 'result': 'updated', 'points_earned': 70},
+            {'id': done, 'result': 'unchanged'},
+            {'id': foreign, 'result': 'not_found'},
+            {'id': 9999, 'result': 'not_found'}
+        ])
+        self.assertEqual(data['points_earned'], 85)
+
+        with self.app.app_context():
+            points = UserPoints.query.filter_by(user_id=self.user_id).one()
+            self.assertEqual((points.total_points, points.tasks_completed), (185, 3))
+            self.assertEqual(db.session.get(Task, foreign).status, 'pending')
+            self.assertIsNotNone(db.session.get(Task, low).completed_at)
+
+    def test_statement_count_does_not_grow_with_ids(self):
+        """Test the bulk path issues a fixed number of statements"""
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE', 'INSERT')):
+                statements.append(statement)
+
+        event.listen(self.engine, 'before_cursor_execute', record)
+        try:
+            self._bulk('set_priority', self.task_ids[:3], value='high')
+        finally:
+            event.remove(self.engine, 'before_cursor_execute', record)
+
+        task_statements = [statement for statement in statements if 'tasks' in statement]
+        self.assertEqual(len(task_statements), 2)
+
+    def test_delete_detaches_sessions(self):
+        """Test deleting tasks keeps their study sessions"""
+        response = self._bulk('delete', self.task_ids[:2])
+        self.assertEqual(response.get_json()['updated'], 2)
+
+        with self.app.app_context():
+            self.assertEqual(Task.query.filter_by(user_id=self.user_id).count(), 1)
+            self.assertIsNone(StudySession.query.one().task_id)
+
+    def test_invalid_requests_are_rejected(self):
+        """Test unknown operations and malformed ids return 400"""
+        self.assertEqual(self._bulk('archive', self.task_ids).status_code, 400)
+        self.assertEqual(self._bulk('set_priority', self.task_ids, value='critical').status_code, 400)
+        self.assertEqual(self._bulk('complete', ['1']).status_code, 400)
+        self.assertEqual(self._bulk('complete', []).status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+Tests for the windowed calendar feed
+"""
+
+import unittest
+from datetime import date, timedelta
+from app import create_app, db
+from app.models import User, Task
+
+class CalendarFeedTestCase(unittest.TestCase):
+    """Test cases for /tasks/api/tasks"""
+
+    def setUp(self):
+        """Set up a logged in user with tasks spread over two months"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.first = date(2024, 3, 1)
+
+        with self.app.app_context():
+            db.create_all()
+            user = User(username='testuser', email='test@example.com', first_name='Test', last_name='User')
+            user.set_password('testpass')
+            db.session.add(user)
+            db.session.flush()
+            for offset in range(0, 60, 5):
+                db.session.add(Task(title=f'Task {offset}', subject='Math', priority='high',
+                                    due_date=self.first + timedelta(days=offset), user_id=user.id))
+            db.session.commit()
+
+        self.client.post('/auth/login', data={'username': 'testuser', 'password': 'testpass'})
+
+    def tearDown(self):
+        """Clean up after tests"""
+        with self.app.app_context():
+            db.drop_all()
+
+    def test_feed_is_restricted_to_window(self):
+        """Test only tasks due in [start, end) are returned"""
+        response = self.client.get('/tasks/api/tasks?start=2024-03-01T00:00:00+01:00&end=2024-04-01T00:00:00+02:00')
+        self.assertEqual(response.status_code, 200)
+
+        events = response.get_json()
+        self.assertEqual([event['start'] for event in events],
+                         [(self.first + timedelta(days=offset)).isoformat() for offset in range(0, 31, 5)])
+        self.assertEqual(events[0]['backgroundColor'], 'var(--bs-danger)')
+        self.assertEqual(len(self.client.get('/tasks/api/tasks').get_json()), 12)
+
+    def test_unchanged_window_returns_304(self):
+        """Test If-None-Match with the current ETag skips the body"""
+        url = '/tasks/api/tasks?start=2024-03-01&end=2024-04-01'
+        etag = self.client.get(url).headers['ETag']
+
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+
+        with self.app.app_context():
+            task = Task.query.filter_by(due_date=self.first).first()
+            task.title = 'Renamed'
+            db.session.commit()
+
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_invalid_window_is_rejected(self):
+        """Test malformed start/end return 400"""
+        self.assertEqual(self.client.get('/tasks/api/tasks?start=March').status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+"""
+Tests for the tokenized iCalendar feed
+"""
+
+import unittest
+from datetime import date, timedelta
+from app import create_app, db
+from app.models import User, Task
+from app.utils.ics_feed import issue_feed_token
+
+class IcsFeedTestCase(unittest.TestCase):
+    """Test cases for /tasks/feed/<token>.ics"""
+
+    def setUp(self):
+        """Set up a user with tasks and a feed URL"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            user = User(username='testuser', email='test@example.com', first_name='Test', last_name='User')
+            user.set_password('testpass')
+            db.session.add(user)
+            db.session.flush()
+            db.session.add_all([
+                Task(title='Essay, draft', subject='History', priority='urgent',
+                     description='Outline\nand sources', due_date=date.today() + timedelta(days=3), user_id=user.id),
+                Task(title='Quiz', subject='Math', status='completed', due_date=date.today(), user_id=user.id),
+                Task(title='Ancient', subject='Math', due_date=date.today() - timedelta(days=365), user_id=user.id)
+            ])
+            db.session.commit()
+            self.user_id = user.id
+            self.url = f'/tasks/feed/{issue_feed_token(self.app, user)}.ics'
+
+    def tearDown(self):
+        """Clean up after tests"""
+        with self.app.app_context():
+            db.drop_all()
+
+    def test_feed_lists_tasks_in_window(self):
+        """Test the feed body, escaping and history window"""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'text/calendar')
+        self.assertEqual(response.headers['Cache-Control'], 'private, no-cache')
+
+        body = response.get_data(as_text=True)
+        self.assertTrue(body.startswith('BEGIN:VCALENDAR\r\n'))
+        self.assertEqual(body.count('BEGIN:VEVENT'), 2)
+        self.assertIn('SUMMARY:Essay\\, draft (History)', body)
+        self.assertIn('DESCRIPTION:Outline\\nand sources', body)
+        self.assertIn('PRIORITY:1', body)
+        self.assertIn('SUMMARY:✓ Quiz (Math)', body)
+        self.assertNotIn('Ancient', body)
+
+    def test_conditional_requests(self):
+        """Test 304 for an unchanged feed and a new ETag after an update"""
+        first = self.client.get(self.url)
+        etag = first.headers['ETag']
+        self.assertIsNotNone(first.headers.get('Last-Modified'))
+
+        self.assertEqual(self.client.get(self.url, headers={'If-None-Match': etag}).status_code, 304)
+
+        with self.app.app_context():
+            task = Task.query.filter_by(title='Quiz').one()
+            task.title = 'Quiz 2'
+            db.session.commit()
+
+        changed = self.client.get(self.url, headers={'If-None-Match': etag})
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers['ETag'], etag)
+        self.assertIn('Quiz 2', changed.get_data(as_text=True))
+
+    def test_delete_defeats_if_modified_since(self):
+        """Test a deletion is served even to clients revalidating with If-Modified-Since only"""
+        last_modified = self.client.get(self.url).headers['Last-Modified']
+        
+        with self.app.app_context():
+            db.session.delete(Task.query.filter_by(title='Quiz').one())
+            db.session.commit()
+        
+        response = self.client.get(self.url, headers={'If-Modified-Since': last_modified})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Quiz', response.get_data(as_text=True))
+    
+    def test_rendered_body_is_cached(self):
+        """Test a second full request is served from the cache"""
+        first = self.client.get(self.url).get_data()
+        cache = self.app.extensions['ics_feed_cache']
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+        self.assertEqual(self.client.get(self.url).get_data(), first)
+        self.assertEqual(cache.hits, 1)
+
+    def test_invalid_and_revoked_tokens(self):
+        """Test forged tokens 404 and a password change revokes the feed"""
+        self.assertEqual(self.client.get('/tasks/feed/forged.ics').status_code, 404)
+
+        with self.app.app_context():
+            user = db.session.get(User, self.user_id)
+            user.set_password('newpass123')
+            db.session.commit()
+
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+"""
+Tests for the Flask-Login identity cache
+"""
+
+import unittest
+from sqlalchemy import event
+from app import create_app, db
+from app.models import User
+
+class IdentityCacheTestCase(unittest.TestCase):
+    """Test cases for cached user loading"""
+    
+    def setUp(self):
+        """Set up test environment with a logged in user"""
+        # No app context stays pushed, so each request gets a fresh flask.g
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        
+        with self.app.app_context():
+            db.create_all()
+            user = User(
+                username='testuser',
+                email='test@example.com',
+                first_name='Test',
+                last_name='User'
+            )
+            user.set_password('testpass')
+            db.session.add(user)
+            db.session.commit()
+            self.user_id = user.id
+            self.engine = db.engine
+        
+        self.client.post('/auth/login', data={
+            'username': 'testuser',
+            'password': 'testpass'
+        })
+        
+        self.statements = []
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+    
+    def tearDown(self):
+        """Clean up after tests"""
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+        with self.app.app_context():
+            db.drop_all()
+    
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+    
+    def _user_queries(self):
+        return [s for s in self.statements if 'FROM users' in s]
+    
+    def test_polls_do_not_query_users(self):
+        """Test repeated polls authenticate from the cache"""
+        self.client.get('/api/dashboard/summary')
+        self.statements.clear()
+        
+        response = self.client.get('/api/dashboard/summary')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(self.statements)  # the route itself still queries
+        self.statements.clear()
+        
+        for _ in range(3):
+            response = self.client.get('/api/dashboard/summary')
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._user_queries(), [])
+    
+    def test_password_change_invalidates_session(self):
+        """Test a password change rejects sessions from the old version"""
+        self.assertEqual(self.client.get('/api/dashboard/summary').status_code, 200)
+        
+        with self.app.app_context():
+            user = db.session.get(User, self.user_id)
+            user.set_password('newpass')
+            db.session.commit()
+        
+        response = self.client.get('/api/dashboard/summary')
+        self.assertIn(response.status_code, [302, 401])
+
+    def test_password_change_revokes_remember_cookie(self):
+        """Test a remember-me cookie alone logs in until the password changes"""
+        client = self.app.test_client()
+        client.post('/auth/login', data={'username': 'testuser', 'password': 'testpass', 'remember_me': 'y'})
+        cookie = client.get_cookie('remember_token')
+        self.assertIsNotNone(cookie)
+        
+        restored = self.app.test_client()
+        restored.set_cookie('remember_token', cookie.value)
+        self.assertEqual(restored.get('/api/dashboard/summary').status_code, 200)
+        
+        with self.app.app_context():
+            user = db.session.get(User, self.user_id)
+            user.set_password('newpass')
+            db.session.commit()
+        
+        restored = self.app.test_client()
+        restored.set_cookie('remember_token', cookie.value)
+        self.assertIn(restored.get('/api/dashboard/summary').status_code, [302, 401])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,183 @@
+"""
+Tests for per-request SQL instrumentation
+"""
+
+import tempfile
+import unittest
+from app import create_app, db
+from app.models import User
+from app.utils.instrumentation import statement_shape
+from app.utils.server_timing import init_server_timing
+
+class SQLInstrumentationTestCase(unittest.TestCase):
+    """Test cases for query counting and N+1 detection"""
+    
+    def setUp(self):
+        """Set up test environment with a logged in admin"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        
+        with self.app.app_context():
+            db.create_all()
+            user = User(
+                username='adminuser',
+                email='admin@example.com',
+                first_name='Admin',
+                last_name='User',
+                is_admin=True
+            )
+            user.set_password('testpass')
+            db.session.add(user)
+            db.session.commit()
+        
+        self.client.post('/auth/login', data={
+            'username': 'adminuser',
+            'password': 'testpass'
+        })
+    
+    def tearDown(self):
+        """Clean up after tests"""
+        with self.app.app_context():
+            db.drop_all()
+    
+    def test_statement_shape(self):
+        """Test parameter lists and whitespace normalise to one shape"""
+        self.assertEqual(
+            statement_shape('SELECT *\n  FROM tasks WHERE id IN (?, ?, ?)'),
+            statement_shape('SELECT * FROM tasks WHERE id IN (?)')
+        )
+        self.assertEqual(
+            statement_shape('SELECT * FROM tasks WHERE id = %(id_1)s'),
+            'SELECT * FROM tasks WHERE id = ?'
+        )
+    
+    def test_per_day_loop_is_flagged(self):
+        """Test a per-day query loop shows up as an N+1 pattern"""
+        self.client.get('/analytics/api/chart-data?type=daily&days=7')
+        
+        data = self.client.get('/debug/sql?sort=n_plus_one').get_json()
+        route = next(r for r in data['routes'] if r['endpoint'] == 'analytics.chart_data')
+        self.assertGreaterEqual(route['max_queries'], 7)
+        self.assertEqual(route['n_plus_one_requests'], 1)
+        self.assertGreaterEqual(route['n_plus_one_shapes'][0]['max_count'], 7)
+    
+    def test_debug_endpoint_requires_admin(self):
+        """Test non-admin users cannot see the SQL report"""
+        self.client.get('/auth/logout')
+        self.assertEqual(self.client.get('/debug/sql').status_code, 404)
+        
+        self.app.debug = True
+        self.assertEqual(self.client.get('/debug/sql').status_code, 404)
+        self.assertEqual(self.client.post('/debug/sql/reset').status_code, 404)
+    
+    def test_reset_requires_post(self):
+        """Test the report is only cleared by POST /debug/sql/reset"""
+        self.client.get('/analytics/api/chart-data?type=daily&days=7')
+        
+        self.client.get('/debug/sql?reset=1')
+        routes = self.client.get('/debug/sql').get_json()['routes']
+        self.assertIn('analytics.chart_data', [route['endpoint'] for route in routes])
+        
+        self.assertEqual(self.client.post('/debug/sql/reset').status_code, 200)
+        routes = self.client.get('/debug/sql').get_json()['routes']
+        self.assertNotIn('analytics.chart_data', [route['endpoint'] for route in routes])
+
+class ServerTimingTestCase(unittest.TestCase):
+    """Test cases for Server-Timing headers"""
+    
+    def setUp(self):
+        """Set up test environment"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+    
+    def tearDown(self):
+        """Clean up after tests"""
+        with self.app.app_context():
+            db.drop_all()
+    
+    def test_header_absent_by_default(self):
+        """Test Server-Timing is opt-in"""
+        response = self.client.get('/auth/login')
+        self.assertNotIn('Server-Timing', response.headers)
+    
+    def test_phases_reported(self):
+        """Test db, serialize and total phases appear when enabled"""
+        self.app.config['SERVER_TIMING_ENABLED'] = True
+        init_server_timing(self.app, db)
+        
+        with self.app.app_context():
+            user = User(username='testuser', email='test@example.com', first_name='Test', last_name='User')
+            user.set_password('testpass')
+            db.session.add(user)
+            db.session.commit()
+        self.client.post('/auth/login', data={'username': 'testuser', 'password': 'testpass'})
+        
+        header = self.client.get('/tasks/api/tasks').headers['Server-Timing']
+        for phase in ('db;dur=', 'serialize;dur=', 'app;dur=', 'total;dur='):
+            self.assertIn(phase, header)
+
+class ProfilingTestCase(unittest.TestCase):
+    """Test cases for on-demand request profiling"""
+    
+    def setUp(self):
+        """Set up test environment with a logged in admin"""
+        self.profile_dir = tempfile.TemporaryDirectory()
+        self.app = create_app('testing')
+        self.app.config['PROFILE_DIR'] = self.profile_dir.name
+        self.client = self.app.test_client()
+        
+        with self.app.app_context():
+            db.create_all()
+            user = User(username='adminuser', email='admin@example.com',
+                        first_name='Admin', last_name='User', is_admin=True)
+            user.set_password('testpass')
+            db.session.add(user)
+            db.session.commit()
+        self.client.post('/auth/login', data={'username': 'adminuser', 'password': 'testpass'})
+    
+    def tearDown(self):
+        """Clean up after tests"""
+        with self.app.app_context():
+            db.drop_all()
+        self.profile_dir.cleanup()
+    
+    def test_token_profiles_one_request(self):
+        """Test a signed token captures a downloadable profile"""
+        token = self.client.post('/debug/profiles/token').get_json()['token']
+        
+        response = self.client.get('/dashboard', headers={'X-Profile-Token': token})
+        profile_id = response.headers['X-Profile-Id']
+        
+        profiles = self.client.get('/debug/profiles').get_json()['profiles']
+        self.assertEqual(profiles[0]['name'], profile_id)
+        self.assertEqual(profiles[0]['endpoint'], 'main.dashboard')
+        
+        text = self.client.get(f'/debug/profiles/{profile_id}?format=text').get_data(as_text=True)
+        self.assertIn('function calls', text)
+    
+    def test_token_is_single_use(self):
+        """Test a token profiles only the first request that carries it"""
+        token = self.client.post('/debug/profiles/token').get_json()['token']
+        
+        self.assertIn('X-Profile-Id', self.client.get('/dashboard', headers={'X-Profile-Token': token}).headers)
+        self.assertNotIn('X-Profile-Id', self.client.get('/dashboard', headers={'X-Profile-Token': token}).headers)
+    
+    def test_unknown_sort_key_is_rejected(self):
+        """Test the text report only accepts pstats sort keys"""
+        token = self.client.post('/debug/profiles/token').get_json()['token']
+        profile_id = self.client.get('/dashboard', headers={'X-Profile-Token': token}).headers['X-Profile-Id']
+        
+        response = self.client.get(f'/debug/profiles/{profile_id}?format=text&sort=bogus')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(f'/debug/profiles/{profile_id}?format=text&sort=time')
+        self.assertEqual(response.status_code, 200)
+    
+    def test_invalid_token_is_ignored(self):
+        """Test requests with a forged token are not profiled"""
+        response = self.client.get('/dashboard?_profile=forged')
+        self.assertNotIn('X-Profile-Id', response.headers)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+"""
+Tests for the Prometheus metrics endpoint
+"""
+
+import json
+import os
+import tempfile
+import threading
+import unittest
+from app import create_app, db
+from app.utils.metrics import MetricsRegistry
+
+class MetricsTestCase(unittest.TestCase):
+    """Test cases for metrics collection and exposition"""
+    
+    def setUp(self):
+        """Set up test environment"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+    
+    def tearDown(self):
+        """Clean up after tests"""
+        with self.app.app_context():
+            db.drop_all()
+    
+    def test_metrics_endpoint(self):
+        """Test request counters and histograms are exposed"""
+        self.client.get('/auth/login')
+        body = self.client.get('/metrics').get_data(as_text=True)
+        
+        self.assertIn('# TYPE studyflow_request_duration_seconds histogram', body)
+        self.assertIn('studyflow_requests_total{blueprint="auth",endpoint="auth.login",method="GET",status="200"} 1', body)
+        self.assertIn('studyflow_request_db_seconds_bucket{blueprint="auth",endpoint="auth.login",le="+Inf"} 1', body)
+        self.assertIn('studyflow_requests_in_flight', body)
+    
+    def test_public_scrapes_need_token(self):
+        """Test only private addresses may scrape without METRICS_TOKEN"""
+        public = {'REMOTE_ADDR': '8.8.8.8'}
+        self.assertEqual(self.client.get('/metrics', environ_base=public).status_code, 403)
+        self.assertEqual(self.client.get('/metrics', environ_base={'REMOTE_ADDR': '10.0.0.5'}).status_code, 200)
+        
+        self.app.config['METRICS_TOKEN'] = 'secret'
+        headers = {'Authorization': 'Bearer secret'}
+        self.assertEqual(self.client.get('/metrics', environ_base=public, headers=headers).status_code, 200)
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+    
+    def test_exited_thread_shards_are_folded(self):
+        """Test a thread-per-request server does not grow one shard per thread"""
+        registry = MetricsRegistry()
+        registry.describe('latency', 'histogram', 'Latency')
+        
+        def record():
+            registry.inc('requests_total', endpoint='x')
+            registry.observe('latency', 0.02)
+        
+        for _ in range(200):
+            thread = threading.Thread(target=record)
+            thread.start()
+            thread.join()
+        
+        self.assertEqual(len(registry._shards), 1)
+        merged = registry.collect()
+        self.assertEqual(merged['counters'][('requests_total', (('endpoint', 'x'),))], 200)
+        self.assertEqual(merged['histograms'][('latency', ())][-1], 200)
+    
+    def test_exited_worker_snapshots_are_retired(self):
+        """Test snapshots of exited workers are folded into one file and removed"""
+        with tempfile.TemporaryDirectory() as directory:
+            for worker, pid in enumerate((2 ** 22 + 1, 2 ** 22 + 2)):
+                registry = MetricsRegistry()
+                registry.inc('requests_total', 3, endpoint='main.index')
+                registry.gauge_add('requests_in_flight', 1)
+                snapshot = dict(registry.snapshot(), pid=pid)
+                with open(os.path.join(directory, f'metrics-{pid}.json'), 'w') as f:
+                    json.dump(snapshot, f)
+            
+            registry = MetricsRegistry(directory=directory)
+            for _ in range(2):
+                merged = registry.collect()
+                self.assertEqual(merged['counters'][('requests_total', (('endpoint', 'main.index'),))], 6)
+                self.assertNotIn(('requests_in_flight', ()), merged['gauges'])
+            files = sorted(name for name in os.listdir(directory) if name.endswith('.json'))
+            self.assertEqual(files, sorted(['metrics-retired.json', f'metrics-{os.getpid()}.json']))
+    
+    def test_workers_aggregate_through_directory(self):
+        """Test snapshots written by several workers are summed"""
+        with tempfile.TemporaryDirectory() as directory:
+            for worker in range(2):
+                registry = MetricsRegistry()
+                registry.inc('requests_total', 2, endpoint='main.index')
+                registry.gauge_add('requests_in_flight', 1)
+                with open(os.path.join(directory, f'metrics-worker{worker}.json'), 'w') as f:
+                    json.dump(registry.snapshot(), f)
+            
+            merged = MetricsRegistry(directory=directory).collect()
+            self.assertEqual(merged['counters'][('requests_total', (('endpoint', 'main.index'),))], 4)
+            self.assertEqual(merged['gauges'][('requests_in_flight', ())], 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+"""
+Tests for the scheduled overdue-status job
+"""
+
+import unittest
+from datetime import date, datetime, timedelta, timezone
+from sqlalchemy import event
+from app import create_app, db
+from app.models import User, Task
+from app.utils.bulk_tasks import apply_bulk_operation
+from app.utils.overdue import local_today, mark_overdue_tasks
+
+# 11:00 UTC on 2030-06-15 is already 2030-06-16 in Kiritimati (UTC+14)
+NOW = datetime(2030, 6, 15, 11, 0, tzinfo=timezone.utc)
+
+class OverdueTestCase(unittest.TestCase):
+    """Test cases for app.utils.overdue and overdue reads"""
+
+    def setUp(self):
+        """Set up users in different time zone buckets"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            self.user_ids = {}
+            for username, zone in (('serveruser', None), ('islanduser', 'Pacific/Kiritimati'),
+                                   ('brokenuser', 'Not/AZone')):
+                user = User(username=username, email=f'{username}@example.com', first_name='Test',
+                            last_name='User', timezone=zone)
+                user.set_password('testpass')
+                db.session.add(user)
+                db.session.flush()
+                self.user_ids[username] = user.id
+            db.session.commit()
+
+    def tearDown(self):
+        """Clean up after tests"""
+        with self.app.app_context():
+            db.drop_all()
+
+    def _add_task(self, username, due_date, status='pending'):
+        with self.app.app_context():
+            task = Task(title=f'{username} {due_date}', subject='Math', status=status, due_date=due_date,
+                        user_id=self.user_ids[username])
+            db.session.add(task)
+            db.session.commit()
+            return task.id
+
+    def _status(self, task_id):
+        with self.app.app_context():
+            return db.session.get(Task, task_id).status
+
+    def test_one_update_per_time_zone_bucket(self):
+        """Test each bucket is compared with its own local date"""
+        june_15 = self._add_task('islanduser', date(2030, 6, 15))
+        june_14 = self._add_task('islanduser', date(2030, 6, 14), status='in_progress')
+        done = self._add_task('islanduser', date(2030, 6, 1), status='completed')
+        server_due_today = self._add_task('serveruser', NOW.astimezone().date())
+        broken = self._add_task('brokenuser', date(2001, 1, 1))
+
+        updates = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith('UPDATE'):
+                updates.append(statement)
+
+        with self.app.app_context():
+            event.listen(db.engine, 'before_cursor_execute', record)
+            try:
+                updated = mark_overdue_tasks(now=NOW)
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', record)
+
+        self.assertEqual(updated, {None: 0, 'Pacific/Kiritimati': 2})
+        self.assertEqual(len(updates), 2)
+        self.assertEqual([self._status(task_id) for task_id in (june_15, june_14, done, server_due_today, broken)],
+                         ['overdue', 'overdue', 'completed', 'pending', 'pending'])
+
+    def test_overdue_reads_use_status(self):
+        """Test stats count overdue status, and reopening/editing keep it consistent"""
+        past_due = self._add_task('serveruser', date.today() - timedelta(days=3), status='completed')
+        self._add_task('serveruser', date.today() - timedelta(days=3))
+        with self.app.app_context():
+            mark_overdue_tasks()
+
+        self.client.post('/auth/login', data={'username': 'serveruser', 'password': 'testpass'})
+        self.assertEqual(self.client.get('/api/user/stats').get_json()['stats']['overdue_tasks'], 1)
+
+        response = self.client.post(f'/api/tasks/{past_due}/toggle-status')
+        self.assertEqual(response.get_json()['status'], 'overdue')
+        self.assertEqual(self.client.get('/api/user/stats').get_json()['stats']['overdue_tasks'], 2)
+
+        self.client.post(f'/tasks/edit/{past_due}', data={
+            'title': 'Rescheduled', 'subject': 'Math', 'priority': 'medium', 'difficulty': 3,
+            'estimated_hours': 1, 'due_date': (date.today() + timedelta(days=1)).isoformat(),
+            'category': 'assignment'
+        })
+        self.assertEqual(self._status(past_due), 'pending')
+
+    def test_rescheduling_restores_in_progress(self):
+        """Test a past-due in-progress task counts as overdue and gets its status back when rescheduled"""
+        started = self._add_task('serveruser', date.today() - timedelta(days=2), status='in_progress')
+        with self.app.app_context():
+            mark_overdue_tasks()
+
+        self.client.post('/auth/login', data={'username': 'serveruser', 'password': 'testpass'})
+        self.assertEqual(self.client.get('/api/user/stats').get_json()['stats']['overdue_tasks'], 1)
+        self.assertTrue(self.client.get('/tasks/api/list').get_json()['tasks'][0]['is_overdue'])
+
+        self.client.post(f'/tasks/edit/{started}', data={
+            'title': 'Rescheduled', 'subject': 'Math', 'priority': 'medium', 'difficulty': 3,
+            'estimated_hours': 1, 'due_date': (date.today() + timedelta(days=1)).isoformat(),
+            'category': 'assignment'
+        })
+        self.assertEqual(self._status(started), 'in_progress')
+
+    def test_reopen_uses_owner_local_date(self):
+        """Test reopening compares the due date with the owner's local date, not the server's"""
+        with self.app.app_context():
+            user = User(username='westuser', email='west@example.com', first_name='Test', last_name='User',
+                        timezone='Etc/GMT+12')
+            user.set_password('testpass')
+            db.session.add(user)
+            db.session.commit()
+            self.user_ids['westuser'] = user.id
+        # UTC+14 is always one or two dates ahead of UTC-12, so this is past
+        # for the island user and not yet past for the west user
+        due = local_today('Pacific/Kiritimati') - timedelta(days=1)
+        island = self._add_task('islanduser', due, status='completed')
+        west = self._add_task('westuser', due, status='completed')
+        broken = self._add_task('brokenuser', date(2001, 1, 1), status='completed')
+
+        self.client.post('/auth/login', data={'username': 'islanduser', 'password': 'testpass'})
+        self.assertEqual(self.client.post(f'/api/tasks/{island}/toggle-status').get_json()['status'], 'overdue')
+        with self.app.app_context():
+            apply_bulk_operation(self.user_ids['westuser'], [west], 'reopen')
+            db.session.get(Task, broken).reopen()
+            db.session.commit()
+        self.assertEqual(self._status(west), 'pending')
+        self.assertEqual(self._status(broken), 'pending')
+
+    def test_cli_command(self):
+        """Test `flask mark-overdue` reports the transitioned tasks"""
+        self._add_task('serveruser', date.today() - timedelta(days=1))
+        result = self.app.test_cli_runner().invoke(args=['mark-overdue'])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn('Marked 1 tasks overdue', result.output)
+
+if __name__ == '__main__':
+    unittest.main()
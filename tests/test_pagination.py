@@ -0,0 +1,102 @@
+"""
+Tests for keyset pagination of tasks and study sessions
+"""
+
+import unittest
+from datetime import date, datetime, timedelta
+from app import create_app, db
+from app.models import User, Task, StudySession
+from app.utils.pagination import InvalidCursor, decode_cursor, encode_cursor
+
+class PaginationTestCase(unittest.TestCase):
+    """Test cases for cursor-based task and session listings"""
+
+    def setUp(self):
+        """Set up a logged in user with tasks sharing due dates"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            user = User(username='testuser', email='test@example.com', first_name='Test', last_name='User')
+            user.set_password('testpass')
+            db.session.add(user)
+            db.session.flush()
+
+            today = date.today()
+            for index in range(7):
+                db.session.add(Task(
+                    title=f'Task {index}', subject='Math', due_date=today + timedelta(days=index % 3),
+                    status='completed' if index % 2 else 'pending', user_id=user.id
+                ))
+            created = datetime(2024, 1, 1, 12, 0)
+            for index in range(5):
+                # Two sessions per timestamp, so the id tie breaker matters
+                db.session.add(StudySession(
+                    subject='Math', duration=30, user_id=user.id,
+                    created_at=created + timedelta(hours=index // 2)
+                ))
+            db.session.commit()
+
+        self.client.post('/auth/login', data={'username': 'testuser', 'password': 'testpass'})
+
+    def tearDown(self):
+        """Clean up after tests"""
+        with self.app.app_context():
+            db.drop_all()
+
+    def _walk(self, url, key):
+        items, cursor = [], None
+        while True:
+            response = self.client.get(url + (f'&cursor={cursor}' if cursor else ''))
+            self.assertEqual(response.status_code, 200)
+            data = response.get_json()
+            items.extend(data[key])
+            cursor = data['next_cursor']
+            self.assertEqual(data['has_more'], cursor is not None)
+            if cursor is None:
+                return items
+
+    def test_cursor_round_trip(self):
+        """Test cursors decode to the values they encode"""
+        self.assertEqual(decode_cursor(encode_cursor(date(2024, 5, 1), 7), date), (date(2024, 5, 1), 7))
+        with self.assertRaises(InvalidCursor):
+            decode_cursor('not-a-cursor', date)
+
+    def test_task_pages_cover_every_task_in_order(self):
+        """Test walking the pages yields each task once, ordered by (due_date, id)"""
+        tasks = self._walk('/tasks/api/list?limit=3', 'tasks')
+
+        keys = [(task['due_date'], task['id']) for task in tasks]
+        self.assertEqual(len(keys), 7)
+        self.assertEqual(keys, sorted(keys))
+
+    def test_task_pages_respect_filters(self):
+        """Test the status filter applies across pages"""
+        tasks = self._walk('/tasks/api/list?limit=2&status=pending', 'tasks')
+
+        self.assertEqual(len(tasks), 4)
+        self.assertTrue(all(task['status'] == 'pending' for task in tasks))
+
+    def test_session_pages_are_newest_first(self):
+        """Test sessions page by (created_at, id) descending"""
+        sessions = self._walk('/tasks/api/study-sessions?limit=2', 'sessions')
+
+        keys = [(session['created_at'], session['id']) for session in sessions]
+        self.assertEqual(len(keys), 5)
+        self.assertEqual(keys, sorted(keys, reverse=True))
+
+    def test_html_page_links_to_next_page(self):
+        """Test the tasks page renders one page and a load-more link"""
+        response = self.client.get('/tasks/?limit=3')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'id="load-more"', response.data)
+        self.assertEqual(response.data.count(b'class="card"'), 3)
+
+    def test_invalid_cursor_is_rejected(self):
+        """Test a malformed cursor returns 400"""
+        self.assertEqual(self.client.get('/tasks/api/list?cursor=garbage').status_code, 400)
+        self.assertEqual(self.client.get('/tasks/study-sessions?cursor=garbage').status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
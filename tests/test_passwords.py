@@ -0,0 +1,85 @@
+"""
+Tests for pooled password hashing
+"""
+
+import unittest
+from app import create_app, db
+from app.models import User
+from app.utils.passwords import PasswordHasher
+
+class PasswordHashingTestCase(unittest.TestCase):
+    """Test cases for rehash-on-login and load shedding"""
+    
+    def setUp(self):
+        """Set up test environment"""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client()
+        db.create_all()
+        
+        self.user = User(
+            username='testuser',
+            email='test@example.com',
+            first_name='Test',
+            last_name='User'
+        )
+        self.user.set_password('testpass')
+        db.session.add(self.user)
+        db.session.commit()
+    
+    def tearDown(self):
+        """Clean up after tests"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+    
+    def _login(self):
+        return self.client.post('/auth/login', data={
+            'username': 'testuser',
+            'password': 'testpass'
+        })
+    
+    def test_login_rehashes_outdated_hash(self):
+        """Test changed hash parameters are applied on the next login"""
+        version = self.user.session_version
+        self.app.extensions['password_hasher'] = PasswordHasher(method='pbkdf2:sha256:2000')
+        
+        self._login()
+        
+        user = db.session.get(User, self.user.id)
+        self.assertTrue(user.password_hash.startswith('pbkdf2:sha256:2000$'))
+        self.assertEqual(user.session_version, version)
+        self.assertTrue(user.check_password('testpass'))
+    
+    def test_equivalent_method_spellings_do_not_rehash(self):
+        """Test methods that differ only in spelled-out defaults match the stored hash"""
+        pwhash = PasswordHasher(method='pbkdf2:sha256:600000').hash('testpass')
+        for method in ('pbkdf2', 'pbkdf2:sha256', 'pbkdf2:sha256:600000'):
+            self.assertFalse(PasswordHasher(method=method).needs_rehash(pwhash), method)
+        self.assertTrue(PasswordHasher(method='pbkdf2:sha256:700000').needs_rehash(pwhash))
+        self.assertTrue(PasswordHasher(method='scrypt').needs_rehash(pwhash))
+        self.assertFalse(PasswordHasher(method='scrypt').needs_rehash('scrypt:32768:8:1$salt$hash'))
+    
+    def test_saturated_pool_returns_503(self):
+        """Test logins are shed with Retry-After when the pool is full"""
+        self.app.extensions['password_hasher'] = PasswordHasher(max_pending=0, retry_after=5)
+        
+        response = self._login()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers['Retry-After'], '5')
+    
+    def test_saturated_pool_sheds_registrations(self):
+        """Test registration is shed with Retry-After too, without creating the user"""
+        self.app.extensions['password_hasher'] = PasswordHasher(max_pending=0, retry_after=5)
+        
+        response = self.client.post('/auth/register', data={
+            'username': 'newuser', 'email': 'new@example.com', 'first_name': 'New', 'last_name': 'User',
+            'password': 'newpass123', 'password2': 'newpass123'
+        })
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers['Retry-After'], '5')
+        self.assertIsNone(User.query.filter_by(username='newuser').first())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+Tests for the generated priority/status rank columns
+"""
+
+import unittest
+from datetime import date, timedelta
+from app import create_app, db
+from app.models import User, Task
+from app.models.task import OPEN_TASK, PRIORITY_ORDER
+from app.utils.ai_helper import suggest_study_schedule
+from app.utils.bulk_tasks import apply_bulk_operation
+
+class PriorityRankTestCase(unittest.TestCase):
+    """Test cases for priority_rank/status_rank ordering and filters"""
+
+    def setUp(self):
+        """Set up a logged in user with tasks of every priority due today"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            user = User(username='testuser', email='test@example.com', first_name='Test', last_name='User')
+            user.set_password('testpass')
+            db.session.add(user)
+            db.session.flush()
+            for priority in ('medium', 'high', 'low', 'urgent'):
+                db.session.add(Task(title=f'{priority.title()} task', subject='Math', priority=priority,
+                                    due_date=date.today(), user_id=user.id))
+            db.session.add(Task(title='Done task', subject='Math', priority='urgent', status='completed',
+                                due_date=date.today() + timedelta(days=1), user_id=user.id))
+            db.session.commit()
+            self.user_id = user.id
+
+        self.client.post('/auth/login', data={'username': 'testuser', 'password': 'testpass'})
+
+    def tearDown(self):
+        """Clean up after tests"""
+        with self.app.app_context():
+            db.drop_all()
+
+    def test_dashboard_orders_by_rank(self):
+        """Test today's tasks are listed urgent first (not alphabetically)"""
+        html = self.client.get('/dashboard').get_data(as_text=True)
+        positions = [html.index(f'{priority} task') for priority in ('Urgent', 'High', 'Medium', 'Low')]
+        self.assertEqual(positions, sorted(positions))
+
+    def test_ranks_follow_bulk_updates(self):
+        """Test Core bulk updates keep the generated ranks in step"""
+        with self.app.app_context():
+            low = Task.query.filter_by(title='Low task').one()
+            apply_bulk_operation(self.user_id, [low.id], 'set_priority', 'urgent')
+            db.session.expire_all()
+            self.assertEqual(db.session.get(Task, low.id).priority_rank, 4)
+
+            open_tasks = Task.query.filter(Task.user_id == self.user_id, OPEN_TASK).order_by(*PRIORITY_ORDER).all()
+            self.assertEqual({task.title for task in open_tasks[:2]}, {'Urgent task', 'Low task'})
+            self.assertNotIn('Done task', [task.title for task in open_tasks])
+
+            schedule = suggest_study_schedule(open_tasks)
+            self.assertEqual([item['priority'] for item in schedule], ['urgent', 'urgent', 'high', 'medium'])
+            self.assertEqual(suggest_study_schedule(open_tasks[::-1]), schedule)
+
+    def test_priority_filter(self):
+        """Test the tasks page priority filter"""
+        data = self.client.get('/tasks/api/list?priority=urgent').get_json()
+        self.assertEqual([task['title'] for task in data['tasks']], ['Urgent task', 'Done task'])
+
+if __name__ == '__main__':
+    unittest.main()
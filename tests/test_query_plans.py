@@ -0,0 +1,94 @@
+"""
+Query plan tests for the hot per-user queries
+"""
+
+import re
+import unittest
+from datetime import date, datetime, timedelta
+from sqlalchemy import event
+from app import create_app, db
+from app.models import User, Task, StudySession
+
+HOT_ROUTES = [
+    '/dashboard',
+    '/pomodoro',
+    '/api/dashboard-stats',
+    '/analytics/',
+    '/analytics/productivity',
+    '/analytics/goals',
+    '/analytics/api/chart-data?type=daily&days=7',
+    '/analytics/api/chart-data?type=subjects',
+    '/analytics/api/chart-data?type=focus&days=7',
+    '/api/dashboard/summary',
+    '/api/user/stats',
+    '/api/study-recommendations',
+    '/tasks/',
+    '/tasks/?priority=high',
+    '/tasks/study-sessions'
+]
+
+# "SCAN tasks" (or "SCAN TABLE tasks" on older SQLite) reads every row
+FULL_SCAN = re.compile(r'^SCAN (TABLE )?(tasks|study_sessions)\b')
+
+class QueryPlanTestCase(unittest.TestCase):
+    """EXPLAIN every tasks/study_sessions query issued by the hot routes"""
+
+    def setUp(self):
+        """Set up a user with tasks and sessions, logged in"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            user = User(username='testuser', email='test@example.com', first_name='Test', last_name='User')
+            user.set_password('testpass')
+            db.session.add(user)
+            db.session.flush()
+
+            today = date.today()
+            for offset in range(-5, 5):
+                db.session.add(Task(
+                    title=f'Task {offset}', subject='Math', due_date=today + timedelta(days=offset),
+                    status='completed' if offset < 0 else 'pending',
+                    completed_at=datetime.utcnow() if offset < 0 else None, user_id=user.id
+                ))
+                db.session.add(StudySession(
+                    subject='Math', duration=30, date=today + timedelta(days=min(offset, 0)), user_id=user.id
+                ))
+            db.session.commit()
+            self.engine = db.engine
+
+        self.client.post('/auth/login', data={'username': 'testuser', 'password': 'testpass'})
+
+        self.queries = []
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+        with self.app.app_context():
+            db.drop_all()
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and re.search(r'\b(tasks|study_sessions)\b', statement):
+            self.queries.append((statement, parameters))
+
+    def test_hot_queries_use_indexes(self):
+        """Test no hot query falls back to a full table scan"""
+        for path in HOT_ROUTES:
+            response = self.client.get(path)
+            self.assertEqual(response.status_code, 200, path)
+
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+        self.assertTrue(self.queries)
+
+        with self.engine.connect() as connection:
+            for statement, parameters in self.queries:
+                plan = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).fetchall()
+                details = [row[-1] for row in plan]
+                scans = [detail for detail in details if FULL_SCAN.match(detail)]
+                self.assertEqual(scans, [], f'{statement}\n{details}')
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+
+if __name__ == '__main__':
+    unittest.main()
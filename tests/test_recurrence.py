@@ -0,0 +1,167 @@
+"""
+Tests for recurring tasks
+"""
+
+import unittest
+from datetime import date, timedelta
+from app import create_app, db
+from app.models import User, Task, TaskRecurrence, SkippedOccurrence
+from app.utils.ics_feed import issue_feed_token
+
+class RecurrenceTestCase(unittest.TestCase):
+    """Test cases for recurrence expansion and materialization"""
+
+    def setUp(self):
+        """Set up a logged in user with a weekly recurrence starting today"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.today = date.today()
+
+        with self.app.app_context():
+            db.create_all()
+            user = User(username='testuser', email='test@example.com', first_name='Test', last_name='User')
+            user.set_password('testpass')
+            db.session.add(user)
+            db.session.flush()
+            recurrence = TaskRecurrence(title='Weekly reading', subject='History', frequency='weekly',
+                                        starts_on=self.today, ends_on=self.today + timedelta(weeks=10),
+                                        user_id=user.id)
+            db.session.add(recurrence)
+            db.session.commit()
+            self.user_id, self.recurrence_id = user.id, recurrence.id
+            self.feed_url = f'/tasks/feed/{issue_feed_token(self.app, user)}.ics'
+
+        self.client.post('/auth/login', data={'username': 'testuser', 'password': 'testpass'})
+
+    def tearDown(self):
+        """Clean up after tests"""
+        with self.app.app_context():
+            db.drop_all()
+
+    def _calendar(self, weeks=4):
+        end = self.today + timedelta(weeks=weeks)
+        return self.client.get(f'/tasks/api/tasks?start={self.today}&end={end}').get_json()
+
+    def _task_count(self):
+        with self.app.app_context():
+            return Task.query.filter_by(user_id=self.user_id).count()
+
+    def test_occurrence_dates(self):
+        """Test interval stepping, month-end clamping and the end date"""
+        weekly = TaskRecurrence(frequency='weekly', interval=2, starts_on=date(2030, 1, 1), ends_on=date(2030, 3, 1))
+        self.assertEqual(weekly.occurrence_dates(date(2030, 1, 10), date(2031, 1, 1)),
+                         [date(2030, 1, 15), date(2030, 1, 29), date(2030, 2, 12), date(2030, 2, 26)])
+
+        monthly = TaskRecurrence(frequency='monthly', interval=1, starts_on=date(2030, 1, 31))
+        self.assertEqual(monthly.occurrence_dates(date(2030, 2, 1), date(2030, 5, 1)),
+                         [date(2030, 2, 28), date(2030, 3, 31), date(2030, 4, 30)])
+        self.assertFalse(monthly.is_occurrence(date(2030, 2, 27)))
+
+    def test_add_form_creates_rule_not_rows(self):
+        """Test a repeating task from the add page stores only the rule"""
+        self.client.post('/tasks/add', data={
+            'title': 'Problem set', 'subject': 'Math', 'priority': 'high', 'difficulty': 3,
+            'estimated_hours': 2, 'due_date': self.today.isoformat(), 'category': 'assignment',
+            'repeat': 'daily', 'repeat_until': (self.today + timedelta(days=2)).isoformat()
+        })
+        self.assertEqual(self._task_count(), 0)
+
+        titles = [event['title'] for event in self._calendar()]
+        self.assertEqual(titles.count('Problem set'), 3)
+        self.assertEqual(titles.count('Weekly reading'), 4)
+
+    def test_completing_materializes_once(self):
+        """Test an occurrence becomes one Task row and leaves the expansion"""
+        second = self.today + timedelta(weeks=1)
+        url = f'/api/recurrences/{self.recurrence_id}/occurrences/{second}/complete'
+
+        first_response = self.client.post(url).get_json()
+        self.assertEqual((first_response['status'], first_response['points_earned']), ('completed', 35))
+        self.assertEqual(self.client.post(url).get_json()['task_id'], first_response['task_id'])
+        self.assertEqual(self._task_count(), 1)
+
+        events = self._calendar()
+        self.assertEqual(len(events), 4)
+        self.assertEqual([event['id'] for event in events if event['start'] == second.isoformat()],
+                         [first_response['task_id']])
+
+        off_schedule = f'/api/recurrences/{self.recurrence_id}/occurrences/{self.today + timedelta(days=1)}/complete'
+        self.assertEqual(self.client.post(off_schedule).status_code, 404)
+        self.assertEqual(self.client.post(f'/api/recurrences/{self.recurrence_id}/occurrences/bad/complete').status_code, 404)
+
+    def test_edit_link_materializes(self):
+        """Test the occurrence edit link creates the row and redirects to the task editor"""
+        response = self.client.get(f'/tasks/recurring/{self.recurrence_id}/{self.today}/edit')
+        self.assertEqual(response.status_code, 302)
+        with self.app.app_context():
+            task = Task.query.filter_by(user_id=self.user_id).one()
+            self.assertEqual((task.occurrence_date, task.title), (self.today, 'Weekly reading'))
+        self.assertTrue(response.headers['Location'].endswith(f'/tasks/edit/{task.id}'))
+
+    def test_deleted_occurrence_stays_deleted(self):
+        """Test deleting a materialized occurrence removes it from the series instead of resetting it"""
+        second = self.today + timedelta(weeks=1)
+        third = self.today + timedelta(weeks=2)
+        task_ids = [self.client.post(f'/api/recurrences/{self.recurrence_id}/occurrences/{day}/complete')
+                    .get_json()['task_id'] for day in (second, third)]
+
+        self.client.post(f'/tasks/delete/{task_ids[0]}')
+        self.client.post('/api/tasks/bulk', json={'task_ids': [task_ids[1]], 'operation': 'delete'})
+        self.assertEqual(self._task_count(), 0)
+
+        starts = [event['start'] for event in self._calendar()]
+        self.assertEqual(starts, [self.today.isoformat(), (self.today + timedelta(weeks=3)).isoformat()])
+        body = self.client.get(self.feed_url).get_data(as_text=True)
+        self.assertEqual(body.count('BEGIN:VEVENT'), 9)
+        self.assertEqual(self.client.post(f'/api/recurrences/{self.recurrence_id}/occurrences/{second}/complete')
+                         .status_code, 404)
+
+        self.assertEqual(self.client.delete(f'/api/recurrences/{self.recurrence_id}').get_json()['success'], True)
+        with self.app.app_context():
+            self.assertEqual(SkippedOccurrence.query.count(), 0)
+
+    def test_past_occurrences_are_not_overdue_until_materialized(self):
+        """Test expanded past occurrences agree with the overdue counts, which only see Task rows"""
+        start = self.today - timedelta(weeks=2)
+        with self.app.app_context():
+            db.session.get(TaskRecurrence, self.recurrence_id).starts_on = start
+            db.session.commit()
+
+        events = self.client.get(f'/tasks/api/tasks?start={start}&end={self.today}').get_json()
+        self.assertEqual([event['extendedProps']['status'] for event in events], ['pending', 'pending'])
+        self.assertEqual(self.client.get('/api/user/stats').get_json()['stats']['overdue_tasks'], 0)
+
+        self.client.get(f'/tasks/recurring/{self.recurrence_id}/{start}/edit')
+        self.assertEqual(self.client.get('/api/user/stats').get_json()['stats']['overdue_tasks'], 1)
+
+    def test_feed_uid_is_stable_across_materialization(self):
+        """Test the .ics UID of an occurrence survives materialization"""
+        uid = f'UID:task-r{self.recurrence_id}-{self.today:%Y%m%d}@'
+        before = self.client.get(self.feed_url)
+        body = before.get_data(as_text=True)
+        self.assertIn(uid, body)
+        self.assertEqual(body.count('BEGIN:VEVENT'), 11)
+
+        self.client.post(f'/api/recurrences/{self.recurrence_id}/occurrences/{self.today}/complete')
+        after = self.client.get(self.feed_url, headers={'If-None-Match': before.headers['ETag']})
+        self.assertEqual(after.status_code, 200)
+        body = after.get_data(as_text=True)
+        self.assertIn(uid, body)
+        self.assertIn('SUMMARY:✓ Weekly reading', body)
+        self.assertEqual(body.count('BEGIN:VEVENT'), 11)
+
+    def test_deleting_rule_keeps_materialized_tasks(self):
+        """Test ending a series detaches its tasks and stops the expansion"""
+        self.client.post(f'/api/recurrences/{self.recurrence_id}/occurrences/{self.today}/complete')
+        etag = self.client.get(f'/tasks/api/tasks?start={self.today}&end={self.today + timedelta(weeks=4)}').headers['ETag']
+
+        self.assertEqual(self.client.delete(f'/api/recurrences/{self.recurrence_id}').get_json()['success'], True)
+        self.assertEqual(self.client.get('/api/recurrences').get_json()['recurrences'], [])
+        self.assertEqual(len(self._calendar()), 1)
+        self.assertNotEqual(self.client.get(f'/tasks/api/tasks?start={self.today}&end={self.today + timedelta(weeks=4)}')
+                            .headers['ETag'], etag)
+        with self.app.app_context():
+            self.assertIsNone(Task.query.one().recurrence_id)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+"""
+Tests for schema versioning at startup
+"""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+from sqlalchemy import create_engine
+from app import create_app, db
+from app.utils import schema
+
+class SchemaVersionTestCase(unittest.TestCase):
+    """Test cases for the startup schema check"""
+    
+    def setUp(self):
+        """Set up test environment"""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+    
+    def tearDown(self):
+        """Clean up after tests"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+    
+    def test_fresh_database_is_created_and_stamped(self):
+        """Test an unversioned database gets tables and the current version"""
+        self.assertEqual(schema.ensure_schema(mode='version'), schema.SCHEMA_VERSION)
+        
+        with db.engine.connect() as connection:
+            self.assertEqual(schema.get_schema_version(connection), schema.SCHEMA_VERSION)
+            self.assertTrue(db.inspect(connection).has_table('tasks'))
+    
+    def test_current_database_skips_ddl(self):
+        """Test no DDL runs when the stored version is current"""
+        schema.ensure_schema(mode='version')
+        
+        with mock.patch.object(schema, 'upgrade_schema') as upgrade:
+            self.assertEqual(schema.ensure_schema(mode='version'), schema.SCHEMA_VERSION)
+            upgrade.assert_not_called()
+    
+    def test_upgrade_rechecks_version_under_lock(self):
+        """Test a worker that lost the race returns without replaying migrations"""
+        schema.ensure_schema(mode='version')
+        
+        step = mock.Mock()
+        with mock.patch.object(schema, 'MIGRATIONS', [(1, 'step', step)]):
+            self.assertEqual(schema.upgrade_schema(current=None), schema.SCHEMA_VERSION)
+        step.assert_not_called()
+    
+    def test_sqlite_lock_excludes_other_writers(self):
+        """Test the SQLite schema lock holds the write lock until commit"""
+        handle, path = tempfile.mkstemp(suffix='.db')
+        os.close(handle)
+        engine = create_engine(f'sqlite:///{path}', connect_args={'timeout': 0})
+        try:
+            with engine.begin() as connection:
+                schema._lock_schema(connection)
+                other = sqlite3.connect(path, timeout=0)
+                with self.assertRaises(sqlite3.OperationalError):
+                    other.execute('BEGIN IMMEDIATE')
+                other.close()
+        finally:
+            engine.dispose()
+            os.remove(path)
+    
+    def test_upgrade_adds_hot_query_indexes(self):
+        """Test a version 2 database gains the composite indexes"""
+        schema.ensure_schema(mode='version')
+        with db.engine.begin() as connection:
+            for table_name, index_names in schema.HOT_QUERY_INDEXES.items():
+                for name in index_names:
+                    connection.execute(db.text(f'DROP INDEX {name}'))
+            connection.execute(schema.schema_version_table.update().values(version=2))
+        
+        self.assertEqual(schema.ensure_schema(mode='version'), schema.SCHEMA_VERSION)
+        
+        with db.engine.connect() as connection:
+            inspector = db.inspect(connection)
+            for table_name, index_names in schema.HOT_QUERY_INDEXES.items():
+                existing = {index['name'] for index in inspector.get_indexes(table_name)}
+                self.assertTrue(set(index_names) <= existing)
+
+    def test_upgrade_adds_generated_rank_columns(self):
+        """Test a version 7 database gains rank columns computed for existing rows"""
+        schema.ensure_schema(mode='version')
+        with db.engine.begin() as connection:
+            for name in ('ix_tasks_user_priority_rank_due_date', 'ix_tasks_user_status_rank_due_date'):
+                connection.execute(db.text(f'DROP INDEX {name}'))
+            connection.execute(db.text('ALTER TABLE tasks DROP COLUMN priority_rank'))
+            connection.execute(db.text('ALTER TABLE tasks DROP COLUMN status_rank'))
+            connection.execute(db.text(
+                "INSERT INTO tasks (title, subject, priority, status, due_date, user_id) "
+                "VALUES ('Old', 'Math', 'urgent', 'overdue', '2030-01-01', 1)"
+            ))
+            connection.execute(schema.schema_version_table.update().values(version=7))
+        
+        self.assertEqual(schema.ensure_schema(mode='version'), schema.SCHEMA_VERSION)
+        
+        with db.engine.connect() as connection:
+            self.assertEqual(connection.execute(db.text('SELECT priority_rank, status_rank FROM tasks')).one(), (4, 1))
+            existing = {index['name'] for index in db.inspect(connection).get_indexes('tasks')}
+            self.assertIn('ix_tasks_user_priority_rank_due_date', existing)
+    
+    def test_upgrade_marks_in_progress_tasks_overdue(self):
+        """Test a version 10 database gains pre_overdue_status and past-due in-progress tasks move to overdue"""
+        schema.ensure_schema(mode='version')
+        with db.engine.begin() as connection:
+            connection.execute(db.text('ALTER TABLE tasks DROP COLUMN pre_overdue_status'))
+            connection.execute(db.text(
+                "INSERT INTO users (username, email, password_hash, first_name, last_name, session_version) "
+                "VALUES ('old', 'old@example.com', 'x', 'Old', 'User', 0)"
+            ))
+            connection.execute(db.text(
+                "INSERT INTO tasks (title, subject, priority, status, due_date, user_id) "
+                "VALUES ('Old', 'Math', 'medium', 'in_progress', '2001-01-01', 1)"
+            ))
+            connection.execute(schema.schema_version_table.update().values(version=10))
+        
+        self.assertEqual(schema.ensure_schema(mode='version'), schema.SCHEMA_VERSION)
+        
+        with db.engine.connect() as connection:
+            self.assertEqual(connection.execute(db.text('SELECT status, pre_overdue_status FROM tasks')).one(),
+                             ('overdue', 'in_progress'))
+    
+    def test_upgrade_merges_subject_variants(self):
+        """Test a version 8 database gets one subject per normalized name, named after the most used spelling"""
+        schema.ensure_schema(mode='version')
+        with db.engine.begin() as connection:
+            for spelling in ('Math', 'math ', 'Math', 'Physics'):
+                connection.execute(db.text(
+                    "INSERT INTO tasks (title, subject, priority, status, due_date, user_id) "
+                    "VALUES ('Old', :subject, 'medium', 'pending', '2030-01-01', 1)"
+                ), {'subject': spelling})
+            connection.execute(db.text(
+                "INSERT INTO study_sessions (subject, duration, date, start_time, user_id) "
+                "VALUES ('  MATH', 30, '2030-01-01', '2030-01-01 09:00:00', 1)"
+            ))
+            connection.execute(schema.schema_version_table.update().values(version=8))
+        
+        self.assertEqual(schema.ensure_schema(mode='version'), schema.SCHEMA_VERSION)
+        
+        with db.engine.connect() as connection:
+            subjects = dict(connection.execute(db.text('SELECT normalized, name FROM subjects')).all())
+            self.assertEqual(subjects, {'math': 'Math', 'physics': 'Physics'})
+            linked = connection.execute(db.text(
+                'SELECT COUNT(*) FROM tasks JOIN subjects ON subjects.id = tasks.subject_id '
+                "WHERE subjects.normalized = 'math'"
+            )).scalar()
+            self.assertEqual(linked, 3)
+            self.assertIsNotNone(connection.execute(db.text('SELECT subject_id FROM study_sessions')).scalar())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Tests for full-text task search
+"""
+
+import unittest
+from datetime import date
+from app import create_app, db
+from app.models import User, Task
+from app.utils import schema
+
+class TaskSearchTestCase(unittest.TestCase):
+    """Test cases for /tasks/api/search"""
+
+    def setUp(self):
+        """Set up two users with overlapping task vocabulary"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            users = []
+            for name in ('testuser', 'otheruser'):
+                user = User(username=name, email=f'{name}@example.com', first_name='Test', last_name='User')
+                user.set_password('testpass')
+                db.session.add(user)
+                users.append(user)
+            db.session.flush()
+
+            today = date.today()
+            for title, description, subject in [
+                ('Thermodynamics problem set', None, 'Physics'),
+                ('Read chapter 4', 'Covers thermodynamics basics', 'Physics'),
+                ('Essay draft', 'Compare two novels', 'Literature'),
+            ]:
+                db.session.add(Task(title=title, description=description, subject=subject,
+                                    due_date=today, user_id=users[0].id))
+            db.session.add(Task(title='Thermodynamics lab', subject='Physics', due_date=today, user_id=users[1].id))
+            db.session.commit()
+
+        self.client.post('/auth/login', data={'username': 'testuser', 'password': 'testpass'})
+
+    def tearDown(self):
+        """Clean up after tests"""
+        with self.app.app_context():
+            db.drop_all()
+
+    def _titles(self, query):
+        response = self.client.get(f'/tasks/api/search?q={query}')
+        self.assertEqual(response.status_code, 200)
+        return [result['title'] for result in response.get_json()['results']]
+
+    def test_prefix_search_ranks_title_matches_first(self):
+        """Test prefixes match and title hits outrank description hits"""
+        self.assertEqual(self._titles('thermo'), ['Thermodynamics problem set', 'Read chapter 4'])
+        self.assertEqual(self._titles('thermo phys'), ['Thermodynamics problem set', 'Read chapter 4'])
+        self.assertEqual(self._titles('novel'), ['Essay draft'])
+
+    def test_index_follows_updates_and_deletes(self):
+        """Test the triggers keep the index in sync with the tasks table"""
+        with self.app.app_context():
+            essay = Task.query.filter_by(title='Essay draft').first()
+            essay.title = 'Thermal physics essay'
+            db.session.delete(Task.query.filter_by(title='Read chapter 4').first())
+            db.session.commit()
+
+        self.assertEqual(sorted(self._titles('therm')), ['Thermal physics essay', 'Thermodynamics problem set'])
+        self.assertEqual(self._titles('essay'), ['Thermal physics essay'])
+        self.assertEqual(self._titles('draft'), [])
+
+    def test_query_syntax_is_not_interpreted(self):
+        """Test FTS operators and quotes in user input are treated as words"""
+        self.assertEqual(self._titles('"thermo'), ['Thermodynamics problem set', 'Read chapter 4'])
+        self.assertEqual(self._titles('essay*^ -('), ['Essay draft'])
+        self.assertEqual(self._titles('essay OR thermo'), [])
+        self.assertEqual(self._titles(''), [])
+
+    def test_upgrade_indexes_existing_tasks(self):
+        """Test the version 4 migration backfills an unindexed database"""
+        with self.app.app_context():
+            schema.ensure_schema(mode='version')
+            with db.engine.begin() as connection:
+                connection.exec_driver_sql('DROP TABLE tasks_fts')
+                for trigger in ('insert', 'delete', 'update'):
+                    connection.exec_driver_sql(f'DROP TRIGGER tasks_fts_{trigger}')
+                connection.execute(schema.schema_version_table.update().values(version=3))
+            schema.ensure_schema(mode='version')
+
+        self.assertEqual(self._titles('essay'), ['Essay draft'])
+
+if __name__ == '__main__':
+    unittest.main()
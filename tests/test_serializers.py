@@ -0,0 +1,102 @@
+"""
+Tests for projection-based serializers and the JSON provider
+"""
+
+import unittest
+from unittest import mock
+from datetime import date, datetime, timedelta
+from flask import jsonify
+from flask.json.provider import DefaultJSONProvider
+from app import create_app, db
+from app.models import User, Task, StudySession
+from app.utils.json_provider import FastJSONProvider, orjson
+from app.utils.serializers import SESSION_COLUMNS, TASK_COLUMNS, serialize_sessions, serialize_tasks
+
+class SerializersTestCase(unittest.TestCase):
+    """Test cases for app.utils.serializers and FastJSONProvider"""
+
+    def setUp(self):
+        """Set up a logged in user with tasks and sessions"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            user = User(username='testuser', email='test@example.com', first_name='Test', last_name='User')
+            user.set_password('testpass')
+            db.session.add(user)
+            db.session.flush()
+            today = date.today()
+            db.session.add_all([
+                Task(title='Late', subject='Math', status='overdue', due_date=today - timedelta(days=2),
+                     user_id=user.id),
+                Task(title='Done late', subject='Math', status='completed', completed_at=datetime.utcnow(),
+                     due_date=today - timedelta(days=1), user_id=user.id),
+                Task(title='Next week', subject='Physics', description='Ch. 4', due_date=today + timedelta(days=7),
+                     user_id=user.id),
+                StudySession(subject='Math', duration=50, focus_rating=8, user_id=user.id),
+                StudySession(subject='Math', duration=25, focus_rating=3, notes='Tired', user_id=user.id,
+                             end_time=datetime.utcnow())
+            ])
+            db.session.commit()
+            self.user_id = user.id
+
+        self.client.post('/auth/login', data={'username': 'testuser', 'password': 'testpass'})
+
+    def tearDown(self):
+        """Clean up after tests"""
+        with self.app.app_context():
+            db.drop_all()
+
+    def test_rows_match_to_dict(self):
+        """Test projected rows serialize exactly like the model to_dict methods"""
+        with self.app.app_context():
+            tasks = Task.query.order_by(Task.id).all()
+            rows = db.session.query(*TASK_COLUMNS).order_by(Task.id).all()
+            self.assertEqual(serialize_tasks(rows), [task.to_dict() for task in tasks])
+
+            sessions = StudySession.query.order_by(StudySession.id).all()
+            rows = db.session.query(*SESSION_COLUMNS).order_by(StudySession.id).all()
+            self.assertEqual(serialize_sessions(rows), [session.to_dict() for session in sessions])
+
+    def test_list_endpoints_use_projections(self):
+        """Test the paginated JSON lists keep their payload shape"""
+        data = self.client.get('/tasks/api/list?limit=2').get_json()
+        self.assertEqual([task['title'] for task in data['tasks']], ['Late', 'Done late'])
+        self.assertEqual([task['is_overdue'] for task in data['tasks']], [True, False])
+        self.assertEqual(data['tasks'][0]['days_until_due'], -2)
+
+        data = self.client.get(f"/tasks/api/list?limit=2&cursor={data['next_cursor']}").get_json()
+        self.assertEqual([task['title'] for task in data['tasks']], ['Next week'])
+
+        data = self.client.get('/tasks/api/study-sessions').get_json()
+        self.assertEqual([session['productivity_level'] for session in data['sessions']], ['Poor', 'Excellent'])
+
+    @unittest.skipIf(orjson is None, 'orjson is not installed')
+    def test_responses_are_encoded_by_orjson(self):
+        """Test API responses go through orjson and render like the default provider"""
+        self.assertIsInstance(self.app.json, FastJSONProvider)
+        with mock.patch.object(orjson, 'dumps', wraps=orjson.dumps) as spy:
+            response = self.client.get('/tasks/api/list?limit=2')
+        # (the session cookie is encoded through app.json as well)
+        self.assertIn('tasks', [key for call in spy.call_args_list if isinstance(call.args[0], dict)
+                                for key in call.args[0]])
+        self.assertEqual([task['title'] for task in response.get_json()['tasks']], ['Late', 'Done late'])
+
+        default = DefaultJSONProvider(self.app)
+        payload = {'b': 1, 'a': date(2024, 1, 31), 'list': [1, 2]}
+        with self.app.app_context():
+            for compact in (None, False):
+                self.app.json.compact = default.compact = compact
+                with mock.patch.object(orjson, 'dumps', wraps=orjson.dumps) as spy:
+                    body = jsonify(payload).get_data(as_text=True)
+                self.assertEqual(spy.call_count, 1)
+                self.assertEqual(body, default.response(payload).get_data(as_text=True))
+
+            # Values orjson does not handle go through the stdlib encoder, with the same options
+            self.app.json.compact = None
+            self.assertEqual(jsonify({'big': 2 ** 70}).get_data(as_text=True), '{"big":1180591620717411303424}\n')
+            self.assertEqual(jsonify({7: 'week'}).get_data(as_text=True), '{"7":"week"}\n')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,178 @@
+"""
+Tests for the per-user subject dictionary
+"""
+
+import io
+import unittest
+from datetime import date, datetime
+from app import create_app, db
+from app.models import User, Task, StudySession, Subject
+from sqlalchemy import event
+from app.utils.subjects import SubjectIndex, subject_ids, user_subjects
+from app.utils.task_import import import_tasks, iter_csv_rows
+
+class SubjectTestCase(unittest.TestCase):
+    """Test cases for subject normalization, caching and grouping"""
+
+    def setUp(self):
+        """Set up a logged in user with tasks in two spellings of one subject"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            user = User(username='testuser', email='test@example.com', first_name='Test', last_name='User')
+            user.set_password('testpass')
+            db.session.add(user)
+            db.session.flush()
+            for subject in ('Math', ' math  ', 'Physics'):
+                db.session.add(Task(title=f'{subject.strip()} task', subject=subject,
+                                    due_date=date.today(), user_id=user.id))
+            db.session.commit()
+            self.user_id = user.id
+
+        self.client.post('/auth/login', data={'username': 'testuser', 'password': 'testpass'})
+
+    def tearDown(self):
+        """Clean up after tests"""
+        with self.app.app_context():
+            db.drop_all()
+
+    def test_variants_share_one_subject(self):
+        """Test case/whitespace variants get the same subject_id on flush"""
+        with self.app.app_context():
+            subjects = Subject.query.filter_by(user_id=self.user_id).all()
+            self.assertEqual(sorted(subject.name for subject in subjects), ['Math', 'Physics'])
+            ids = {task.subject: task.subject_id for task in Task.query.all()}
+            self.assertEqual(ids['Math'], ids[' math  '])
+            self.assertNotEqual(ids['Math'], ids['Physics'])
+
+    def test_changing_subject_reassigns_id(self):
+        """Test editing a task's subject moves it to the new dictionary row"""
+        with self.app.app_context():
+            task = Task.query.filter_by(subject='Physics').one()
+            task.subject = 'Chemistry'
+            db.session.commit()
+            self.assertEqual(db.session.get(Subject, task.subject_id).name, 'Chemistry')
+
+    def test_subject_list_is_cached(self):
+        """Test the subject list is read once and includes subjects created since"""
+        with self.app.app_context():
+            cache = self.app.extensions['subject_cache']
+            self.assertEqual(user_subjects(self.user_id), ['Math', 'Physics'])
+            hits = cache.hits
+            self.assertEqual(user_subjects(self.user_id), ['Math', 'Physics'])
+            self.assertEqual(cache.hits, hits + 1)
+
+            db.session.add(StudySession(subject='art', duration=30, date=date.today(),
+                                        start_time=datetime.utcnow(), user_id=self.user_id))
+            db.session.commit()
+            self.assertEqual(user_subjects(self.user_id), ['art', 'Math', 'Physics'])
+
+    def test_rollback_forgets_new_subjects(self):
+        """Test ids of subjects created in a rolled back transaction are not served from the cache"""
+        with self.app.app_context():
+            subject_ids(self.user_id, ['Biology'])
+            db.session.rollback()
+            self.assertEqual(user_subjects(self.user_id), ['Math', 'Physics'])
+
+    def test_new_subjects_are_shared_after_commit(self):
+        """Test the shared cache only sees subjects once the transaction that created them commits"""
+        with self.app.app_context():
+            cache = self.app.extensions['subject_cache']
+            ids = subject_ids(self.user_id, ['Biology'])
+            self.assertNotIn('biology', cache.get(self.user_id))
+            self.assertEqual(subject_ids(self.user_id, ['biology']), {'biology': ids['Biology']})
+            db.session.commit()
+            self.assertEqual(cache.get(self.user_id)['biology'], (ids['Biology'], 'Biology'))
+
+            savepoint = db.session.begin_nested()
+            subject_ids(self.user_id, ['Chemistry'])
+            savepoint.rollback()
+            db.session.commit()
+            self.assertEqual(user_subjects(self.user_id), ['Biology', 'Math', 'Physics'])
+
+    def test_unlinked_sessions_are_still_counted(self):
+        """Test study time without a subject_id falls back to the session's subject text"""
+        with self.app.app_context():
+            for subject in ('Math', 'Art'):
+                db.session.add(StudySession(subject=subject, duration=60, date=date.today(),
+                                            start_time=datetime.utcnow(), user_id=self.user_id))
+            db.session.commit()
+            db.session.execute(db.update(StudySession).where(StudySession.subject == 'Art').values(subject_id=None))
+            db.session.commit()
+
+        chart = self.client.get('/analytics/api/chart-data?type=subjects').get_json()
+        self.assertEqual(sorted(chart, key=lambda row: row['subject']),
+                         [{'subject': 'Art', 'hours': 1.0}, {'subject': 'Math', 'hours': 1.0}])
+        stats = self.client.get('/api/dashboard-stats').get_json()['subject_stats']
+        self.assertEqual(stats, {'Art': 1.0, 'Math': 1.0})
+        self.assertIn('<strong>Art</strong>', self.client.get('/analytics/').get_data(as_text=True))
+
+    def test_import_sets_subject_ids(self):
+        """Test Core batch imports link rows to existing and new subjects"""
+        csv_file = io.StringIO('title,subject,due_date\nA,MATH,2030-01-01\nB,Biology,2030-01-02\n')
+        with self.app.app_context():
+            result = import_tasks(self.user_id, iter_csv_rows(csv_file))
+            self.assertEqual(result.imported, 2)
+            rows = dict(db.session.execute(
+                db.select(Task.title, Subject.name).join(Subject, Subject.id == Task.subject_id)
+                .where(Task.title.in_(['A', 'B']))
+            ).all())
+            self.assertEqual(rows, {'A': 'Math', 'B': 'Biology'})
+
+    def test_filter_and_chart_group_variants(self):
+        """Test the task filter and the subject chart treat variants as one subject"""
+        response = self.client.get('/tasks/?subject=MATH')
+        html = response.get_data(as_text=True)
+        self.assertIn('Math task', html)
+        self.assertIn('math task', html)
+        self.assertNotIn('Physics task', html)
+
+        with self.app.app_context():
+            for subject in ('Math', 'MATH'):
+                db.session.add(StudySession(subject=subject, duration=60, date=date.today(),
+                                            start_time=datetime.utcnow(), user_id=self.user_id))
+            db.session.commit()
+        chart = self.client.get('/analytics/api/chart-data?type=subjects').get_json()
+        self.assertEqual(chart, [{'subject': 'Math', 'hours': 2.0}])
+
+    def test_autocomplete_matches_prefix(self):
+        """Test suggestions match any case of the prefix and respect word boundaries"""
+        index = SubjectIndex({'linear algebra': (1, 'Linear Algebra'), 'linearity': (2, 'Linearity'),
+                              'logic': (3, 'Logic')})
+        self.assertEqual(index.complete('LIN'), ['Linear Algebra', 'Linearity'])
+        self.assertEqual(index.complete('linear '), ['Linear Algebra'])
+        self.assertEqual(index.complete('l', limit=1), ['Linear Algebra'])
+        self.assertEqual(index.complete('x'), [])
+
+        extended = index.with_subjects({'linguistics': (4, 'Linguistics')})
+        self.assertEqual(extended.complete('lin'), ['Linear Algebra', 'Linearity', 'Linguistics'])
+        self.assertEqual(index.complete('lin'), ['Linear Algebra', 'Linearity'])
+
+    def test_autocomplete_endpoint_skips_database(self):
+        """Test repeated keystrokes are answered from the index and new subjects appear after a write"""
+        self.assertEqual(self.client.get('/tasks/api/subjects?q=ma').get_json()['subjects'], ['Math'])
+
+        statements = []
+        with self.app.app_context():
+            engine = db.engine
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(engine, 'before_cursor_execute', listener)
+        try:
+            for prefix in ('p', 'ph', 'phy'):
+                response = self.client.get(f'/tasks/api/subjects?q={prefix}')
+                self.assertEqual(response.get_json()['subjects'], ['Physics'])
+        finally:
+            event.remove(engine, 'before_cursor_execute', listener)
+        self.assertFalse([statement for statement in statements if 'subjects' in statement])
+
+        with self.app.app_context():
+            db.session.add(Task(title='Stats task', subject='Macroeconomics', due_date=date.today(),
+                                user_id=self.user_id))
+            db.session.commit()
+        self.assertEqual(self.client.get('/tasks/api/subjects?q=ma').get_json()['subjects'],
+                         ['Macroeconomics', 'Math'])
+
+if __name__ == '__main__':
+    unittest.main()
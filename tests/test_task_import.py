@@ -0,0 +1,105 @@
+"""
+Tests for streaming CSV/.ics task import
+"""
+
+import io
+import os
+import tempfile
+import unittest
+from datetime import date, timedelta
+from app import create_app, db
+from app.models import User, Task
+
+FUTURE = date.today() + timedelta(days=30)
+
+class TaskImportTestCase(unittest.TestCase):
+    """Test cases for /api/tasks/import and `flask import-tasks`"""
+
+    def setUp(self):
+        """Set up a logged in user"""
+        self.app = create_app('testing')
+        self.app.config['IMPORT_BATCH_SIZE'] = 2
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            user = User(username='testuser', email='test@example.com', first_name='Test', last_name='User')
+            user.set_password('testpass')
+            db.session.add(user)
+            db.session.commit()
+            self.user_id = user.id
+
+        self.client.post('/auth/login', data={'username': 'testuser', 'password': 'testpass'})
+
+    def tearDown(self):
+        """Clean up after tests"""
+        with self.app.app_context():
+            db.drop_all()
+
+    def _upload(self, content, filename, **form):
+        data = dict(form, file=(io.BytesIO(content.encode()), filename))
+        return self.client.post('/api/tasks/import', data=data, content_type='multipart/form-data')
+
+    def _tasks(self):
+        with self.app.app_context():
+            return Task.query.filter_by(user_id=self.user_id).order_by(Task.id).all()
+
+    def test_csv_import_reports_row_errors(self):
+        """Test valid rows are inserted in batches and invalid rows reported by line"""
+        content = '﻿Title,Subject,Priority,Difficulty,Due Date,Estimated Hours\n'
+        for index in range(5):
+            content += f'Chapter {index},Biology,high,2,{FUTURE},1.5\n'
+        content += ',Biology,high,2,2030-01-01,1\n'
+        content += 'Past,Biology,high,2,2001-01-01,1\n'
+        content += 'Bad priority,Biology,critical,9,2030-01-01,1\n'
+
+        response = self._upload(content, 'syllabus.csv')
+        self.assertEqual(response.status_code, 200)
+
+        data = response.get_json()
+        self.assertEqual((data['rows'], data['imported'], data['error_count']), (8, 5, 3))
+        self.assertEqual([error['line'] for error in data['errors']], [7, 8, 9])
+        self.assertIn('title', data['errors'][0]['errors'])
+        self.assertIn('due_date', data['errors'][1]['errors'])
+        self.assertEqual(set(data['errors'][2]['errors']), {'priority', 'difficulty'})
+
+        tasks = self._tasks()
+        self.assertEqual(len(tasks), 5)
+        self.assertEqual((tasks[0].priority, tasks[0].difficulty, tasks[0].due_date), ('high', 2, FUTURE))
+        self.assertEqual((tasks[0].status, tasks[0].category), ('pending', 'assignment'))
+
+    def test_ics_import_unfolds_and_unescapes(self):
+        """Test VTODO/VEVENT properties map onto task fields"""
+        stamp = FUTURE.strftime('%Y%m%d')
+        content = (
+            'BEGIN:VCALENDAR\r\nVERSION:2.0\r\n'
+            f'BEGIN:VTODO\r\nSUMMARY:Lab report\\, part 1\r\nDESCRIPTION:Long line that is\r\n  folded\r\n'
+            f'CATEGORIES:Chemistry,Labs\r\nDUE;VALUE=DATE:{stamp}\r\nPRIORITY:1\r\nEND:VTODO\r\n'
+            f'BEGIN:VEVENT\r\nSUMMARY:Midterm\r\nDTSTART:{stamp}T090000Z\r\nEND:VEVENT\r\n'
+            'END:VCALENDAR\r\n'
+        )
+
+        data = self._upload(content, 'course.ics', subject='General').get_json()
+        self.assertEqual((data['format'], data['imported'], data['error_count']), ('ics', 2, 0))
+
+        lab, midterm = self._tasks()
+        self.assertEqual((lab.title, lab.description, lab.subject, lab.priority),
+                         ('Lab report, part 1', 'Long line that is folded', 'Chemistry', 'urgent'))
+        self.assertEqual((midterm.subject, midterm.due_date), ('General', FUTURE))
+
+    def test_cli_imports_file(self):
+        """Test `flask import-tasks` imports a CSV file for a user"""
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write(f'title,subject,due_date\nEssay,History,{FUTURE}\nNo date,History,\n')
+        try:
+            result = self.app.test_cli_runner().invoke(args=['import-tasks', 'testuser', f.name])
+        finally:
+            os.remove(f.name)
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn('Imported 1 of 2 rows', result.output)
+        self.assertIn('line 3: due_date', result.output)
+        self.assertEqual([task.title for task in self._tasks()], ['Essay'])
+
+if __name__ == '__main__':
+    unittest.main()